@@ -2,41 +2,84 @@ import logging
 from datetime import datetime
 from pathlib import Path
 import time
-from .config import load_config
-from .temperature import TemperatureFactory
 
 
-# Load the configuration
-CONFIG = load_config()
-
-# Package-level logger
+# Package-level logger. Nothing is logged until setup_logging is called,
+# so importing the package never touches the file system.
 logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# the handlers added by setup_logging, replaced when it is called again
+_handlers = []
+
+
+def __getattr__(name: str):
+    # import the factory, and with it pandas and pyarrow, on first use
+    if name == "TemperatureFactory":
+        from .temperature import TemperatureFactory
+
+        return TemperatureFactory
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-# Default configuration (only if no handlers exist yet)
-if not logger.handlers:
-    # Create a 'log' folder in the same directory
-    log_dir = Path(__file__).parent / "logs"
-    log_dir.mkdir(exist_ok=True, parents=True)
+def setup_logging(
+    level: str | int | None = None,
+    log_dir: str | Path | None = None,
+    console: bool = True,
+    retention_days: int | None = None,
+) -> logging.Logger:
+    """
+    Configure the package logger.
+
+    Args:
+        level (str | int, optional): The logging level. Defaults to logging.level in config.yaml.
+        log_dir (str | Path, optional): A folder to write timestamped log files to. Defaults to None (no log file).
+        console (bool, optional): Whether to log to the console. Defaults to True.
+        retention_days (int, optional): Delete log files in log_dir older than this number of days. Defaults to logging.rention_period in config.yaml.
+
+    Returns:
+        logging.Logger: The package logger.
+    """
+    from .config import load_config
+
+    config = load_config()["logging"]
+
+    for handler in _handlers:
+        logger.removeHandler(handler)
+        handler.close()
+    _handlers.clear()
 
-    # Generate a log file name with a timestamp
-    log_file = log_dir / f"log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-    # Specify log file path
-    file_handler = logging.FileHandler(log_file)
     formatter = logging.Formatter(
         "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     )
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
 
-    # Output to console
-    handler = logging.StreamHandler()
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    if log_dir is not None:
+        log_dir = Path(log_dir)
+        log_dir.mkdir(exist_ok=True, parents=True)
+
+        # Delete logs older than rention_period
+        delete_old_logs(
+            log_dir,
+            days=config["rention_period"] if retention_days is None else retention_days,
+        )
+
+        # Generate a log file name with a timestamp
+        log_file = log_dir / f"log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+        _handlers.append(logging.FileHandler(log_file))
+
+    if console:
+        # Output to console
+        _handlers.append(logging.StreamHandler())
+
+    for handler in _handlers:
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
 
     # Set the logging level
-    logger.setLevel(CONFIG["logging"]["level"])
+    logger.setLevel(config["level"] if level is None else level)
     # Prevent the logger from propagating to the root logger
     logger.propagate = False
+    return logger
 
 
 def delete_old_logs(log_dir: Path, days: int = 7):
@@ -62,11 +105,3 @@ def delete_old_logs(log_dir: Path, days: int = 7):
                 print(f"Deleted old log file: {log_file}")
             except Exception as e:
                 print(f"Error deleting file {log_file}: {e}")
-
-
-log_dir = Path(__file__).parent / "logs"
-log_dir.mkdir(exist_ok=True, parents=True)
-
-
-# Delete logs older than rention_period
-delete_old_logs(log_dir, days=CONFIG["logging"]["rention_period"])
@@ -0,0 +1,281 @@
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+import threading
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+CACHE_POLICIES = ("lru", "lfu", "size")
+
+
+class UnitCache:
+    """
+    In-memory cache of loaded data units with an entry limit and a byte limit.
+
+    Eviction policies:
+        - "lru": evict the least recently used unit.
+        - "lfu": evict the least frequently used unit, oldest first on ties.
+        - "size": evict the unit with the fewest hits per byte, so large rarely
+          used units go first.
+
+    The most recently added unit is never evicted by its own insertion, so a
+    single unit larger than max_bytes is kept until the next insertion.
+    """
+
+    def __init__(
+        self,
+        max_entries: int | None = 200,
+        max_bytes: int | None = None,
+        policy: str = "lru",
+        on_evict: Callable[[Hashable], None] | None = None,
+    ) -> None:
+        """
+        Args:
+            max_entries (int | None, optional): the maximum number of units to keep. None means no limit. Defaults to 200.
+            max_bytes (int | None, optional): the maximum total size of the units in bytes. None means no limit. Defaults to None.
+            policy (str, optional): the eviction policy, one of "lru", "lfu" or "size". Defaults to "lru".
+            on_evict (Callable[[Hashable], None] | None, optional): called with the key of each evicted unit. Defaults to None.
+        """
+        if policy not in CACHE_POLICIES:
+            raise ValueError(
+                f"Unsupported cache policy: {policy}. Use one of {CACHE_POLICIES}."
+            )
+        if max_entries is not None and max_entries < 0:
+            raise ValueError(f"max_entries {max_entries} is negative.")
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError(f"max_bytes {max_bytes} is negative.")
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.on_evict = on_evict
+
+        # units in recency order, the most recently used last
+        self._units = OrderedDict()
+        self._sizes = {}
+        self._frequencies = {}
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.RLock()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._units
+
+    def __len__(self) -> int:
+        return len(self._units)
+
+    @property
+    def nbytes(self) -> int:
+        """the total size of the cached units in bytes"""
+        return self._bytes
+
+    def keys(self) -> list:
+        """the cached keys, the least recently used first"""
+        with self._lock:
+            return list(self._units.keys())
+
+    def get(self, key: Hashable) -> Any | None:
+        """get a unit, returns None on a miss"""
+        with self._lock:
+            if key not in self._units:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._frequencies[key] += 1
+            self._units.move_to_end(key)
+            return self._units[key]
+
+    def peek(self, key: Hashable) -> Any | None:
+        """get a unit without counting a hit or a miss or marking it as used"""
+        with self._lock:
+            return self._units.get(key)
+
+    def put(self, key: Hashable, unit: Any, nbytes: int = 0) -> None:
+        """add a unit of nbytes bytes, evicting other units if a limit is exceeded"""
+        with self._lock:
+            if key in self._units:
+                self._bytes -= self._sizes[key]
+            else:
+                self._frequencies[key] = 1
+
+            self._units[key] = unit
+            self._units.move_to_end(key)
+            self._sizes[key] = nbytes
+            self._bytes += nbytes
+
+            while self._over_limit() and len(self._units) > 1:
+                self._evict(self._select_victim(exclude=key))
+
+    def pop(self, key: Hashable) -> Any | None:
+        """remove a unit without counting it as an eviction"""
+        with self._lock:
+            if key not in self._units:
+                return None
+            return self._remove(key)
+
+    def clear(self) -> None:
+        """remove all the units, the counters are kept"""
+        with self._lock:
+            self._units.clear()
+            self._sizes.clear()
+            self._frequencies.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Get the cache counters.
+
+        Returns:
+            dict: A dictionary containing hits, misses, evictions, entries and bytes.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._units),
+                "bytes": self._bytes,
+            }
+
+    def _over_limit(self) -> bool:
+        if self.max_entries is not None and len(self._units) > self.max_entries:
+            return True
+        if self.max_bytes is not None and self._bytes > self.max_bytes:
+            return True
+        return False
+
+    def _select_victim(self, exclude: Hashable) -> Hashable:
+        candidates = (key for key in self._units if key != exclude)
+        if self.policy == "lru":
+            return next(candidates)
+        if self.policy == "lfu":
+            # min keeps the first of equal values, i.e. the least recently used
+            return min(candidates, key=lambda key: self._frequencies[key])
+        return min(
+            candidates,
+            key=lambda key: self._frequencies[key] / max(self._sizes[key], 1),
+        )
+
+    def _evict(self, key: Hashable) -> None:
+        self._remove(key)
+        self.evictions += 1
+        logger.debug("Evicted %s from the unit cache", key)
+        if self.on_evict is not None:
+            self.on_evict(key)
+
+    def _remove(self, key: Hashable) -> Any:
+        self._bytes -= self._sizes.pop(key)
+        del self._frequencies[key]
+        return self._units.pop(key)
+
+
+class StripedUnitCache:
+    """
+    A UnitCache split into stripes, each with its own lock.
+
+    Keys are spread over the stripes by hash, so threads looking up different
+    units rarely wait for the same lock. Each stripe holds its share of
+    max_entries and max_bytes, the remainder spread over the first stripes so
+    the shares add up to the limits, and evicts on its own, so the eviction
+    policy only orders the units within a stripe.
+    """
+
+    def __init__(
+        self,
+        max_entries: int | None = 200,
+        max_bytes: int | None = None,
+        policy: str = "lru",
+        on_evict: Callable[[Hashable], None] | None = None,
+        stripes: int = 8,
+    ) -> None:
+        """
+        Args:
+            max_entries (int | None, optional): the maximum number of units to keep. None means no limit. Defaults to 200.
+            max_bytes (int | None, optional): the maximum total size of the units in bytes. None means no limit. Defaults to None.
+            policy (str, optional): the eviction policy of each stripe, one of "lru", "lfu" or "size". Defaults to "lru".
+            on_evict (Callable[[Hashable], None] | None, optional): called with the key of each evicted unit. Defaults to None.
+            stripes (int, optional): the number of stripes, at most max_entries. Defaults to 8.
+        """
+        if stripes < 1:
+            raise ValueError(f"stripes {stripes} must be positive.")
+        if max_entries is not None and max_entries < 0:
+            raise ValueError(f"max_entries {max_entries} is negative.")
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError(f"max_bytes {max_bytes} is negative.")
+        if max_entries is not None and stripes > max_entries:
+            # a stripe keeps at least the unit it last added
+            raise ValueError(
+                f"stripes {stripes} must not exceed max_entries {max_entries}."
+            )
+
+        def share(limit: int | None, stripe: int) -> int | None:
+            # the limit of a stripe, the first ones take the remainder
+            if limit is None:
+                return None
+            return limit // stripes + (stripe < limit % stripes)
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self._stripes = [
+            UnitCache(share(max_entries, i), share(max_bytes, i), policy, on_evict)
+            for i in range(stripes)
+        ]
+
+    def _stripe(self, key: Hashable) -> UnitCache:
+        return self._stripes[hash(key) % len(self._stripes)]
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._stripe(key)
+
+    def __len__(self) -> int:
+        return sum(len(stripe) for stripe in self._stripes)
+
+    @property
+    def nbytes(self) -> int:
+        """the total size of the cached units in bytes"""
+        return sum(stripe.nbytes for stripe in self._stripes)
+
+    def keys(self) -> list:
+        """the cached keys, the least recently used first within each stripe"""
+        return [key for stripe in self._stripes for key in stripe.keys()]
+
+    def get(self, key: Hashable) -> Any | None:
+        """get a unit, returns None on a miss"""
+        return self._stripe(key).get(key)
+
+    def peek(self, key: Hashable) -> Any | None:
+        """get a unit without counting a hit or a miss or marking it as used"""
+        return self._stripe(key).peek(key)
+
+    def put(self, key: Hashable, unit: Any, nbytes: int = 0) -> None:
+        """add a unit of nbytes bytes, evicting other units of its stripe if a limit is exceeded"""
+        self._stripe(key).put(key, unit, nbytes)
+
+    def pop(self, key: Hashable) -> Any | None:
+        """remove a unit without counting it as an eviction"""
+        return self._stripe(key).pop(key)
+
+    def clear(self) -> None:
+        """remove all the units, the counters are kept"""
+        for stripe in self._stripes:
+            stripe.clear()
+
+    def stats(self) -> dict:
+        """
+        Get the cache counters, summed over the stripes.
+
+        Returns:
+            dict: A dictionary containing hits, misses, evictions, entries and bytes.
+        """
+        totals = {"hits": 0, "misses": 0, "evictions": 0, "entries": 0, "bytes": 0}
+        for stripe in self._stripes:
+            for name, value in stripe.stats().items():
+                totals[name] += value
+        return totals
@@ -0,0 +1,172 @@
+import numpy as np
+
+
+class CellIndex:
+    """
+    Index rows of coordinates by their integer grid-cell coordinates.
+
+    Keys are (round(latitude / resolution), round(longitude / resolution))
+    packed into one int64 and kept sorted, so a lookup is a binary search
+    (np.searchsorted) instead of a scan over all rows. A row matches a query
+    point if both coordinates are within np.isclose(atol=tolerance) of it.
+    If several rows share a grid cell, the first row is used.
+    """
+
+    def __init__(
+        self,
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        resolution: float = 0.1,
+        tolerance: float = 1e-2,
+    ) -> None:
+        """
+        Args:
+            latitudes (np.ndarray): the latitudes of the rows.
+            longitudes (np.ndarray): the longitudes of the rows.
+            resolution (float, optional): the grid resolution in degrees. Defaults to 0.1.
+            tolerance (float, optional): the absolute tolerance of a match in degrees. Defaults to 1e-2.
+        """
+        self.latitudes = np.asarray(latitudes, dtype=np.float64)
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)
+        self.resolution = resolution
+        self.tolerance = tolerance
+
+        # number of longitude keys, used to pack the two keys into one
+        self._lon_span = 2 * int(np.ceil(180 / resolution)) + 1
+
+        keys = self._pack(self._key(self.latitudes), self._key(self.longitudes))
+        # a stable sort keeps the first row first among rows of the same cell
+        self._order = np.argsort(keys, kind="stable")
+        self._keys = keys[self._order]
+
+    @classmethod
+    def from_arrays(
+        cls,
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        keys: np.ndarray,
+        order: np.ndarray,
+        resolution: float = 0.1,
+        tolerance: float = 1e-2,
+    ) -> "CellIndex":
+        """
+        Rebuild an index from the sorted keys and order of another one, see arrays.
+
+        The arrays are used as they are, so memory-mapped arrays are not copied.
+        """
+        index = cls.__new__(cls)
+        index.latitudes = np.asarray(latitudes, dtype=np.float64)
+        index.longitudes = np.asarray(longitudes, dtype=np.float64)
+        index.resolution = resolution
+        index.tolerance = tolerance
+        index._lon_span = 2 * int(np.ceil(180 / resolution)) + 1
+        index._order = order
+        index._keys = keys
+        return index
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        """the sorted keys and their row positions, to rebuild the index with from_arrays"""
+        return {"keys": self._keys, "order": self._order}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def nbytes(self) -> int:
+        """the size of the index in bytes"""
+        return (
+            self._keys.nbytes
+            + self._order.nbytes
+            + self.latitudes.nbytes
+            + self.longitudes.nbytes
+        )
+
+    def lookup(self, latitude: float, longitude: float) -> int:
+        """
+        Find the row of a point.
+
+        Returns:
+            int: the row position, or -1 if no row matches.
+        """
+        latitude = float(latitude)
+        longitude = float(longitude)
+        row = self._find(
+            self._pack(
+                round(latitude / self.resolution), round(longitude / self.resolution)
+            )
+        )
+        if row >= 0 and self._is_close(row, latitude, longitude):
+            return row
+
+        # the point may be near a cell edge, fall back to checking the neighbours
+        return int(self.lookup_many(np.array([latitude]), np.array([longitude]))[0])
+
+    def lookup_many(self, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        """
+        Find the rows of many points.
+
+        Returns:
+            np.ndarray: the row positions, -1 where no row matches.
+        """
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        rows = np.full(latitudes.shape, -1, dtype=np.int64)
+        if len(self._keys) == 0:
+            return rows
+
+        # a matching row is in the cell of the point shifted by at most the tolerance
+        lat_keys = self._candidate_keys(latitudes)
+        lon_keys = self._candidate_keys(longitudes)
+        for lat_key in lat_keys:
+            for lon_key in lon_keys:
+                candidates = self._find_many(self._pack(lat_key, lon_key))
+                valid = candidates >= 0
+                valid[valid] = np.isclose(
+                    self.latitudes[candidates[valid]],
+                    latitudes[valid],
+                    atol=self.tolerance,
+                ) & np.isclose(
+                    self.longitudes[candidates[valid]],
+                    longitudes[valid],
+                    atol=self.tolerance,
+                )
+                # the nearest cell comes first, only fill points not matched yet
+                valid &= rows < 0
+                rows[valid] = candidates[valid]
+        return rows
+
+    def _key(self, values: np.ndarray) -> np.ndarray:
+        return np.round(values / self.resolution).astype(np.int64)
+
+    def _candidate_keys(self, values: np.ndarray) -> list[np.ndarray]:
+        # same bound as np.isclose: atol + rtol * |value|
+        tolerance = self.tolerance + 1e-5 * np.abs(values)
+        keys = [self._key(values)]
+        for shifted in (values - tolerance, values + tolerance):
+            key = self._key(shifted)
+            if not any(np.array_equal(key, other) for other in keys):
+                keys.append(key)
+        return keys
+
+    def _pack(self, lat_keys, lon_keys):
+        return lat_keys * self._lon_span + lon_keys
+
+    def _find(self, key: int) -> int:
+        position = int(np.searchsorted(self._keys, key))
+        if position < len(self._keys) and self._keys[position] == key:
+            return int(self._order[position])
+        return -1
+
+    def _find_many(self, keys: np.ndarray) -> np.ndarray:
+        positions = np.searchsorted(self._keys, keys)
+        positions = np.minimum(positions, len(self._keys) - 1)
+        return np.where(self._keys[positions] == keys, self._order[positions], -1)
+
+    def _is_close(self, row: int, latitude: float, longitude: float) -> bool:
+        # scalar version of np.isclose, which is slow on single values
+        lat_tolerance = self.tolerance + 1e-5 * abs(latitude)
+        lon_tolerance = self.tolerance + 1e-5 * abs(longitude)
+        return bool(
+            abs(self.latitudes[row] - latitude) <= lat_tolerance
+            and abs(self.longitudes[row] - longitude) <= lon_tolerance
+        )
@@ -0,0 +1,108 @@
+from pathlib import Path
+import logging
+import numpy as np
+from .cube import write_cube_header, read_cube_header, CUBE_HEADER_SIZE
+
+
+logger = logging.getLogger(__name__)
+
+# a climatology file has the header of a cube file with its own magic bytes
+CLIMATOLOGY_MAGIC = b"GTCLIM01"
+# the statistics of each cell and calendar month, in the last axis of the data
+CLIMATOLOGY_STATISTICS = ("mean", "std")
+
+
+class Climatology:
+    """
+    Baseline monthly temperatures as a memory-mapped float32 array of grid cell x calendar month.
+
+    data[cell, month - 1] holds the mean and the standard deviation of the
+    temperature of a grid cell in a calendar month over the baseline years.
+    Rows are the row positions of the grid parquet file, like in a cube. Cells
+    without enough baseline years are NaN.
+    """
+
+    def __init__(self, file: str | Path, mode: str = "r") -> None:
+        """
+        Args:
+            file (str | Path): the path of the climatology file.
+            mode (str, optional): the np.memmap mode. Defaults to "r".
+        """
+        self.file = Path(file)
+        meta = read_cube_header(self.file, CLIMATOLOGY_MAGIC)
+
+        self.grid_name = meta["grid_name"]
+        self.start_year = meta["start_year"]
+        self.end_year = meta["end_year"]
+        self.min_years = meta["min_years"]
+        self.n_cells = meta["n_cells"]
+
+        self.data = np.memmap(
+            self.file,
+            dtype=np.float32,
+            mode=mode,
+            offset=CUBE_HEADER_SIZE,
+            shape=(self.n_cells, 12, len(CLIMATOLOGY_STATISTICS)),
+        )
+
+    @classmethod
+    def create(
+        cls,
+        file: str | Path,
+        grid_name: str,
+        n_cells: int,
+        start_year: int,
+        end_year: int,
+        min_years: int = 1,
+    ) -> "Climatology":
+        """
+        Create an empty climatology file filled with NaN.
+        """
+        file = Path(file)
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.unlink(missing_ok=True)
+
+        write_cube_header(
+            file,
+            {
+                "grid_name": grid_name,
+                "start_year": start_year,
+                "end_year": end_year,
+                "min_years": min_years,
+                "n_cells": n_cells,
+                "statistics": list(CLIMATOLOGY_STATISTICS),
+                "dtype": "float32",
+            },
+            CLIMATOLOGY_MAGIC,
+        )
+        data = np.memmap(
+            file,
+            dtype=np.float32,
+            mode="r+",
+            offset=CUBE_HEADER_SIZE,
+            shape=(n_cells, 12, len(CLIMATOLOGY_STATISTICS)),
+        )
+        data[:] = np.nan
+        data.flush()
+        del data
+
+        return cls(file, mode="r+")
+
+    def query(self, cell: int, month: int) -> tuple[float, float]:
+        """query the baseline mean and standard deviation of a grid cell in a calendar month"""
+        mean, std = self.data[cell, month - 1]
+        return mean, std
+
+    def query_many(
+        self, cells: np.ndarray, months: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Query the baselines of many grid cells and calendar months.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: the baseline means and standard deviations, NaN without a baseline or for the cell -1 of points not snapped
+        """
+        cells = np.asarray(cells)
+        values = self.data[np.maximum(cells, 0), np.asarray(months) - 1]
+        values[cells < 0] = np.nan
+        return values[:, 0], values[:, 1]
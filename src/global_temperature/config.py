@@ -1,4 +1,5 @@
 from pathlib import Path
+import functools
 import yaml
 
 # Resolve paths relative to the package root
@@ -6,6 +7,8 @@ PACKAGE_ROOT = Path(__file__).parent
 CONFIG_FILE = PACKAGE_ROOT / "config.yaml"
 
 
+@functools.cache
 def load_config() -> dict:
+    """Parse config.yaml once, every caller shares the same dictionary."""
     with open(CONFIG_FILE, "r") as file:
         return yaml.safe_load(file)
@@ -0,0 +1,165 @@
+from pathlib import Path
+import json
+import logging
+import numpy as np
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+# a cube file starts with a fixed size header: the magic bytes followed by JSON metadata
+CUBE_MAGIC = b"GTCUBE01"
+CUBE_HEADER_SIZE = 4096
+
+
+def write_cube_header(file: str | Path, meta: dict, magic: bytes = CUBE_MAGIC) -> None:
+    """
+    Write the metadata header of a cube file, or of another file with a magic header.
+    """
+    header = magic + json.dumps(meta).encode("utf-8")
+    if len(header) > CUBE_HEADER_SIZE:
+        raise ValueError("Cube metadata is too large.")
+
+    with open(file, "r+b" if Path(file).exists() else "wb") as f:
+        f.write(header.ljust(CUBE_HEADER_SIZE, b"\0"))
+
+
+def read_cube_header(file: str | Path, magic: bytes = CUBE_MAGIC) -> dict:
+    """
+    Read the metadata header of a cube file, or of another file with a magic header.
+    """
+    if not Path(file).exists():
+        raise FileNotFoundError(f"File {file} does not exist.")
+
+    with open(file, "rb") as f:
+        header = f.read(CUBE_HEADER_SIZE)
+
+    if not header.startswith(magic):
+        raise ValueError(f"File {file} does not have the {magic.decode()} header.")
+    return json.loads(header[len(magic) :].rstrip(b"\0"))
+
+
+class TemperatureCube:
+    """
+    Monthly temperatures as a dense memory-mapped float32 array of grid cell x month.
+
+    Rows are the row positions of the grid parquet file, columns are consecutive
+    months from the start month. Cells without data are NaN.
+    """
+
+    def __init__(self, file: str | Path, mode: str = "r") -> None:
+        """
+        Args:
+            file (str | Path): the path of the cube file.
+            mode (str, optional): the np.memmap mode. Defaults to "r".
+        """
+        self.file = Path(file)
+        meta = read_cube_header(self.file)
+
+        self.grid_name = meta["grid_name"]
+        self.start = pd.Period(meta["start"], freq="M")
+        self.n_months = meta["n_months"]
+        self.n_cells = meta["n_cells"]
+
+        self.data = np.memmap(
+            self.file,
+            dtype=np.float32,
+            mode=mode,
+            offset=CUBE_HEADER_SIZE,
+            shape=(self.n_cells, self.n_months),
+        )
+
+    @classmethod
+    def create(
+        cls,
+        file: str | Path,
+        grid_name: str,
+        n_cells: int,
+        start: str | pd.Period,
+        n_months: int,
+    ) -> "TemperatureCube":
+        """
+        Create an empty cube file filled with NaN.
+        """
+        file = Path(file)
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.unlink(missing_ok=True)
+
+        write_cube_header(
+            file,
+            {
+                "grid_name": grid_name,
+                "start": str(pd.Period(start, freq="M")),
+                "n_months": n_months,
+                "n_cells": n_cells,
+                "dtype": "float32",
+            },
+        )
+        data = np.memmap(
+            file,
+            dtype=np.float32,
+            mode="r+",
+            offset=CUBE_HEADER_SIZE,
+            shape=(n_cells, n_months),
+        )
+        data[:] = np.nan
+        data.flush()
+        del data
+
+        return cls(file, mode="r+")
+
+    @property
+    def end(self) -> pd.Period:
+        """the last month in the cube"""
+        return self.start + (self.n_months - 1)
+
+    def month_index(self, year: int, month: int) -> int:
+        """
+        Get the column of a month.
+
+        Raises:
+            FileNotFoundError: If the month is not in the cube.
+        """
+        index = (year - self.start.year) * 12 + (month - self.start.month)
+        if not (0 <= index < self.n_months):
+            raise FileNotFoundError(
+                f"Month {year}-{month} is not in cube {self.file} ({self.start} to {self.end})."
+            )
+        return index
+
+    def query(self, cell: int, year: int, month: int) -> float | None:
+        """query the temperature of a grid cell, None if there is no data"""
+        value = self.data[cell, self.month_index(year, month)]
+        if np.isnan(value):
+            logger.debug(
+                "Temperature data not found for cell %s in %s-%s", cell, year, month
+            )
+            return None
+        return value
+
+    def query_many(
+        self, cells: np.ndarray, years: np.ndarray, months: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Query the temperatures of many grid cells and months.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: the temperature values and a mask of the values found
+        """
+        columns = (np.asarray(years) - self.start.year) * 12 + (
+            np.asarray(months) - self.start.month
+        )
+        outside = (columns < 0) | (columns >= self.n_months)
+        if outside.any():
+            raise FileNotFoundError(
+                f"Month {years[outside][0]}-{months[outside][0]} is not in cube {self.file} ({self.start} to {self.end})."
+            )
+
+        values = self.data[np.asarray(cells), columns]
+        return values, ~np.isnan(values)
+
+    def query_range(self, cell: int, start: pd.Period, end: pd.Period) -> np.ndarray:
+        """query the temperatures of a grid cell for consecutive months"""
+        first = self.month_index(start.year, start.month)
+        last = self.month_index(end.year, end.month)
+        return np.array(self.data[cell, first : last + 1])
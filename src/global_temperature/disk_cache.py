@@ -0,0 +1,112 @@
+from pathlib import Path
+from uuid import uuid4
+import hashlib
+import logging
+import os
+import pyarrow as pa
+
+
+logger = logging.getLogger(__name__)
+
+# how a cached file is checked against its source parquet file
+DISK_CACHE_CHECKS = ("mtime", "checksum")
+# bytes read at a time when a source file is hashed
+CHECKSUM_CHUNK_SIZE = 1 << 20
+
+
+class DiskUnitCache:
+    """
+    Decoded partitions kept on local disk as uncompressed Arrow IPC files.
+
+    A partition is written once it has been read and validated, with only the
+    columns the queries need, and later loads memory-map the file: the arrays
+    point into the page cache, with no decompression, conversion or validation.
+    The cache survives restarts and is shared by the processes using the folder.
+
+    Each file records the path, size and modification time of its source
+    parquet file in its schema metadata, plus its SHA-256 with check="checksum".
+    A file is only used while they match, otherwise the partition is read from
+    the source again and the file replaced. The SHA-256 of a source file is
+    kept and only computed again once its size, modification time or status
+    change time changes, the last of which any write to the file updates.
+    """
+
+    def __init__(self, folder: str | Path, check: str = "mtime") -> None:
+        """
+        Args:
+            folder (str | Path): the folder of the cached files.
+            check (str, optional): "mtime" compares the size and modification time of the source file, "checksum" also its SHA-256, which reads the whole source file on its first load and after it changed. Defaults to "mtime".
+        """
+        if check not in DISK_CACHE_CHECKS:
+            raise ValueError(
+                f"Unsupported disk cache check: {check}. Use one of {DISK_CACHE_CHECKS}."
+            )
+        self.folder = Path(folder)
+        self.check = check
+        self.folder.mkdir(parents=True, exist_ok=True)
+        # the (size, mtime, ctime) and SHA-256 of each source file hashed so far
+        self._digests = {}
+
+    def path(self, year: int, month: int, geohash: str) -> Path:
+        """the cached file of a partition"""
+        return self.folder / f"{int(year)}-{int(month):02d}-{geohash}.arrow"
+
+    def read(self, source_file: Path, path: Path) -> pa.Table | None:
+        """
+        Memory-map a cached file.
+
+        Returns:
+            pa.Table | None: the cached table, None if there is no file or its source changed.
+        """
+        try:
+            table = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+        except (FileNotFoundError, pa.ArrowInvalid):
+            return None
+
+        metadata = table.schema.metadata or {}
+        expected = self._source_metadata(source_file)
+        if any(metadata.get(key) != value for key, value in expected.items()):
+            logger.debug("Cached file %s is stale", path)
+            return None
+        return table.replace_schema_metadata(None)
+
+    def write(self, source_file: Path, path: Path, table: pa.Table) -> None:
+        """write a table as the cached file of a source file, replacing it atomically"""
+        table = table.combine_chunks().replace_schema_metadata(
+            self._source_metadata(source_file)
+        )
+        temporary = path.with_name(f".{path.name}.{uuid4().hex}")
+        try:
+            with pa.OSFile(str(temporary), "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(temporary, path)
+        finally:
+            temporary.unlink(missing_ok=True)
+        logger.debug("Cached %s into %s", source_file, path)
+
+    def _source_metadata(self, source_file: Path) -> dict[bytes, bytes]:
+        stat = os.stat(source_file)
+        source = str(Path(source_file).resolve())
+        metadata = {
+            b"source": source.encode(),
+            b"source_size": str(stat.st_size).encode(),
+            b"source_mtime_ns": str(stat.st_mtime_ns).encode(),
+        }
+        if self.check == "checksum":
+            metadata[b"source_sha256"] = self._sha256(source, stat).encode()
+        return metadata
+
+    def _sha256(self, source: str, stat: os.stat_result) -> str:
+        """the SHA-256 of a source file, hashed again only if it changed"""
+        version = (stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns)
+        cached = self._digests.get(source)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        digest = hashlib.sha256()
+        with open(source, "rb") as file:
+            while chunk := file.read(CHECKSUM_CHUNK_SIZE):
+                digest.update(chunk)
+        self._digests[source] = (version, digest.hexdigest())
+        return digest.hexdigest()
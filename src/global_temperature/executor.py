@@ -0,0 +1,234 @@
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+import heapq
+import logging
+import os
+import numpy as np
+from .disk_cache import DiskUnitCache
+
+
+logger = logging.getLogger(__name__)
+
+# the settings of the partitions loaded by a worker process, set by _init_worker
+_worker_options = {}
+
+
+class PartitionExecutor:
+    """
+    Look up batches of points in worker processes, sharded by partition.
+
+    The partitions of a batch are split into shards of about the same number of
+    rows, and each shard is a task: every partition is loaded by exactly one
+    worker. The snapped coordinates are passed to the workers in a shared memory
+    block and the workers write the temperatures into another one, so only the
+    partition keys and row ranges are pickled.
+
+    Partitions loaded by workers are not cached, in the workers or in the caller.
+    """
+
+    def __init__(
+        self,
+        source_folder: str | Path,
+        loader: str = "arrow",
+        validation: str = "fast",
+        partial_load: bool = False,
+        max_workers: int | None = None,
+        shards_per_worker: int = 4,
+        mp_context: str = "spawn",
+        disk_cache: DiskUnitCache | None = None,
+    ) -> None:
+        """
+        Args:
+            source_folder (str | Path): the folder of the partitioned parquet files.
+            loader (str, optional): the loader of TemperatureMonthlyUnit. Defaults to "arrow".
+            validation (str, optional): the validation mode of TemperatureMonthlyUnit. Defaults to "fast".
+            partial_load (bool, optional): read only the rows near the points of each partition. Defaults to False.
+            max_workers (int | None, optional): the number of worker processes. Defaults to None (the number of CPUs).
+            shards_per_worker (int, optional): the number of shards per worker, more shards balance uneven partitions better. Defaults to 4.
+            mp_context (str, optional): the multiprocessing start method. "spawn" is safe with the prefetch and query_range threads. Defaults to "spawn".
+            disk_cache (DiskUnitCache | None, optional): the cache of decoded partitions on local disk the workers read and write. Defaults to None.
+        """
+        max_workers = max_workers or os.cpu_count() or 1
+        if max_workers < 1 or shards_per_worker < 1:
+            raise ValueError("max_workers and shards_per_worker must be positive.")
+
+        self.max_workers = max_workers
+        self.shards_per_worker = shards_per_worker
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=get_context(mp_context),
+            initializer=_init_worker,
+            initargs=(
+                str(source_folder),
+                loader,
+                validation,
+                partial_load,
+                disk_cache,
+            ),
+        )
+
+    def lookup(
+        self,
+        groups: dict[tuple, np.ndarray],
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray, dict]:
+        """
+        Look up snapped points in their partitions.
+
+        Args:
+            groups (dict[tuple, np.ndarray]): the row positions of each (year, month, geohash) partition.
+            latitudes (np.ndarray): the snapped latitudes of all the rows.
+            longitudes (np.ndarray): the snapped longitudes of all the rows.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, dict]: the temperatures and found flags of
+                all the rows, in input order, and the partitions_loaded and bytes_read
+                of the workers. Rows not in any group are NaN and not found.
+        """
+        values = np.full(len(latitudes), np.nan, dtype=np.float32)
+        found = np.zeros(len(latitudes), dtype=bool)
+        stats = {"partitions_loaded": 0, "bytes_read": 0}
+        if not groups:
+            return values, found, stats
+
+        # the rows of each partition are contiguous in the shared arrays
+        keys = list(groups)
+        order = np.concatenate([groups[key] for key in keys])
+        stops = np.cumsum([len(groups[key]) for key in keys])
+        starts = stops - np.array([len(groups[key]) for key in keys])
+        size = len(order)
+
+        coordinates_block = SharedMemory(create=True, size=2 * size * 8)
+        results_block = SharedMemory(create=True, size=size * 5)
+        try:
+            coordinates = np.ndarray(
+                (2, size), dtype=np.float64, buffer=coordinates_block.buf
+            )
+            coordinates[0] = latitudes[order]
+            coordinates[1] = longitudes[order]
+            # a view left on a block would keep it from closing
+            del coordinates
+
+            tasks = [
+                (*key, int(start), int(stop))
+                for key, start, stop in zip(keys, starts, stops)
+            ]
+            futures = [
+                self._executor.submit(
+                    _lookup_shard,
+                    coordinates_block.name,
+                    results_block.name,
+                    size,
+                    shard,
+                )
+                for shard in self.shards(tasks)
+            ]
+            try:
+                for future in futures:
+                    partitions_loaded, bytes_read = future.result()
+                    stats["partitions_loaded"] += partitions_loaded
+                    stats["bytes_read"] += bytes_read
+            except BaseException:
+                # the running shards still write into the shared memory
+                for future in futures:
+                    future.cancel()
+                wait(futures)
+                raise
+
+            values[order] = np.ndarray(size, dtype=np.float32, buffer=results_block.buf)
+            found[order] = np.ndarray(
+                size, dtype=bool, buffer=results_block.buf, offset=size * 4
+            )
+        finally:
+            coordinates_block.close()
+            coordinates_block.unlink()
+            results_block.close()
+            results_block.unlink()
+
+        return values, found, stats
+
+    def shards(self, tasks: list[tuple]) -> list[list[tuple]]:
+        """split partition tasks into shards of about the same number of rows"""
+        count = min(len(tasks), self.max_workers * self.shards_per_worker)
+        # the largest partitions first, each into the lightest shard
+        heap = [(0, i) for i in range(count)]
+        shards = [[] for _ in range(count)]
+        for task in sorted(tasks, key=lambda task: task[4] - task[3], reverse=True):
+            rows, i = heapq.heappop(heap)
+            shards[i].append(task)
+            heapq.heappush(heap, (rows + task[4] - task[3], i))
+        return shards
+
+    def shutdown(self) -> None:
+        """stop the worker processes"""
+        self._executor.shutdown(cancel_futures=True)
+
+
+def _init_worker(
+    source_folder: str,
+    loader: str,
+    validation: str,
+    partial_load: bool,
+    disk_cache: DiskUnitCache | None,
+) -> None:
+    _worker_options.update(
+        source_folder=source_folder,
+        loader=loader,
+        validation=validation,
+        partial_load=partial_load,
+        disk_cache=disk_cache,
+    )
+
+
+def _lookup_shard(
+    coordinates_name: str, results_name: str, size: int, tasks: list[tuple]
+) -> tuple[int, int]:
+    """load the partitions of a shard and write the temperatures of their rows"""
+    # temperature_monthly imports this module
+    from .temperature_monthly import TemperatureMonthlyUnit, PARTIAL_LOAD_MARGIN
+
+    coordinates_block = SharedMemory(name=coordinates_name)
+    results_block = SharedMemory(name=results_name)
+    bytes_read = 0
+    try:
+        coordinates = np.ndarray(
+            (2, size), dtype=np.float64, buffer=coordinates_block.buf
+        )
+        values = np.ndarray(size, dtype=np.float32, buffer=results_block.buf)
+        found = np.ndarray(size, dtype=bool, buffer=results_block.buf, offset=size * 4)
+
+        for year, month, geohash, start, stop in tasks:
+            latitudes = coordinates[0, start:stop]
+            longitudes = coordinates[1, start:stop]
+            bounds = None
+            if _worker_options["partial_load"]:
+                bounds = (
+                    float(latitudes.min()) - PARTIAL_LOAD_MARGIN,
+                    float(latitudes.max()) + PARTIAL_LOAD_MARGIN,
+                    float(longitudes.min()) - PARTIAL_LOAD_MARGIN,
+                    float(longitudes.max()) + PARTIAL_LOAD_MARGIN,
+                )
+            unit = TemperatureMonthlyUnit(
+                _worker_options["source_folder"],
+                year,
+                month,
+                geohash,
+                _worker_options["loader"],
+                bounds,
+                _worker_options["validation"],
+                _worker_options["disk_cache"],
+            )
+            values[start:stop], found[start:stop] = unit.query_many(
+                latitudes, longitudes
+            )
+            bytes_read += unit.bytes_read
+    finally:
+        # a view left on a block would keep it from closing
+        coordinates = values = found = latitudes = longitudes = None
+        coordinates_block.close()
+        results_block.close()
+
+    return len(tasks), bytes_read
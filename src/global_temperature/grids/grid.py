@@ -1,57 +1,199 @@
 import numpy as np
 import pandas as pd
-from scipy.spatial import cKDTree
 from pathlib import Path
+from typing import TYPE_CHECKING
+import json
+import threading
+from ..config import load_config, PACKAGE_ROOT
+from .raster import SnapRaster, RASTER_NO_POINT, RASTER_REFINE
+
+
+CONFIG = load_config()
+
+if TYPE_CHECKING:
+    from scipy.spatial import cKDTree
+
+# file names used when a built grid index is saved to disk
+INDEX_META_FILE = "meta.json"
+INDEX_ARRAYS = ("tree", "data", "maxes", "mins", "indices")
+
+# tolerance in degrees of the box bounds, the grid coordinates are not exact decimals
+BOX_TOLERANCE = 1e-6
 
 
 class SingletonMeta(type):
     """
-    A metaclass for creating singleton classes.
+    A thread-safe metaclass for creating singleton classes.
     """
 
     _instances = {}
+    _lock = threading.Lock()
 
     def __call__(cls, *args, **kwargs):
         if cls not in cls._instances:
-            instance = super().__call__(*args, **kwargs)
-            cls._instances[cls] = instance
+            with cls._lock:
+                # another thread may have created the instance while we waited
+                if cls not in cls._instances:
+                    instance = super().__call__(*args, **kwargs)
+                    cls._instances[cls] = instance
         return cls._instances[cls]
 
 
 class Grids(metaclass=SingletonMeta):
     """
     Load and manage grid data.
+
+    Each grid is loaded once and kept for the life of the process, so the
+    KD-tree is only built on first use.
     """
 
     def __init__(self):
         self.grids = {}
+        self._lock = threading.Lock()
+        # the (tree, lattice) of each grid, computed on first use
+        self._lattices = {}
+        # the lookup rasters by (grid_name, search_radius, factor), built or
+        # loaded on request
+        self.rasters = {}
+        # held while a raster is checked and built, so it is built once
+        self._raster_lock = threading.RLock()
 
-    def load_grid(self, file: str | Path, grid_name: str) -> None:
+    def load_grid(self, file: str | Path, grid_name: str, reload: bool = False) -> None:
         """
         Load grid data from a file.
+
+        Loading is skipped if the grid is already loaded, unless reload is True.
+        """
+        if grid_name in self.grids and not reload:
+            return
+
+        with self._lock:
+            if grid_name in self.grids and not reload:
+                return
+
+            # Check if the file exists
+            if not Path(file).exists():
+                raise FileNotFoundError(f"File {file} does not exist.")
+
+            # Load the grid data
+            df = pd.read_parquet(file)
+
+            # Extract coordinate points as a NumPy array.
+            points = df[["latitude", "longitude"]].values
+
+            # Build KDTree for fast nearest-neighbor lookup.
+            # scipy is imported on first use to keep the package import fast
+            from scipy.spatial import cKDTree
+
+            tree = cKDTree(points)
+
+            self.grids[grid_name] = tree
+
+    def get_grid(self, grid_name: str) -> "cKDTree":
+        """
+        Get the KDTree of a grid defined in config.yaml, loading it on first use.
+        """
+        if grid_name not in self.grids:
+            if grid_name not in CONFIG["grids"]:
+                raise ValueError(f"Grid {grid_name} is not defined in config.")
+            self.load_grid(
+                PACKAGE_ROOT / CONFIG["grids"][grid_name]["grid_file"], grid_name
+            )
+        return self.grids[grid_name]
+
+    def save_grid(self, grid_name: str, folder: str | Path) -> Path:
+        """
+        Save a loaded grid index (tree and coordinate arrays) into a folder.
+
+        The arrays are stored as .npy files so they can be memory-mapped by
+        load_saved_grid without rebuilding the tree.
+
+        Returns the folder the index was written to.
+        """
+        if grid_name not in self.grids:
+            raise ValueError(f"Grid {grid_name} not loaded.")
+
+        folder = Path(folder)
+        folder.mkdir(parents=True, exist_ok=True)
+
+        tree, data, n, m, leafsize, maxes, mins, indices, boxsize, _ = self.grids[
+            grid_name
+        ].__getstate__()
+        if boxsize is not None:
+            raise ValueError("Saving periodic grids is not supported.")
+
+        arrays = dict(tree=tree, data=data, maxes=maxes, mins=mins, indices=indices)
+        for name in INDEX_ARRAYS:
+            np.save(folder / f"{name}.npy", np.ascontiguousarray(arrays[name]))
+
+        with open(folder / INDEX_META_FILE, "w") as file:
+            json.dump(
+                {"grid_name": grid_name, "n": n, "m": m, "leafsize": leafsize}, file
+            )
+
+        return folder
+
+    def load_saved_grid(
+        self,
+        folder: str | Path,
+        grid_name: str | None = None,
+        mmap_mode: str | None = "r",
+    ) -> None:
+        """
+        Load a grid index written by save_grid.
+
+        The grid is registered under the name it was saved with, unless
+        grid_name is given.
+
+        With mmap_mode "r" the coordinate arrays are memory-mapped, so worker
+        processes share the pages through the OS page cache.
         """
-        # Check if the file exists
-        if not Path(file).exists():
-            raise FileNotFoundError(f"File {file} does not exist.")
+        folder = Path(folder)
+        if not (folder / INDEX_META_FILE).exists():
+            raise FileNotFoundError(f"Grid index {folder} does not exist.")
 
-        # Load the grid data
-        df = pd.read_parquet(file)
+        with open(folder / INDEX_META_FILE, "r") as file:
+            meta = json.load(file)
+        grid_name = grid_name or meta["grid_name"]
 
-        # Extract coordinate points as a NumPy array.
-        points = df[["latitude", "longitude"]].values
+        arrays = {
+            name: np.load(folder / f"{name}.npy", mmap_mode=mmap_mode)
+            for name in INDEX_ARRAYS
+        }
 
-        # Build KDTree for fast nearest-neighbor lookup.
-        tree = cKDTree(points)
+        from scipy.spatial import cKDTree
+
+        tree = cKDTree.__new__(cKDTree)
+        tree.__setstate__(
+            (
+                arrays["tree"],
+                arrays["data"],
+                meta["n"],
+                meta["m"],
+                meta["leafsize"],
+                arrays["maxes"],
+                arrays["mins"],
+                arrays["indices"],
+                None,
+                None,
+            )
+        )
 
-        self.grids[grid_name] = tree
+        with self._lock:
+            self.grids[grid_name] = tree
 
     def query(
-        self, grid_name: str, latitude: float, longitude: float
-    ) -> tuple[np.ndarray, float]:
+        self,
+        grid_name: str,
+        latitude: float,
+        longitude: float,
+        return_index: bool = False,
+    ) -> tuple[np.ndarray, float] | tuple[np.ndarray, float, int]:
         """
         Query the grid for the nearest point to the given latitude and longitude.
 
-        Returns the coordinates of the nearest point and the distance to it.
+        Returns the coordinates of the nearest point and the distance to it, plus
+        the row position of the nearest point in the grid if return_index is True.
         """
         if grid_name not in self.grids:
             raise ValueError(f"Grid {grid_name} not loaded.")
@@ -63,6 +205,277 @@ class Grids(metaclass=SingletonMeta):
         distance, index = tree.query([latitude, longitude])
 
         # Convert the distance to np.float32 and return the coordinates of the nearest point.
-        return np.round(tree.data[index], decimals=1).astype(np.float32), np.float32(
-            distance
+        point = np.round(tree.data[index], decimals=1).astype(np.float32)
+        if return_index:
+            return point, np.float32(distance), int(index)
+        return point, np.float32(distance)
+
+    def query_many(
+        self,
+        grid_name: str,
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        return_index: bool = False,
+        workers: int = 1,
+    ) -> tuple[np.ndarray, np.ndarray] | tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Query the grid for the nearest points to arrays of latitudes and longitudes.
+
+        All points are snapped with a single KDTree query, split across workers
+        threads. Returns an (n, 2) array of the nearest points and an array of
+        distances, plus the row positions of the nearest points in the grid if
+        return_index is True.
+        """
+        if grid_name not in self.grids:
+            raise ValueError(f"Grid {grid_name} not loaded.")
+
+        tree = self.grids[grid_name]
+
+        distances, indices = tree.query(
+            np.column_stack([latitudes, longitudes]).astype(np.float64, copy=False),
+            workers=workers,
+        )
+
+        points = np.round(tree.data[indices], decimals=1).astype(np.float32)
+        distances = distances.astype(np.float32)
+        if return_index:
+            return points, distances, indices
+        return points, distances
+
+    def query_nearest(
+        self,
+        grid_name: str,
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        k: int,
+        workers: int = 1,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Query the grid for the k nearest points to arrays of latitudes and longitudes.
+
+        All points are searched with a single KDTree query, split across workers
+        threads. Returns an (n, k, 2) array of the nearest points, an (n, k) array
+        of distances and an (n, k) array of the row positions of the points in the
+        grid, nearest first.
+        """
+        if grid_name not in self.grids:
+            raise ValueError(f"Grid {grid_name} not loaded.")
+        if k < 1:
+            raise ValueError(f"k {k} must be positive.")
+
+        tree = self.grids[grid_name]
+
+        distances, indices = tree.query(
+            np.column_stack([latitudes, longitudes]).astype(np.float64, copy=False),
+            k=[*range(1, k + 1)],
+            workers=workers,
         )
+
+        points = np.round(tree.data[indices], decimals=1).astype(np.float32)
+        return points, distances.astype(np.float32), indices
+
+    def lattice(self, grid_name: str) -> tuple[float, float, float]:
+        """
+        The regular lattice the points of a grid lie on.
+
+        Returns:
+            tuple[float, float, float]: the smallest latitude and longitude of the
+                grid and the spacing in degrees between neighbouring points.
+        """
+        if grid_name not in self.grids:
+            raise ValueError(f"Grid {grid_name} not loaded.")
+
+        tree = self.grids[grid_name]
+        cached = self._lattices.get(grid_name)
+        if cached is not None and cached[0] is tree:
+            return cached[1]
+
+        latitudes = np.unique(np.round(tree.data[:, 0], decimals=4))
+        longitudes = np.unique(np.round(tree.data[:, 1], decimals=4))
+        spacing = float(np.diff(latitudes).min(initial=np.inf))
+        if len(longitudes) > 1:
+            spacing = min(spacing, float(np.diff(longitudes).min()))
+
+        lattice = (float(latitudes[0]), float(longitudes[0]), round(spacing, 4))
+        self._lattices[grid_name] = (tree, lattice)
+        return lattice
+
+    def build_raster(
+        self, grid_name: str, search_radius: float, factor: int = 1
+    ) -> SnapRaster:
+        """
+        Build the lookup raster of a grid for a search radius, see SnapRaster.
+
+        The raster is kept under (grid_name, search_radius, factor), replacing
+        any raster of the same key. With factor 1 the pixels are the grid cells,
+        25 MB for the 01x01 grid.
+        """
+        if grid_name not in self.grids:
+            raise ValueError(f"Grid {grid_name} not loaded.")
+
+        raster = SnapRaster.build(
+            self.grids[grid_name], self.lattice(grid_name), search_radius, factor
+        )
+        with self._raster_lock:
+            self.rasters[(grid_name, search_radius, factor)] = raster
+        return raster
+
+    def get_raster(
+        self, grid_name: str, search_radius: float, factor: int | None = None
+    ) -> SnapRaster:
+        """
+        Get the lookup raster of a grid for a search radius, building it on first use.
+
+        A raster built before or loaded with load_saved_raster is used if it was
+        built for the same grid and search radius, and the same factor unless
+        factor is None. Otherwise a raster is built, of factor 1 if None. Rasters
+        of other search radii or factors are kept.
+        """
+        if grid_name not in self.grids:
+            raise ValueError(f"Grid {grid_name} not loaded.")
+
+        n_points = len(self.grids[grid_name].data)
+        with self._raster_lock:
+            for (name, radius, raster_factor), raster in self.rasters.items():
+                if (
+                    name == grid_name
+                    and radius == search_radius
+                    and factor in (None, raster_factor)
+                    and raster.n_points == n_points
+                ):
+                    return raster
+            return self.build_raster(grid_name, search_radius, factor or 1)
+
+    def save_raster(
+        self,
+        grid_name: str,
+        search_radius: float,
+        folder: str | Path,
+        factor: int | None = None,
+    ) -> Path:
+        """
+        Save the lookup raster of a grid for a search radius into a folder, e.g. the one of save_grid.
+
+        The raster is the one get_raster returns, built if needed.
+
+        Returns the folder the raster was written to.
+        """
+        return self.get_raster(grid_name, search_radius, factor).save(folder, grid_name)
+
+    def load_saved_raster(
+        self,
+        folder: str | Path,
+        grid_name: str | None = None,
+        mmap_mode: str | None = "r",
+    ) -> SnapRaster:
+        """
+        Load a lookup raster written by save_raster.
+
+        The raster is registered under the grid it was saved with, unless
+        grid_name is given, and its search radius and factor. With mmap_mode "r"
+        it is memory-mapped, so worker processes share the pages through the OS
+        page cache.
+        """
+        raster, saved_name = SnapRaster.load(folder, mmap_mode=mmap_mode)
+        with self._raster_lock:
+            self.rasters[
+                (grid_name or saved_name, raster.search_radius, raster.factor)
+            ] = raster
+        return raster
+
+    def query_raster(
+        self,
+        grid_name: str,
+        raster: SnapRaster,
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        return_index: bool = False,
+        workers: int = 1,
+    ) -> tuple[np.ndarray, np.ndarray] | tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Query a lookup raster of a grid for the nearest points within its search radius.
+
+        Most points are snapped by indexing the raster, e.g. the one of
+        get_raster, only the points near a cell edge or the search radius are
+        queried in the KD-tree, split across workers threads. The results are
+        the same as query_many for the points within the search radius. The
+        other points have nan coordinates, an infinite distance and the row
+        position -1.
+        """
+        if grid_name not in self.grids:
+            raise ValueError(f"Grid {grid_name} not loaded.")
+
+        tree = self.grids[grid_name]
+        if raster.n_points != len(tree.data):
+            raise ValueError(f"Raster was not built for grid {grid_name}.")
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+
+        indices = raster.lookup(latitudes, longitudes).astype(np.intp)
+        refine = np.flatnonzero(indices == RASTER_REFINE)
+        if refine.size:
+            distances, nearest = tree.query(
+                np.column_stack([latitudes[refine], longitudes[refine]]),
+                workers=workers,
+            )
+            # the same check as the radius check of the queries
+            within = distances.astype(np.float32) <= raster.search_radius
+            indices[refine] = np.where(within, nearest, RASTER_NO_POINT)
+
+        found = np.flatnonzero(indices >= 0)
+        data = tree.data[indices[found]]
+        points = np.full((len(indices), 2), np.nan, dtype=np.float32)
+        points[found] = np.round(data, decimals=1)
+        distances = np.full(len(indices), np.inf, dtype=np.float32)
+        distances[found] = np.sqrt(
+            (latitudes[found] - data[:, 0]) ** 2 + (longitudes[found] - data[:, 1]) ** 2
+        )
+        if return_index:
+            return points, distances, indices
+        return points, distances
+
+    def query_box(
+        self,
+        grid_name: str,
+        lat_min: float,
+        lat_max: float,
+        lon_min: float,
+        lon_max: float,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Find the grid points in a latitude and longitude box, bounds included.
+
+        The box is searched with a single Chebyshev ball query, the smallest square
+        around the box, and the points outside the box are dropped. Returns an
+        (n, 2) array of the points and their row positions in the grid, in row
+        order.
+        """
+        if grid_name not in self.grids:
+            raise ValueError(f"Grid {grid_name} not loaded.")
+        if lat_min > lat_max or lon_min > lon_max:
+            raise ValueError(
+                f"Box ({lat_min}, {lat_max}, {lon_min}, {lon_max}) is empty."
+            )
+
+        tree = self.grids[grid_name]
+
+        indices = np.sort(
+            np.asarray(
+                tree.query_ball_point(
+                    [(lat_min + lat_max) / 2, (lon_min + lon_max) / 2],
+                    max(lat_max - lat_min, lon_max - lon_min) / 2 + BOX_TOLERANCE,
+                    p=np.inf,
+                ),
+                dtype=np.intp,
+            )
+        )
+        data = tree.data[indices]
+        inside = (
+            (data[:, 0] >= lat_min - BOX_TOLERANCE)
+            & (data[:, 0] <= lat_max + BOX_TOLERANCE)
+            & (data[:, 1] >= lon_min - BOX_TOLERANCE)
+            & (data[:, 1] <= lon_max + BOX_TOLERANCE)
+        )
+
+        points = np.round(data[inside], decimals=1).astype(np.float32)
+        return points, indices[inside]
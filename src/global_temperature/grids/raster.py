@@ -0,0 +1,275 @@
+import numpy as np
+from pathlib import Path
+from typing import TYPE_CHECKING
+import json
+import math
+
+
+if TYPE_CHECKING:
+    from scipy.spatial import cKDTree
+
+# file names used when a raster is saved to disk, next to the grid index files
+RASTER_META_FILE = "raster.json"
+RASTER_VALUES_FILE = "raster.npy"
+
+# the raster values that are not a row position in the grid
+RASTER_NO_POINT = -1  # no grid point within the search radius
+RASTER_REFINE = -2  # the nearest grid point is only known from the KD-tree
+_UNSET = -3
+
+# distance in degrees from the pixel edges and the search radius within which
+# the KD-tree decides, far larger than the floating point error of the distances
+RASTER_MARGIN = 1e-6
+
+
+class SnapRaster:
+    """
+    A dense lookup raster of the nearest grid point within a search radius.
+
+    The raster covers the grid, and the search radius around it, with square
+    pixels of factor x factor per grid cell, aligned with the cell edges. Each
+    pixel holds the row position of the grid point nearest to all of its
+    points, if they are all within the search radius, RASTER_NO_POINT if none
+    of them is within the search radius of any grid point, and RASTER_REFINE
+    otherwise, e.g. pixels crossed by the search radius or by the edge between
+    two nearest points on the coast.
+
+    A point is snapped by indexing the pixel it falls in. The points in
+    RASTER_REFINE pixels and within RASTER_MARGIN of a pixel edge, where the
+    nearest grid point can be a tie, are snapped with the KD-tree, so the
+    results are the same as Grids.query_many.
+    """
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        origin: tuple[float, float],
+        pixel_size: float,
+        search_radius: float,
+        factor: int,
+        n_points: int,
+    ) -> None:
+        """
+        Args:
+            values (np.ndarray): the (rows, columns) pixel values.
+            origin (tuple[float, float]): the latitude and longitude of the lower left corner of the first pixel.
+            pixel_size (float): the size of the pixels in degrees.
+            search_radius (float): the search radius in degrees the raster was built for.
+            factor (int): the number of pixels per grid spacing.
+            n_points (int): the number of points of the grid the raster was built for.
+        """
+        self.values = values
+        self.origin = origin
+        self.pixel_size = pixel_size
+        self.search_radius = search_radius
+        self.factor = factor
+        self.n_points = n_points
+
+    @classmethod
+    def build(
+        cls,
+        tree: "cKDTree",
+        lattice: tuple[float, float, float],
+        search_radius: float,
+        factor: int = 1,
+    ) -> "SnapRaster":
+        """
+        Build the raster of a grid on a regular lattice.
+
+        A pixel in the grid cell of a point is nearer to that point than to any
+        other point of the lattice, so it only needs the search radius checked,
+        which is the same for every pixel at the same place in its cell. The
+        other pixels, around the cells without a point, are checked with a
+        KD-tree query at their corners: the pixels whose corners share their
+        nearest point lie in its Voronoi cell, which is convex.
+
+        Args:
+            tree (cKDTree): the KD-tree of the grid.
+            lattice (tuple[float, float, float]): the lattice of the grid, see Grids.lattice.
+            search_radius (float): the search radius in degrees.
+            factor (int, optional): the number of pixels per grid spacing, more resolve more points near the search radius. Defaults to 1.
+        """
+        if search_radius < 0:
+            raise ValueError(f"Search radius {search_radius} is negative.")
+        if factor < 1:
+            raise ValueError(f"factor {factor} must be positive.")
+
+        lat0, lon0, spacing = lattice
+        pixel_size = spacing / factor
+        margin = RASTER_MARGIN
+
+        # the cells of the points, padded with the cells within the search radius
+        pad = math.ceil((search_radius + margin) / spacing) + 1
+        rows = np.rint((tree.data[:, 0] - lat0) / spacing).astype(np.intp) + pad
+        cols = np.rint((tree.data[:, 1] - lon0) / spacing).astype(np.intp) + pad
+        shape = ((rows.max() + 1 + pad) * factor, (cols.max() + 1 + pad) * factor)
+        origin = (
+            lat0 - spacing / 2 - pad * spacing,
+            lon0 - spacing / 2 - pad * spacing,
+        )
+        values = np.full(shape, _UNSET, dtype=np.int32)
+
+        # the pixels in the cells of the points
+        positions = np.arange(len(tree.data), dtype=np.int32)
+        for i in range(factor):
+            for j in range(factor):
+                lat_offset = max(
+                    abs(-spacing / 2 + i * pixel_size + margin),
+                    abs(-spacing / 2 + (i + 1) * pixel_size - margin),
+                )
+                lon_offset = max(
+                    abs(-spacing / 2 + j * pixel_size + margin),
+                    abs(-spacing / 2 + (j + 1) * pixel_size - margin),
+                )
+                if math.hypot(lat_offset, lon_offset) <= search_radius - margin:
+                    values[rows * factor + i, cols * factor + j] = positions
+
+        # the other pixels, far from every point first
+        pixel_rows, pixel_cols = np.nonzero(values == _UNSET)
+        centres = np.column_stack(
+            [
+                origin[0] + (pixel_rows + 0.5) * pixel_size,
+                origin[1] + (pixel_cols + 0.5) * pixel_size,
+            ]
+        )
+        distances, _ = tree.query(
+            centres,
+            distance_upper_bound=search_radius + pixel_size / math.sqrt(2) + margin,
+        )
+        far = np.isinf(distances)
+        values[pixel_rows[far], pixel_cols[far]] = RASTER_NO_POINT
+        pixel_rows, pixel_cols = pixel_rows[~far], pixel_cols[~far]
+
+        # the corners of the pixels, within the margin of their edges
+        lows = np.column_stack(
+            [
+                origin[0] + pixel_rows * pixel_size + margin,
+                origin[1] + pixel_cols * pixel_size + margin,
+            ]
+        )
+        highs = lows + pixel_size - 2 * margin
+        corners = np.stack(
+            [
+                lows,
+                np.column_stack([lows[:, 0], highs[:, 1]]),
+                np.column_stack([highs[:, 0], lows[:, 1]]),
+                highs,
+            ],
+            axis=1,
+        )
+        distances, indices = tree.query(corners.reshape(-1, 2), k=2)
+        distances = distances.reshape(-1, 4, 2)
+        indices = indices.reshape(-1, 4, 2)
+
+        # the squared distances to two points differ linearly across a pixel, so
+        # a pixel is within a Voronoi cell if its corners are, by a small margin
+        nearest = indices[:, 0, 0]
+        unique = (indices[:, :, 0] == nearest[:, None]).all(axis=1) & (
+            distances[:, :, 1] ** 2 - distances[:, :, 0] ** 2 > margin * 1e-3
+        ).all(axis=1)
+        within = unique & (distances[:, :, 0].max(axis=1) <= search_radius - margin)
+        points = tree.data[nearest]
+        gaps = np.maximum(np.maximum(lows - points, points - highs), 0)
+        outside = unique & (np.hypot(gaps[:, 0], gaps[:, 1]) > search_radius + margin)
+
+        values[pixel_rows, pixel_cols] = np.select(
+            [within, outside], [nearest, RASTER_NO_POINT], RASTER_REFINE
+        )
+        return cls(values, origin, pixel_size, search_radius, factor, len(tree.data))
+
+    def lookup(self, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        """
+        Look up the pixels of arrays of latitudes and longitudes.
+
+        Returns:
+            np.ndarray: the pixel values, RASTER_NO_POINT outside the raster and
+                RASTER_REFINE within RASTER_MARGIN of a pixel edge.
+        """
+        rows_float = (np.asarray(latitudes) - self.origin[0]) / self.pixel_size
+        cols_float = (np.asarray(longitudes) - self.origin[1]) / self.pixel_size
+        rows = np.floor(rows_float).astype(np.intp)
+        cols = np.floor(cols_float).astype(np.intp)
+
+        n_rows, n_cols = self.values.shape
+        inside = (rows >= 0) & (rows < n_rows) & (cols >= 0) & (cols < n_cols)
+        values = np.full(rows.shape, RASTER_NO_POINT, dtype=np.int32)
+        values[inside] = self.values[rows[inside], cols[inside]]
+
+        edge = RASTER_MARGIN / self.pixel_size
+        rows_float -= rows
+        cols_float -= cols
+        near_edge = (
+            (rows_float < edge)
+            | (rows_float > 1 - edge)
+            | (cols_float < edge)
+            | (cols_float > 1 - edge)
+        )
+        values[inside & near_edge] = RASTER_REFINE
+        return values
+
+    def save(self, folder: str | Path, grid_name: str) -> Path:
+        """
+        Save the raster into a folder, e.g. the one of Grids.save_grid.
+
+        Returns the folder the raster was written to.
+        """
+        folder = Path(folder)
+        folder.mkdir(parents=True, exist_ok=True)
+        np.save(folder / RASTER_VALUES_FILE, self.values)
+        with open(folder / RASTER_META_FILE, "w") as file:
+            json.dump(
+                {
+                    "grid_name": grid_name,
+                    "origin": list(self.origin),
+                    "pixel_size": self.pixel_size,
+                    "search_radius": self.search_radius,
+                    "factor": self.factor,
+                    "n_points": self.n_points,
+                },
+                file,
+            )
+        return folder
+
+    @classmethod
+    def load(
+        cls, folder: str | Path, mmap_mode: str | None = "r"
+    ) -> tuple["SnapRaster", str]:
+        """
+        Load a raster written by save.
+
+        Returns:
+            tuple[SnapRaster, str]: the raster and the name of its grid.
+        """
+        folder = Path(folder)
+        if not (folder / RASTER_META_FILE).exists():
+            raise FileNotFoundError(f"Raster {folder} does not exist.")
+
+        with open(folder / RASTER_META_FILE, "r") as file:
+            meta = json.load(file)
+        values = np.load(folder / RASTER_VALUES_FILE, mmap_mode=mmap_mode)
+        raster = cls(
+            values,
+            tuple(meta["origin"]),
+            meta["pixel_size"],
+            meta["search_radius"],
+            meta["factor"],
+            meta["n_points"],
+        )
+        return raster, meta["grid_name"]
+
+    def stats(self) -> dict:
+        """
+        Get the share of the pixels of each kind.
+
+        Returns:
+            dict: A dictionary containing pixels, points, no_point and refine.
+        """
+        size = self.values.size
+        refine = int(np.count_nonzero(self.values == RASTER_REFINE))
+        no_point = int(np.count_nonzero(self.values == RASTER_NO_POINT))
+        return {
+            "pixels": size,
+            "points": (size - refine - no_point) / size,
+            "no_point": no_point / size,
+            "refine": refine / size,
+        }
@@ -0,0 +1,130 @@
+from collections import defaultdict
+from time import perf_counter
+from typing import Callable
+import threading
+
+
+# the stages of a query, in order
+STAGES = ("validate", "snap", "geohash", "cache_lookup", "load", "cell_lookup")
+
+
+class _Timer:
+    """time a block and record it as a stage when it exits"""
+
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, metrics: "Metrics", stage: str) -> None:
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self) -> "_Timer":
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.metrics.record(self.stage, perf_counter() - self.start)
+
+
+class _NullTimer:
+    """the timer of disabled metrics, does nothing"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """
+    Per-stage timers and counters.
+
+    When disabled, timer() returns a shared no-op context manager and increment()
+    returns immediately, so instrumented code costs a method call per stage.
+
+    Hooks are called synchronously with (name, value) for every recorded event:
+    ("stage.<stage>", seconds) for timers and ("<counter>", amount) for counters.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        """
+        Args:
+            enabled (bool, optional): whether to record anything. Defaults to False.
+        """
+        self.enabled = enabled
+        self._seconds = defaultdict(float)
+        self._calls = defaultdict(int)
+        self._counters = defaultdict(int)
+        self._hooks = []
+        self._lock = threading.Lock()
+
+    def timer(self, stage: str) -> _Timer | _NullTimer:
+        """a context manager recording the time spent in a stage"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, stage)
+
+    def record(self, stage: str, seconds: float) -> None:
+        """record the time spent in a stage"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._seconds[stage] += seconds
+            self._calls[stage] += 1
+        for hook in self._hooks:
+            hook(f"stage.{stage}", seconds)
+
+    def increment(self, counter: str, amount: int = 1) -> None:
+        """increase a counter"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[counter] += amount
+        for hook in self._hooks:
+            hook(counter, amount)
+
+    def add_hook(self, hook: Callable[[str, float], None]) -> None:
+        """call hook(name, value) on every recorded event"""
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook: Callable[[str, float], None]) -> None:
+        """stop calling a hook"""
+        self._hooks.remove(hook)
+
+    def snapshot(self) -> dict:
+        """
+        Get the recorded values.
+
+        Returns:
+            dict: A dictionary containing:
+                - stages (dict): calls, total seconds and mean milliseconds of each stage.
+                - counters (dict): the value of each counter.
+        """
+        with self._lock:
+            return {
+                "stages": {
+                    stage: {
+                        "calls": self._calls[stage],
+                        "seconds": self._seconds[stage],
+                        "mean_ms": 1000 * self._seconds[stage] / self._calls[stage],
+                    }
+                    for stage in sorted(self._calls, key=_stage_order)
+                },
+                "counters": dict(self._counters),
+            }
+
+    def reset(self) -> None:
+        """set all the timers and counters to zero"""
+        with self._lock:
+            self._seconds.clear()
+            self._calls.clear()
+            self._counters.clear()
+
+
+def _stage_order(stage: str) -> int:
+    return STAGES.index(stage) if stage in STAGES else len(STAGES)
@@ -0,0 +1,110 @@
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable
+import threading
+import logging
+import pygeohash as pgh
+
+
+logger = logging.getLogger(__name__)
+
+GEOHASH_DIRECTIONS = ("top", "bottom", "left", "right")
+
+
+class Prefetcher:
+    """
+    Load neighbouring partitions in the background.
+
+    After a query on (year, month, geohash), the previous and next months (up to
+    depth months away) and the adjacent geohash cells of the same month are
+    submitted to a thread pool. Scheduling never blocks: partitions that are
+    already pending are skipped, and new ones are dropped once max_pending
+    loads are waiting or after shutdown.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[int, int, str], None],
+        depth: int = 1,
+        max_workers: int = 2,
+        max_pending: int = 16,
+    ) -> None:
+        """
+        Args:
+            load (Callable[[int, int, str], None]): loads a partition given year, month and geohash.
+            depth (int, optional): the number of months to prefetch before and after the queried month. Defaults to 1.
+            max_workers (int, optional): the number of loader threads. Defaults to 2.
+            max_pending (int, optional): the maximum number of scheduled loads not finished yet. Defaults to 16.
+        """
+        if depth < 0:
+            raise ValueError(f"Prefetch depth {depth} is negative.")
+        if max_workers < 1 or max_pending < 1:
+            raise ValueError("Prefetch max_workers and max_pending must be positive.")
+
+        self.load = load
+        self.depth = depth
+        self.max_pending = max_pending
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="prefetch"
+        )
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.scheduled = 0
+        self.dropped = 0
+
+    def neighbours(self, year: int, month: int, geohash: str) -> list[tuple]:
+        """the partitions to prefetch after a query, nearest first"""
+        keys = []
+        for offset in range(1, self.depth + 1):
+            for step in (offset, -offset):
+                index = year * 12 + month - 1 + step
+                keys.append((index // 12, index % 12 + 1, geohash))
+
+        for direction in GEOHASH_DIRECTIONS:
+            try:
+                keys.append((year, month, pgh.get_adjacent(geohash, direction)))
+            except ValueError:
+                # there is no cell beyond the poles
+                continue
+        return keys
+
+    def schedule(self, year: int, month: int, geohash: str) -> None:
+        """schedule the neighbours of a partition, without blocking"""
+        for key in self.neighbours(year, month, geohash):
+            with self._lock:
+                if self._closed:
+                    return
+                if key in self._pending:
+                    continue
+                if len(self._pending) >= self.max_pending:
+                    self.dropped += 1
+                    continue
+                future = self._executor.submit(self._run, key)
+                self._pending[key] = future
+                self.scheduled += 1
+
+    def wait(self, timeout: float | None = None) -> None:
+        """wait for the scheduled loads to finish"""
+        with self._lock:
+            futures = list(self._pending.values())
+        wait(futures, timeout=timeout)
+
+    def shutdown(self) -> None:
+        """stop the loader threads, loads not started yet are cancelled and later schedules ignored"""
+        with self._lock:
+            self._closed = True
+            # the cancelled loads never run, so they never leave _pending
+            self._pending.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, key: tuple) -> None:
+        try:
+            self.load(*key)
+        except Exception as e:
+            # a prefetch failure must never affect queries
+            logger.debug("Prefetching %s failed: %s", key, e)
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
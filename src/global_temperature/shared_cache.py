@@ -0,0 +1,257 @@
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Hashable, Iterator
+from uuid import uuid4
+import logging
+import os
+import shutil
+import numpy as np
+from .grids.grid import Grids, INDEX_META_FILE
+
+
+logger = logging.getLogger(__name__)
+
+# the lock file of a shared cache folder, held while entries are published or evicted
+LOCK_FILE = ".lock"
+# prefixes of the entries being written and being deleted, never read
+TEMPORARY_PREFIX = ".tmp-"
+TRASH_PREFIX = ".trash-"
+
+
+class SharedUnitStore:
+    """
+    Arrays shared by processes as memory-mapped .npy files in a folder.
+
+    Every process that opens the same folder, e.g. the workers of a web server,
+    maps the same files, so a partition decoded by one process is read by the
+    others without decoding or copying it: the pages are shared through the OS
+    page cache. Put the folder on a RAM-backed file system such as /dev/shm to
+    keep the pages out of the disk.
+
+    Protocol:
+        - An entry is written into a temporary folder named after the pid of its
+          writer and renamed into place, so readers only ever see complete
+          entries. If two processes publish the same key, the first one wins.
+        - Entries are never modified. A read touches the modification time of
+          its entry, which orders the entries by last use across processes.
+        - When the entries exceed max_bytes, the least recently used ones are
+          renamed away and deleted, under an exclusive lock of the folder.
+          Processes that still map a deleted entry keep reading it until they
+          drop their arrays, new reads miss and publish it again.
+        - The lock is a flock, released by the OS if its holder dies, and the
+          temporary folders of dead processes are deleted when a store is opened
+          and on each eviction, so a crashed process leaves nothing behind.
+
+    Files are used rather than multiprocessing.shared_memory blocks, which are
+    unlinked by the resource tracker of the process that created them when it
+    exits, and leak if it is killed.
+    """
+
+    def __init__(self, folder: str | Path, max_bytes: int | None = None) -> None:
+        """
+        Args:
+            folder (str | Path): the folder shared by the processes.
+            max_bytes (int | None, optional): the maximum total size of the entries in bytes. None means no limit. Defaults to None.
+        """
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError(f"max_bytes {max_bytes} is negative.")
+
+        self.folder = Path(folder)
+        self.max_bytes = max_bytes
+        self.partitions = self.folder / "partitions"
+        self.grids = self.folder / "grids"
+        self.partitions.mkdir(parents=True, exist_ok=True)
+        self.grids.mkdir(parents=True, exist_ok=True)
+
+        self.cleanup()
+
+    @staticmethod
+    def entry_name(key: Hashable) -> str:
+        """the folder name of a key, e.g. 2024-01-r for (2024, 1, "r")"""
+        if isinstance(key, tuple) and len(key) == 3:
+            year, month, geohash = key
+            return f"{int(year)}-{int(month):02d}-{geohash}"
+        return str(key)
+
+    def get(self, key: Hashable) -> dict[str, np.ndarray] | None:
+        """
+        Map the arrays of an entry.
+
+        Returns:
+            dict[str, np.ndarray] | None: the read-only memory-mapped arrays, None if there is no entry.
+        """
+        entry = self.partitions / self.entry_name(key)
+        try:
+            arrays = {
+                file.stem: np.load(file, mmap_mode="r") for file in entry.glob("*.npy")
+            }
+            os.utime(entry)
+        except FileNotFoundError:
+            # evicted by another process while reading
+            return None
+        return arrays or None
+
+    def put(
+        self, key: Hashable, arrays: dict[str, np.ndarray]
+    ) -> dict[str, np.ndarray]:
+        """
+        Publish the arrays of an entry, evicting other entries above max_bytes.
+
+        Returns:
+            dict[str, np.ndarray]: the memory-mapped arrays of the entry, which may
+                have been published by another process first. The given arrays if
+                the entry could not be mapped.
+        """
+        name = self.entry_name(key)
+        temporary = self.partitions / f"{TEMPORARY_PREFIX}{os.getpid()}-{uuid4().hex}"
+        temporary.mkdir()
+        try:
+            for array_name, array in arrays.items():
+                np.save(temporary / f"{array_name}.npy", np.ascontiguousarray(array))
+            try:
+                os.rename(temporary, self.partitions / name)
+            except OSError:
+                # another process published the entry first
+                logger.debug("Shared entry %s already published", name)
+        finally:
+            shutil.rmtree(temporary, ignore_errors=True)
+
+        if self.max_bytes is not None:
+            self.evict(keep=name)
+        return self.get(key) or arrays
+
+    def __contains__(self, key: Hashable) -> bool:
+        return (self.partitions / self.entry_name(key)).is_dir()
+
+    def entries(self) -> list[tuple[str, int, float]]:
+        """the name, size in bytes and last use of each entry, the least recently used first"""
+        entries = []
+        for entry in self.partitions.iterdir():
+            if entry.name.startswith((TEMPORARY_PREFIX, TRASH_PREFIX)):
+                continue
+            try:
+                size = sum(file.stat().st_size for file in entry.iterdir())
+                entries.append((entry.name, size, entry.stat().st_mtime))
+            except FileNotFoundError:
+                continue
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def evict(self, keep: str | None = None) -> int:
+        """
+        Delete the least recently used entries until the entries fit in max_bytes.
+
+        Args:
+            keep (str | None, optional): the name of an entry not to evict, e.g. the one just published. Defaults to None.
+
+        Returns:
+            int: the number of entries evicted.
+        """
+        evicted = 0
+        with self._lock():
+            self.cleanup()
+            entries = self.entries()
+            total = sum(size for _, size, _ in entries)
+            for name, size, _ in entries:
+                if self.max_bytes is None or total <= self.max_bytes:
+                    break
+                if name == keep:
+                    continue
+                self._remove(self.partitions / name)
+                total -= size
+                evicted += 1
+        if evicted:
+            logger.debug("Evicted %s shared entries from %s", evicted, self.folder)
+        return evicted
+
+    def clear(self) -> None:
+        """delete all the entries"""
+        with self._lock():
+            for name, _, _ in self.entries():
+                self._remove(self.partitions / name)
+
+    def stats(self) -> dict:
+        """
+        Get the size of the store.
+
+        Returns:
+            dict: A dictionary containing entries and bytes.
+        """
+        entries = self.entries()
+        return {
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+        }
+
+    def cleanup(self) -> None:
+        """delete the temporary folders of dead processes and the leftovers of evictions"""
+        for parent in (self.partitions, self.grids):
+            for entry in parent.iterdir():
+                if entry.name.startswith(TRASH_PREFIX) or (
+                    entry.name.startswith(TEMPORARY_PREFIX)
+                    and not _is_alive(entry.name)
+                ):
+                    shutil.rmtree(entry, ignore_errors=True)
+
+    def attach_grid(self, grid_name: str) -> None:
+        """
+        Load a grid from the store, publishing it first if needed.
+
+        The first process builds the KD-tree and saves it with Grids.save_grid,
+        the others load it with Grids.load_saved_grid, so every process maps the
+        same tree and coordinate arrays.
+        """
+        folder = self.grids / grid_name
+        grid = Grids()
+        if not (folder / INDEX_META_FILE).exists():
+            grid.get_grid(grid_name)
+            temporary = self.grids / f"{TEMPORARY_PREFIX}{os.getpid()}-{uuid4().hex}"
+            try:
+                grid.save_grid(grid_name, temporary)
+                os.rename(temporary, folder)
+            except OSError:
+                logger.debug("Shared grid %s already published", grid_name)
+            finally:
+                shutil.rmtree(temporary, ignore_errors=True)
+
+        # a grid already mapped from the store is not loaded again
+        tree = grid.grids.get(grid_name)
+        filename = getattr(getattr(tree, "data", None), "filename", None)
+        if filename is None or Path(filename).resolve().parent != folder.resolve():
+            grid.load_saved_grid(folder, grid_name)
+
+    def _remove(self, entry: Path) -> None:
+        # renaming first hides the entry from readers at once
+        trash = entry.with_name(f"{TRASH_PREFIX}{uuid4().hex}")
+        try:
+            os.rename(entry, trash)
+        except FileNotFoundError:
+            return
+        shutil.rmtree(trash, ignore_errors=True)
+
+    @contextmanager
+    def _lock(self) -> Iterator[None]:
+        # fcntl is POSIX only, it is imported when a store is first locked
+        import fcntl
+
+        with open(self.folder / LOCK_FILE, "a") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+
+def _is_alive(name: str) -> bool:
+    """whether the process that wrote a temporary folder is still running"""
+    try:
+        pid = int(name[len(TEMPORARY_PREFIX) :].split("-")[0])
+    except ValueError:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # a process of another user
+        return True
+    return True
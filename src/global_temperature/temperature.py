@@ -24,6 +24,25 @@ class TemperatureFactory:
         geohash_precision: int = 1,
         max_cache_size: int = 200,
         grid_name: str = "01x01",
+        max_cache_bytes: int | None = None,
+        cache_policy: str = "lru",
+        cube_file: str | Path | None = None,
+        loader: str = "pandas",
+        partial_load: bool = False,
+        validation: str = "fast",
+        prefetch: bool = False,
+        prefetch_depth: int = 1,
+        prefetch_workers: int = 2,
+        max_concurrent_loads: int = 4,
+        metrics: bool = False,
+        workers: int = 0,
+        climatology_file: str | Path | None = None,
+        shared_cache: str | Path | None = None,
+        shared_cache_bytes: int | None = None,
+        disk_cache: str | Path | None = None,
+        disk_cache_check: str = "mtime",
+        snap_raster: bool = False,
+        cache_stripes: int = 1,
     ) -> TemperatureMonthly: ...
 
     @staticmethod
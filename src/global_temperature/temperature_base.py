@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from .grids.grid import Grids
-from .config import load_config, PACKAGE_ROOT
+from .config import load_config
 from pathlib import Path
 import numpy as np
 import logging
@@ -9,6 +9,11 @@ import logging
 CONFIG = load_config()
 logger = logging.getLogger(__name__)
 
+# Per-row status codes returned by batch queries
+STATUS_OK = 0
+STATUS_NO_NEARBY_POINT = 1
+STATUS_NOT_FOUND = 2
+
 
 class TemperatureBase(ABC):
     """
@@ -21,23 +26,111 @@ class TemperatureBase(ABC):
         pass
 
     def snap(
-        self, latitude: float, longitude: float, grid_name: str = "03x03"
-    ) -> tuple[np.ndarray, float]:
+        self,
+        latitude: float,
+        longitude: float,
+        grid_name: str = "03x03",
+        return_index: bool = False,
+    ) -> tuple[np.ndarray, float] | tuple[np.ndarray, float, int]:
         """
         Snap the latitude and longitude to the nearest grid point.
+
+        If return_index is True, the row position of the grid point is also returned.
         """
-        # create a grid instance
+        # get the grid instance, the grid is only loaded on first use
         grid = Grids()
-        grid.load_grid(
-            (PACKAGE_ROOT / CONFIG["grids"][grid_name]["grid_file"]).resolve(),
+        grid.get_grid(CONFIG["grids"][grid_name]["grid_name"])
+
+        # snap to the nearest grid point
+        return grid.query(
             CONFIG["grids"][grid_name]["grid_name"],
+            latitude,
+            longitude,
+            return_index=return_index,
         )
 
-        # snap to the nearest grid point
-        point, distance = grid.query(
-            CONFIG["grids"][grid_name]["grid_name"], latitude, longitude
+    def snap_many(
+        self,
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        grid_name: str = "03x03",
+        return_index: bool = False,
+        workers: int = 1,
+    ) -> tuple[np.ndarray, np.ndarray] | tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Snap arrays of latitudes and longitudes to the nearest grid points.
+
+        If return_index is True, the row positions of the grid points are also returned.
+        The KDTree query is split across workers threads.
+        """
+        grid = Grids()
+        grid.get_grid(CONFIG["grids"][grid_name]["grid_name"])
+
+        # snap all the points with a single query
+        return grid.query_many(
+            CONFIG["grids"][grid_name]["grid_name"],
+            latitudes,
+            longitudes,
+            return_index=return_index,
+            workers=workers,
+        )
+
+    def snap_many_raster(
+        self,
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        search_radius: float,
+        grid_name: str = "03x03",
+        return_index: bool = False,
+        workers: int = 1,
+    ) -> tuple[np.ndarray, np.ndarray] | tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Snap arrays of latitudes and longitudes with the lookup raster of the grid.
+
+        Same as snap_many for the points within the search radius, the other
+        points have nan coordinates, an infinite distance and the row position -1.
+        The raster is built on first use, see Grids.get_raster.
+        """
+        grid = Grids()
+        grid_name = CONFIG["grids"][grid_name]["grid_name"]
+        grid.get_grid(grid_name)
+        raster = grid.get_raster(grid_name, search_radius)
+
+        # snap the points by indexing the raster, the KD-tree only near cell edges
+        return grid.query_raster(
+            grid_name,
+            raster,
+            latitudes,
+            longitudes,
+            return_index=return_index,
+            workers=workers,
+        )
+
+    def snap_nearest(
+        self,
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        k: int,
+        grid_name: str = "03x03",
+        workers: int = 1,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Find the k nearest grid points of arrays of latitudes and longitudes.
+
+        Returns the (n, k, 2) points, their (n, k) distances and their (n, k) row
+        positions in the grid, nearest first.
+        """
+        grid = Grids()
+        grid.get_grid(CONFIG["grids"][grid_name]["grid_name"])
+
+        # search all the points with a single query
+        return grid.query_nearest(
+            CONFIG["grids"][grid_name]["grid_name"],
+            latitudes,
+            longitudes,
+            k,
+            workers=workers,
         )
-        return point, distance
 
 
 class TemperatureUnitBase(ABC):
@@ -1,19 +1,103 @@
-from .temperature_base import TemperatureBase, TemperatureUnitBase
+from .temperature_base import (
+    TemperatureBase,
+    TemperatureUnitBase,
+    STATUS_OK,
+    STATUS_NO_NEARBY_POINT,
+    STATUS_NOT_FOUND,
+)
 from pathlib import Path
 import pandas as pd
 import logging
 from .tools import validate as vd
-from collections import OrderedDict
+from .tools import geohash as gh
+from .tools import region
+from .cache import UnitCache, StripedUnitCache
+from .cell_index import CellIndex
+from .cube import TemperatureCube
+from .climatology import Climatology
+from .shared_cache import SharedUnitStore
+from .disk_cache import DiskUnitCache
+from .grids.grid import Grids
+from .prefetch import Prefetcher
+from .executor import PartitionExecutor
+from .metrics import Metrics
+from concurrent.futures import Future, ThreadPoolExecutor
+import asyncio
+import threading
+import weakref
+from datetime import date
 import pygeohash as pgh
 import numpy as np
 from .config import load_config, PACKAGE_ROOT
-import pandera as pa
-from pandera import Column, Check
+import pyarrow
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import functools
+from typing import TYPE_CHECKING
 
 
 logger = logging.getLogger(__name__)
 CONFIG = load_config()
 
+if TYPE_CHECKING:
+    import pandera as pa
+
+LOADERS = ("pandas", "arrow")
+# the columns read by the arrow loader, the other columns are constant in a partition
+ARROW_COLUMNS = ["latitude", "longitude", "temperature_celsius_mean"]
+# margin in degrees around the requested points when reading partial partitions
+PARTIAL_LOAD_MARGIN = 0.05
+
+# the estimates of query_interpolated_many
+INTERPOLATION_METHODS = ("bilinear", "idw")
+
+# "full" validates with pandera, "fast" checks the Arrow schema and value ranges, "trusted" skips validation
+VALIDATION_MODES = ("full", "fast", "trusted")
+
+# the Arrow types accepted by the "fast" validation
+MONTHLY_COLUMN_TYPES = {
+    "date": lambda dtype: pyarrow.types.is_timestamp(dtype)
+    or pyarrow.types.is_null(dtype),
+    "longitude": lambda dtype: dtype == pyarrow.float64(),
+    "latitude": lambda dtype: dtype == pyarrow.float64(),
+    "temperature_celsius_mean": lambda dtype: dtype == pyarrow.float32(),
+    "geohash_l1": lambda dtype: pyarrow.types.is_string(dtype)
+    or pyarrow.types.is_large_string(dtype),
+}
+
+
+@functools.cache
+def monthly_schema() -> "pa.DataFrameSchema":
+    """The pandera schema of a monthly partition, built once and shared."""
+    # pandera is slow to import and only used by the "full" validation
+    import pandera as pa
+    from pandera import Column, Check
+
+    return pa.DataFrameSchema(
+        {
+            "date": Column(pa.DateTime, nullable=True),
+            "longitude": Column(
+                pa.Float64,
+                checks=[Check.in_range(-180.0, 180.0, error="Longitude out of range")],
+                nullable=False,
+            ),
+            "latitude": Column(
+                pa.Float64,
+                checks=[Check.in_range(-90.0, 90.0, error="Latitude out of range")],
+                nullable=False,
+            ),
+            "temperature_celsius_mean": Column(pa.Float32, nullable=True),
+            "geohash_l1": Column(
+                pa.String,
+                # level‑1 geohash is one character
+                Check.str_length(1),
+                nullable=False,
+            ),
+        },
+        # Attempts to coerce dtypes to the defined types if possible
+        coerce=False,
+    )
+
 
 class TemperatureMonthly(TemperatureBase):
     def __init__(
@@ -23,6 +107,25 @@ class TemperatureMonthly(TemperatureBase):
         geohash_precision: int = 1,
         max_cache_size: int = 200,
         grid_name: str = "01x01",
+        max_cache_bytes: int | None = None,
+        cache_policy: str = "lru",
+        cube_file: str | Path | None = None,
+        loader: str = "pandas",
+        partial_load: bool = False,
+        validation: str = "fast",
+        prefetch: bool = False,
+        prefetch_depth: int = 1,
+        prefetch_workers: int = 2,
+        max_concurrent_loads: int = 4,
+        metrics: bool = False,
+        workers: int = 0,
+        climatology_file: str | Path | None = None,
+        shared_cache: str | Path | None = None,
+        shared_cache_bytes: int | None = None,
+        disk_cache: str | Path | None = None,
+        disk_cache_check: str = "mtime",
+        snap_raster: bool = False,
+        cache_stripes: int = 1,
     ) -> None:
         """Hold monthly temperature data
 
@@ -34,9 +137,29 @@ class TemperatureMonthly(TemperatureBase):
             geohash_precision (int, optional): the geohash precision used to partition the data. Defaults to 1.
             max_cache_size (int, optional): the maximum size of monthly data to cache in memory. Defaults to 200.
             grid_name (str, optional): the name of the grid. Defaults to "01x01".
+            max_cache_bytes (int | None, optional): the maximum total size in bytes of the monthly data cached in memory. None means no limit. Defaults to None.
+            cache_policy (str, optional): the cache eviction policy, one of "lru", "lfu" or "size". Defaults to "lru".
+            cube_file (str | Path | None, optional): the path of a cube file written by tools.compact.compact. If given, queries read the memory-mapped cube instead of the parquet partitions. Defaults to None.
+            loader (str, optional): how partitions are loaded, "pandas" reads all the columns into a DataFrame, "arrow" reads only latitude, longitude and temperature into NumPy arrays. Defaults to "pandas".
+            partial_load (bool, optional): read only the rows near the requested points using parquet filters and row group statistics, requires the "arrow" loader. Partially loaded partitions are not cached. Defaults to False.
+            validation (str, optional): how loaded partitions are validated, "full" runs pandera, "fast" checks the column types and value ranges, "trusted" skips validation. Defaults to "fast".
+            prefetch (bool, optional): after each query, load the previous and next months and the adjacent geohash cells into the cache in background threads. Defaults to False.
+            prefetch_depth (int, optional): the number of months before and after the queried month to prefetch. Defaults to 1.
+            prefetch_workers (int, optional): the number of prefetch threads. Defaults to 2.
+            max_concurrent_loads (int, optional): the maximum number of partitions aquery and aquery_many read from disk at the same time, per event loop. Defaults to 4.
+            metrics (bool, optional): record per-stage timers and counters, see metrics_snapshot and add_metrics_hook. Defaults to False.
+            workers (int, optional): the number of worker processes query_many loads the partitions not cached yet in, see PartitionExecutor, and of the threads it snaps the points with. The worker processes are started by the first batch that needs them. 0 loads the partitions in the querying process. Defaults to 0.
+            climatology_file (str | Path | None, optional): the path of a climatology file written by tools.climatology.compute_climatology, the baseline of query_anomaly and query_anomaly_many. Defaults to None.
+            shared_cache (str | Path | None, optional): a folder where the grid and the decoded partitions are shared with the other processes using the same folder, see SharedUnitStore. Requires the "arrow" loader. Defaults to None.
+            shared_cache_bytes (int | None, optional): the maximum total size in bytes of the partitions in shared_cache. None means no limit. Defaults to None.
+            disk_cache (str | Path | None, optional): a folder where partitions are kept after their first load as uncompressed Arrow IPC files, which later loads memory-map instead of reading the parquet files, see DiskUnitCache. Requires the "arrow" loader. Defaults to None.
+            disk_cache_check (str, optional): how the files of disk_cache are checked against their parquet files, "mtime" (size and modification time) or "checksum" (also SHA-256). Defaults to "mtime".
+            cache_stripes (int, optional): the number of independently locked stripes of the cache, see StripedUnitCache. More than 1 lets threads sharing the instance look up partitions without waiting for each other, and each stripe evicts on its own with its share of max_cache_size and max_cache_bytes. Defaults to 1.
+            snap_raster (bool, optional): snap the points of query_many with the lookup raster of the grid for the search radius, built on first use or loaded with Grids.load_saved_raster, see SnapRaster. The KD-tree is only queried for the points near a cell edge or the search radius. Defaults to False.
         """
         super().__init__()
         self.search_radius = search_radius
+        self.snap_raster = snap_raster
 
         # set default source folder
         self.source_folder = source_folder
@@ -45,14 +168,111 @@ class TemperatureMonthly(TemperatureBase):
 
         self.geohash_precision = geohash_precision
         self.max_cache_size = max_cache_size
+        self.max_cache_bytes = max_cache_bytes
+        self.cache_policy = cache_policy
+
+        # timers and counters, which do nothing unless enabled
+        self.metrics = Metrics(enabled=metrics)
 
-        # create a variable to hold all the monthly temperature data in order
-        self.units = OrderedDict()
+        # create a cache to hold the loaded monthly temperature data
+        if cache_stripes > 1:
+            self.units = StripedUnitCache(
+                max_entries=max_cache_size,
+                max_bytes=max_cache_bytes,
+                policy=cache_policy,
+                on_evict=lambda key: self.metrics.increment("cache_evictions"),
+                stripes=cache_stripes,
+            )
+        elif cache_stripes == 1:
+            self.units = UnitCache(
+                max_entries=max_cache_size,
+                max_bytes=max_cache_bytes,
+                policy=cache_policy,
+                on_evict=lambda key: self.metrics.increment("cache_evictions"),
+            )
+        else:
+            raise ValueError(f"cache_stripes {cache_stripes} must be positive.")
+        # the loads in progress in threads, so a partition is loaded once
+        self._loads = {}
+        self._loads_lock = threading.Lock()
 
         self.grid_name = grid_name
 
+        if loader not in LOADERS:
+            raise ValueError(f"Unsupported loader: {loader}. Use one of {LOADERS}.")
+        if partial_load and loader != "arrow":
+            raise ValueError("partial_load requires the arrow loader.")
+        self.loader = loader
+        self.partial_load = partial_load
+
+        if validation not in VALIDATION_MODES:
+            raise ValueError(
+                f"Unsupported validation mode: {validation}. Use one of {VALIDATION_MODES}."
+            )
+        self.validation = validation
+
+        # optional memory-mapped cube backend
+        self.cube = None
+        if cube_file is not None:
+            self.cube = TemperatureCube(cube_file)
+            if self.cube.grid_name != grid_name:
+                raise ValueError(
+                    f"Cube {cube_file} is on grid {self.cube.grid_name}, not {grid_name}."
+                )
+
+        # optional baseline of the anomaly queries
+        self.climatology = None
+        if climatology_file is not None:
+            self.climatology = Climatology(climatology_file)
+            if self.climatology.grid_name != grid_name:
+                raise ValueError(
+                    f"Climatology {climatology_file} is on grid {self.climatology.grid_name}, not {grid_name}."
+                )
+
+        # optional partitions and grid shared with other processes
+        self.shared_cache = None
+        if shared_cache is not None:
+            if loader != "arrow":
+                raise ValueError("shared_cache requires the arrow loader.")
+            self.shared_cache = SharedUnitStore(shared_cache, shared_cache_bytes)
+            self.shared_cache.attach_grid(CONFIG["grids"][grid_name]["grid_name"])
+
+        # optional second cache tier of decoded partitions on local disk
+        self.disk_cache = None
+        if disk_cache is not None:
+            if loader != "arrow":
+                raise ValueError("disk_cache requires the arrow loader.")
+            self.disk_cache = DiskUnitCache(disk_cache, disk_cache_check)
+
+        # optional background loading of neighbouring partitions
+        self.prefetcher = None
+        if prefetch:
+            if self.cube is not None or partial_load:
+                raise ValueError(
+                    "prefetch is not supported with cube_file or partial_load."
+                )
+            self.prefetcher = Prefetcher(
+                self.prefetch_unit, depth=prefetch_depth, max_workers=prefetch_workers
+            )
+
+        if max_concurrent_loads < 1:
+            raise ValueError(
+                f"max_concurrent_loads {max_concurrent_loads} must be positive."
+            )
+        self.max_concurrent_loads = max_concurrent_loads
+        # asyncio primitives are bound to an event loop, keep one set per loop
+        self._async_states = weakref.WeakKeyDictionary()
+        self._async_lock = threading.Lock()
+
+        if workers < 0:
+            raise ValueError(f"workers {workers} is negative.")
+        self.workers = workers
+        # the worker processes of query_many, started on first use
+        self.executor = None
+        self._executor_lock = threading.Lock()
+
         logger.info(
-            f"TemperatureMonthly initialized with search_radius={search_radius}, source_folder={self.source_folder}, geohash_precision={geohash_precision}, max_cache_size={max_cache_size}, grid_name={grid_name}"
+            f"TemperatureMonthly initialized with search_radius={search_radius}, source_folder={self.source_folder}, geohash_precision={geohash_precision}, max_cache_size={max_cache_size}, max_cache_bytes={max_cache_bytes}, cache_policy={cache_policy}, grid_name={grid_name}, cube_file={cube_file}, loader={loader}, partial_load={partial_load}, validation={validation}, prefetch={prefetch}, max_concurrent_loads={max_concurrent_loads}, metrics={metrics}, workers={workers}, climatology_file={climatology_file}, shared_cache={shared_cache}, shared_cache_bytes={shared_cache_bytes}, disk_cache={disk_cache}, disk_cache_check={disk_cache_check}, snap_raster={snap_raster}, cache_stripes={cache_stripes}"
         )
 
     def query(
@@ -79,41 +299,137 @@ class TemperatureMonthly(TemperatureBase):
                 - snapped_latitude (np.float32): The snapped latitude on the grid.
                 - snapped_longitude (np.float32): The snapped longitude on the grid.
         """
-        # validate the input parameters such year, month, latitude and longitude
-        vd.check_coordinates(latitude, longitude)
-        vd.check_year(year)
-        vd.check_month(month)
+        return self._query(year, month, latitude, longitude)[0]
 
-        logger.info(
-            f"Querying temperature data for {year}-{month} at {latitude}, {longitude}"
+    def _query(
+        self, year: int, month: int, latitude: float, longitude: float
+    ) -> tuple[dict, int]:
+        """query a point, and return its result and its grid cell"""
+        snapped_latitude, snapped_longitude, distance, cell, geohash = self._locate(
+            year, month, latitude, longitude
         )
 
-        # snap latitude and longitude to the nearest point on the grid, todo
-        (snapped_latitude, snapped_longitude), distance = self.snap(
-            latitude, longitude, self.grid_name
+        if self.cube is not None:
+            # the cube is indexed by grid cell, no partition to load
+            with self.metrics.timer("cell_lookup"):
+                temperature = self.cube.query(cell, year, month)
+        else:
+            unit = self.get_unit(
+                year, month, geohash, [snapped_latitude], [snapped_longitude]
+            )
+
+            # query the temperature data from unit
+            with self.metrics.timer("cell_lookup"):
+                temperature = unit.query(snapped_latitude, snapped_longitude)
+
+            if self.prefetcher is not None:
+                self.prefetcher.schedule(year, month, geohash)
+
+        result = self._result(
+            temperature,
+            geohash,
+            distance,
+            snapped_latitude,
+            snapped_longitude,
+            latitude,
+            longitude,
         )
+        return result, cell
 
-        # Check if the distance is within the search radius
-        vd.check_within_radius(self.search_radius, distance)
+    async def aquery(
+        self,
+        year: int,
+        month: int,
+        latitude: float,
+        longitude: float,
+    ) -> dict:
+        """
+        Query the monthly temperature data without blocking the event loop.
 
-        # Convert the latitude and longitude to geohash, todo
-        geohash = pgh.encode(
-            snapped_latitude, snapped_longitude, self.geohash_precision
+        Same as query. A cached partition is read directly in the coroutine, a
+        partition not cached yet is loaded in the event loop's default executor.
+        Concurrent queries on the same partition share a single load, and at most
+        max_concurrent_loads partitions are read from disk at the same time.
+
+        Returns:
+            dict: The same dictionary as query.
+        """
+        snapped_latitude, snapped_longitude, distance, cell, geohash = self._locate(
+            year, month, latitude, longitude
         )
 
-        # Check if monthly data already loaded before
-        if (year, month, geohash) not in self.units:
-            # load the monthly data
-            unit = TemperatureMonthlyUnit(self.source_folder, year, month, geohash)
-            self.units[(year, month, geohash)] = unit
+        if self.cube is not None:
+            with self.metrics.timer("cell_lookup"):
+                temperature = self.cube.query(cell, year, month)
         else:
-            unit = self.units[(year, month, geohash)]
+            unit = await self.aget_unit(
+                year, month, geohash, [snapped_latitude], [snapped_longitude]
+            )
+            with self.metrics.timer("cell_lookup"):
+                temperature = unit.query(snapped_latitude, snapped_longitude)
+
+            if self.prefetcher is not None:
+                self.prefetcher.schedule(year, month, geohash)
 
-        # query the temperature data from unit
-        temperature = unit.query(snapped_latitude, snapped_longitude)
+        return self._result(
+            temperature,
+            geohash,
+            distance,
+            snapped_latitude,
+            snapped_longitude,
+            latitude,
+            longitude,
+        )
+
+    def _locate(
+        self, year: int, month: int, latitude: float, longitude: float
+    ) -> tuple:
+        """validate a query, snap it to the grid and find the geohash of its partition"""
+        metrics = self.metrics
+        metrics.increment("queries")
+
+        # validate the input parameters such year, month, latitude and longitude
+        with metrics.timer("validate"):
+            vd.check_coordinates(latitude, longitude)
+            vd.check_year(year)
+            vd.check_month(month)
+
+        logger.debug(
+            "Querying temperature data for %s-%s at %s, %s",
+            year,
+            month,
+            latitude,
+            longitude,
+        )
+
+        # snap latitude and longitude to the nearest point on the grid
+        with metrics.timer("snap"):
+            (snapped_latitude, snapped_longitude), distance, cell = self.snap(
+                latitude, longitude, self.grid_name, return_index=True
+            )
+
+        # Check if the distance is within the search radius
+        vd.check_within_radius(self.search_radius, distance)
+
+        # Convert the latitude and longitude to geohash
+        with metrics.timer("geohash"):
+            geohash = pgh.encode(
+                snapped_latitude, snapped_longitude, self.geohash_precision
+            )
+        return snapped_latitude, snapped_longitude, distance, cell, geohash
 
+    @staticmethod
+    def _result(
+        temperature,
+        geohash: str,
+        distance,
+        snapped_latitude,
+        snapped_longitude,
+        latitude: float,
+        longitude: float,
+    ) -> dict:
         if temperature is None:
-            logger.info(f"Temperature data not found for {latitude}, {longitude}")
+            logger.debug("Temperature data not found for %s, %s", latitude, longitude)
             temperature = np.float32("-inf")
 
         return {
@@ -124,6 +440,1042 @@ class TemperatureMonthly(TemperatureBase):
             "snapped_longitude": snapped_longitude,
         }
 
+    def query_many(
+        self,
+        years: np.ndarray | pd.DataFrame,
+        months: np.ndarray | None = None,
+        latitudes: np.ndarray | None = None,
+        longitudes: np.ndarray | None = None,
+    ) -> dict:
+        """
+        Query the monthly temperature data for many points at once.
+
+        Inputs are validated in one vectorized pass, all points are snapped with a
+        single grid query, and rows are grouped by (year, month, geohash) so each
+        partition is loaded and looked up once. Points without a grid point within
+        the search radius get a status instead of raising NoNearbyPointError.
+
+        With workers, the partitions not cached yet are loaded and looked up in
+        worker processes, each by exactly one worker, and are not added to the cache.
+
+        Args:
+            years (np.ndarray | pd.DataFrame): The years to query, or a DataFrame with
+                columns year, month, latitude and longitude.
+            months (np.ndarray, optional): The months to query.
+            latitudes (np.ndarray, optional): The latitudes of the locations.
+            longitudes (np.ndarray, optional): The longitudes of the locations.
+
+        Returns:
+            dict: A dictionary of arrays with one element per input row:
+                - temperature (np.float32): The temperature in Celsius. NaN if there is no
+                  nearby grid point, -inf if the grid point has no data.
+                - geohash (object): The geohash of the snapped coordinates, "" if there is
+                  no nearby grid point.
+                - distance (np.float32): The distance between the input and snapped coordinates.
+                  With snap_raster, inf if there is no nearby grid point.
+                - snapped_latitude (np.float32): The snapped latitude on the grid.
+                  With snap_raster, NaN if there is no nearby grid point.
+                - snapped_longitude (np.float32): The snapped longitude on the grid.
+                  With snap_raster, NaN if there is no nearby grid point.
+                - status (np.int8): STATUS_OK, STATUS_NO_NEARBY_POINT or STATUS_NOT_FOUND.
+        """
+        return self._query_many(years, months, latitudes, longitudes)[0]
+
+    def _query_many(
+        self,
+        years: np.ndarray | pd.DataFrame,
+        months: np.ndarray | None,
+        latitudes: np.ndarray | None,
+        longitudes: np.ndarray | None,
+    ) -> tuple[dict, np.ndarray, np.ndarray]:
+        """query many points, and return their results, months and grid cells"""
+        result, groups, months, cells = self._locate_many(
+            years, months, latitudes, longitudes
+        )
+        self._lookup_groups(result, groups)
+        return result, months, cells
+
+    def _lookup_in_workers(self, result: dict, groups: dict) -> dict:
+        """
+        Look up the partitions not cached yet in the worker processes.
+
+        Returns:
+            dict: the groups of the cached partitions, to look up in this process.
+        """
+        cached = {}
+        missing = {}
+        for key, index in groups.items():
+            if not self.partial_load and key in self.units:
+                cached[key] = index
+            else:
+                missing[key] = index
+        if len(missing) < 2:
+            return groups
+
+        with self._executor_lock:
+            if self.executor is None:
+                self.executor = PartitionExecutor(
+                    self.source_folder,
+                    self.loader,
+                    self.validation,
+                    self.partial_load,
+                    max_workers=self.workers,
+                    disk_cache=self.disk_cache,
+                )
+
+        with self.metrics.timer("load"):
+            values, found, stats = self.executor.lookup(
+                missing, result["snapped_latitude"], result["snapped_longitude"]
+            )
+        rows = np.concatenate(list(missing.values()))
+        result["temperature"][rows] = np.where(
+            found[rows], values[rows], np.float32("-inf")
+        )
+        result["status"][rows] = np.where(found[rows], STATUS_OK, STATUS_NOT_FOUND)
+        for counter, amount in stats.items():
+            self.metrics.increment(counter, amount)
+        return cached
+
+    async def aquery_many(
+        self,
+        years: np.ndarray | pd.DataFrame,
+        months: np.ndarray | None = None,
+        latitudes: np.ndarray | None = None,
+        longitudes: np.ndarray | None = None,
+    ) -> dict:
+        """
+        Query the monthly temperature data for many points without blocking the event loop.
+
+        Same as query_many. Validation and snapping are vectorized and run in the
+        coroutine, the partitions not cached yet are loaded concurrently in the
+        event loop's default executor, at most max_concurrent_loads at a time.
+
+        Returns:
+            dict: The same dictionary of arrays as query_many.
+        """
+        result, groups, _, _ = self._locate_many(years, months, latitudes, longitudes)
+        units = await asyncio.gather(
+            *(
+                self.aget_unit(
+                    year,
+                    month,
+                    geohash,
+                    result["snapped_latitude"][index],
+                    result["snapped_longitude"][index],
+                )
+                for (year, month, geohash), index in groups.items()
+            )
+        )
+        for index, unit in zip(groups.values(), units):
+            self._fill_group(result, unit, index)
+        return result
+
+    def _locate_many(
+        self,
+        years: np.ndarray | pd.DataFrame,
+        months: np.ndarray | None,
+        latitudes: np.ndarray | None,
+        longitudes: np.ndarray | None,
+    ) -> tuple[dict, dict, np.ndarray, np.ndarray]:
+        """
+        Validate a batch of queries, snap it to the grid and group it by partition.
+
+        Returns:
+            tuple[dict, dict, np.ndarray, np.ndarray]: the result arrays of query_many,
+                the row positions of each (year, month, geohash) partition still to
+                look up, and the months and grid cells of the rows. With a cube the
+                results are filled in and there are no partitions to look up.
+        """
+        years, months, latitudes, longitudes = self._check_many(
+            years, months, latitudes, longitudes
+        )
+
+        # snap all the points to the grid with a single query
+        with self.metrics.timer("snap"):
+            if self.snap_raster:
+                points, distances, cells = self.snap_many_raster(
+                    latitudes,
+                    longitudes,
+                    self.search_radius,
+                    self.grid_name,
+                    return_index=True,
+                    workers=max(self.workers, 1),
+                )
+            else:
+                points, distances, cells = self.snap_many(
+                    latitudes,
+                    longitudes,
+                    self.grid_name,
+                    return_index=True,
+                    workers=max(self.workers, 1),
+                )
+
+        result = self._empty_result(len(years))
+        result["distance"] = distances
+        result["snapped_latitude"] = points[:, 0]
+        result["snapped_longitude"] = points[:, 1]
+
+        # only the points within the search radius are looked up
+        rows = np.flatnonzero(
+            vd.check_within_radius_many(self.search_radius, distances)
+        )
+        groups = self._group_many(result, years, months, cells, rows)
+        return result, groups, months, cells
+
+    def _check_many(
+        self,
+        years: np.ndarray | pd.DataFrame,
+        months: np.ndarray | None,
+        latitudes: np.ndarray | None,
+        longitudes: np.ndarray | None,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """validate a batch of queries, given as arrays or as a DataFrame"""
+        if isinstance(years, pd.DataFrame):
+            vd.check_df_columns(years, ["year", "month", "latitude", "longitude"])
+            df = years
+            years = df["year"].to_numpy()
+            months = df["month"].to_numpy()
+            latitudes = df["latitude"].to_numpy()
+            longitudes = df["longitude"].to_numpy()
+
+        years = np.asarray(years)
+        months = np.asarray(months)
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        if not (len(years) == len(months) == len(latitudes) == len(longitudes)):
+            raise ValueError(
+                "Years, months, latitudes and longitudes must have the same length."
+            )
+
+        metrics = self.metrics
+        metrics.increment("batch_queries")
+        metrics.increment("batch_points", len(years))
+
+        # validate all the inputs in one pass
+        with metrics.timer("validate"):
+            vd.check_coordinates_many(latitudes, longitudes)
+            vd.check_year_many(years)
+            vd.check_month_many(months)
+
+        logger.debug("Querying temperature data for %s points", len(years))
+        return years, months, latitudes, longitudes
+
+    @staticmethod
+    def _empty_result(size: int) -> dict:
+        """the result arrays of query_many, with every row not looked up yet"""
+        return {
+            "temperature": np.full(size, np.nan, dtype=np.float32),
+            "geohash": np.full(size, "", dtype=object),
+            "distance": np.full(size, np.nan, dtype=np.float32),
+            "snapped_latitude": np.full(size, np.nan, dtype=np.float32),
+            "snapped_longitude": np.full(size, np.nan, dtype=np.float32),
+            "status": np.full(size, STATUS_NO_NEARBY_POINT, dtype=np.int8),
+        }
+
+    def _group_many(
+        self,
+        result: dict,
+        years: np.ndarray,
+        months: np.ndarray,
+        cells: np.ndarray,
+        rows: np.ndarray,
+    ) -> dict:
+        """
+        Group the snapped rows to look up by partition.
+
+        Returns:
+            dict: the row positions of each (year, month, geohash) partition. With a
+                cube the rows are looked up and there are no partitions.
+        """
+        with self.metrics.timer("geohash"):
+            result["geohash"][rows] = gh.encode_many(
+                result["snapped_latitude"][rows],
+                result["snapped_longitude"][rows],
+                self.geohash_precision,
+            )
+
+        if self.cube is not None:
+            # the cube is indexed by grid cell, all the rows are a single lookup
+            with self.metrics.timer("cell_lookup"):
+                values, found = self.cube.query_many(
+                    cells[rows], years[rows], months[rows]
+                )
+            result["temperature"][rows] = np.where(found, values, np.float32("-inf"))
+            result["status"][rows] = np.where(found, STATUS_OK, STATUS_NOT_FOUND)
+            return {}
+
+        # group the rows by partition so each partition is loaded once
+        groups = (
+            pd.DataFrame(
+                {
+                    "year": years[rows],
+                    "month": months[rows],
+                    "geohash": result["geohash"][rows],
+                }
+            )
+            .groupby(["year", "month", "geohash"], sort=False)
+            .indices
+        )
+        return {
+            (int(year), int(month), geohash): rows[positions]
+            for (year, month, geohash), positions in groups.items()
+        }
+
+    def _lookup_groups(self, result: dict, groups: dict) -> None:
+        """look up the rows of each partition and write them into the result arrays"""
+        if self.workers and len(groups) > 1:
+            groups = self._lookup_in_workers(result, groups)
+        for (year, month, geohash), index in groups.items():
+            unit = self.get_unit(
+                year,
+                month,
+                geohash,
+                result["snapped_latitude"][index],
+                result["snapped_longitude"][index],
+            )
+            self._fill_group(result, unit, index)
+
+    def _fill_group(
+        self, result: dict, unit: TemperatureUnitBase, index: np.ndarray
+    ) -> None:
+        """look up the rows of one partition and write them into the result arrays"""
+        with self.metrics.timer("cell_lookup"):
+            values, found = unit.query_many(
+                result["snapped_latitude"][index], result["snapped_longitude"][index]
+            )
+        result["temperature"][index] = np.where(found, values, np.float32("-inf"))
+        result["status"][index] = np.where(found, STATUS_OK, STATUS_NOT_FOUND)
+
+    def query_interpolated(
+        self,
+        year: int,
+        month: int,
+        latitude: float,
+        longitude: float,
+        method: str = "bilinear",
+        k: int = 4,
+        power: float = 2.0,
+    ) -> dict:
+        """
+        Query the monthly temperature interpolated between the nearest grid points.
+
+        Same as query_interpolated_many for a single point.
+
+        Returns:
+            dict: The dictionary of query, with the interpolated temperature.
+        """
+        result = self.query_interpolated_many(
+            [year], [month], [latitude], [longitude], method, k, power
+        )
+        vd.check_within_radius(self.search_radius, result["distance"][0])
+        return {
+            key: result[key][0]
+            for key in [
+                "temperature",
+                "geohash",
+                "distance",
+                "snapped_latitude",
+                "snapped_longitude",
+            ]
+        }
+
+    def query_interpolated_many(
+        self,
+        years: np.ndarray | pd.DataFrame,
+        months: np.ndarray | None = None,
+        latitudes: np.ndarray | None = None,
+        longitudes: np.ndarray | None = None,
+        method: str = "bilinear",
+        k: int = 4,
+        power: float = 2.0,
+    ) -> dict:
+        """
+        Query the monthly temperatures interpolated between the nearest grid points.
+
+        The neighbours of all the rows are found with a single k-nearest KDTree
+        query. Their temperatures are looked up like the rows of query_many, grouped
+        by partition, so neighbours in another geohash cell are read from their own
+        partition, and are combined with one vectorized weighted sum.
+
+        "bilinear" weights the four corners of the grid cell around each point by
+        their areas, the corners are the four grid points nearest to the centre of
+        the cell. "idw" weights the k nearest grid points by the inverse of their
+        distance to the power power. Grid points without data or not on the grid,
+        e.g. over the ocean, are left out and the weights of the others are
+        renormalized. If none of the four corners has data, e.g. on the coast, the
+        row is the one of query_many, the value of the nearest grid point within
+        the search radius.
+
+        Args:
+            years (np.ndarray | pd.DataFrame): The years to query, or a DataFrame with
+                columns year, month, latitude and longitude.
+            months (np.ndarray, optional): The months to query.
+            latitudes (np.ndarray, optional): The latitudes of the locations.
+            longitudes (np.ndarray, optional): The longitudes of the locations.
+            method (str, optional): "bilinear" or "idw". Defaults to "bilinear".
+            k (int, optional): The number of nearest grid points of "idw". Defaults to 4.
+            power (float, optional): The power of the distances of "idw". Defaults to 2.0.
+
+        Returns:
+            dict: The dictionary of arrays of query_many. The temperature is the
+                interpolated temperature, the other keys describe the nearest grid
+                point used, which must be within the search radius. The temperature is
+                -inf and the status STATUS_NOT_FOUND if no grid point used has data.
+        """
+        if method not in INTERPOLATION_METHODS:
+            raise ValueError(
+                f"Unsupported interpolation method: {method}. Use one of {INTERPOLATION_METHODS}."
+            )
+        if k < 1 or power < 0:
+            raise ValueError(f"k {k} must be positive and power {power} not negative.")
+
+        years, months, latitudes, longitudes = self._check_many(
+            years, months, latitudes, longitudes
+        )
+
+        # find the neighbours of all the points with a single query
+        with self.metrics.timer("snap"):
+            if method == "bilinear":
+                points, distances, cells, weights = self._bilinear_neighbours(
+                    latitudes, longitudes
+                )
+            else:
+                points, distances, cells = self.snap_nearest(
+                    latitudes,
+                    longitudes,
+                    k,
+                    self.grid_name,
+                    workers=max(self.workers, 1),
+                )
+                weights = self._idw_weights(distances, power)
+
+        # the nearest neighbour on the grid describes the row
+        size, count = cells.shape
+        nearest = distances.argmin(axis=1)
+        result = self._empty_result(size)
+        result["distance"] = distances[np.arange(size), nearest]
+        result["snapped_latitude"] = points[np.arange(size), nearest, 0]
+        result["snapped_longitude"] = points[np.arange(size), nearest, 1]
+        rows = np.flatnonzero(
+            vd.check_within_radius_many(self.search_radius, result["distance"])
+        )
+        with self.metrics.timer("geohash"):
+            result["geohash"][rows] = gh.encode_many(
+                result["snapped_latitude"][rows],
+                result["snapped_longitude"][rows],
+                self.geohash_precision,
+            )
+
+        # look up the neighbours of all the rows at once, one row per neighbour
+        used = cells >= 0
+        within = np.zeros(size, dtype=bool)
+        within[rows] = True
+        gathered = self._empty_result(size * count)
+        gathered["snapped_latitude"] = points[:, :, 0].ravel()
+        gathered["snapped_longitude"] = points[:, :, 1].ravel()
+        groups = self._group_many(
+            gathered,
+            np.repeat(years, count),
+            np.repeat(months, count),
+            cells.ravel(),
+            np.flatnonzero((used & within[:, None]).ravel()),
+        )
+        self._lookup_groups(gathered, groups)
+
+        with self.metrics.timer("interpolate"):
+            values = gathered["temperature"].reshape(size, count)
+            valid = used & np.isfinite(values)
+            weights = np.where(valid, weights, 0.0)
+            totals = weights.sum(axis=1)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                estimates = (weights * np.where(valid, values, 0.0)).sum(
+                    axis=1
+                ) / totals
+
+        found = totals[rows] > 0
+        result["temperature"][rows] = np.where(
+            found, estimates[rows], np.float32("-inf")
+        )
+        result["status"][rows] = np.where(found, STATUS_OK, STATUS_NOT_FOUND)
+
+        if method == "bilinear":
+            # the corners of a cell on the coast can all be missing while another
+            # grid point is within the search radius, take its value
+            missing = np.flatnonzero(totals == 0)
+            if len(missing):
+                nearest_result = self.query_many(
+                    years[missing],
+                    months[missing],
+                    latitudes[missing],
+                    longitudes[missing],
+                )
+                for key, values in nearest_result.items():
+                    result[key][missing] = values
+        return result
+
+    def _bilinear_neighbours(
+        self, latitudes: np.ndarray, longitudes: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Find the four corners of the grid cell around each point.
+
+        The corners are the four grid points nearest to the centre of the cell, so
+        all the cells are searched with a single 4-nearest query.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: the (n, 4, 2)
+                corners, their (n, 4) distances to the points, their (n, 4) row
+                positions in the grid and their (n, 4) bilinear weights. Corners
+                not on the grid have row position -1 and distance inf.
+        """
+        grid_name = CONFIG["grids"][self.grid_name]["grid_name"]
+        grid = Grids()
+        tree = grid.get_grid(grid_name)
+        lat_start, lon_start, spacing = grid.lattice(grid_name)
+
+        # the lattice coordinates of the points
+        lat_steps = (latitudes - lat_start) / spacing
+        lon_steps = (longitudes - lon_start) / spacing
+        lat_cells = np.floor(lat_steps)
+        lon_cells = np.floor(lon_steps)
+        lat_fractions = (lat_steps - lat_cells)[:, None]
+        lon_fractions = (lon_steps - lon_cells)[:, None]
+
+        points, _, cells = self.snap_nearest(
+            lat_start + (lat_cells + 0.5) * spacing,
+            lon_start + (lon_cells + 0.5) * spacing,
+            4,
+            self.grid_name,
+            workers=max(self.workers, 1),
+        )
+
+        # the corners in the order (lat, lon), (lat + 1, lon), (lat, lon + 1), (lat + 1, lon + 1)
+        lat_offsets = np.array([0, 1, 0, 1])
+        lon_offsets = np.array([0, 0, 1, 1])
+        weights = np.where(lat_offsets, lat_fractions, 1 - lat_fractions) * np.where(
+            lon_offsets, lon_fractions, 1 - lon_fractions
+        )
+
+        # a neighbour farther than the corners is not on the cell
+        matches = (
+            np.rint((points[:, None, :, 0] - lat_start) / spacing)
+            == lat_cells[:, None, None] + lat_offsets[:, None]
+        ) & (
+            np.rint((points[:, None, :, 1] - lon_start) / spacing)
+            == lon_cells[:, None, None] + lon_offsets[:, None]
+        )
+        on_grid = matches.any(axis=2)
+        neighbours = matches.argmax(axis=2)
+
+        points = np.take_along_axis(points, neighbours[:, :, None], axis=1)
+        cells = np.where(on_grid, np.take_along_axis(cells, neighbours, axis=1), -1)
+        offsets = tree.data[cells] - np.column_stack([latitudes, longitudes])[:, None]
+        distances = np.where(
+            on_grid, np.sqrt((offsets**2).sum(axis=2)), np.inf
+        ).astype(np.float32)
+        return points, distances, cells, weights
+
+    @staticmethod
+    def _idw_weights(distances: np.ndarray, power: float) -> np.ndarray:
+        """the inverse distance weights of the neighbours, a point on the grid takes its value"""
+        exact = distances == 0
+        with np.errstate(divide="ignore"):
+            weights = 1.0 / distances.astype(np.float64) ** power
+        return np.where(exact.any(axis=1)[:, None], exact, weights)
+
+    def query_anomaly(
+        self,
+        year: int,
+        month: int,
+        latitude: float,
+        longitude: float,
+    ) -> dict:
+        """
+        Query the monthly temperature and its anomaly from the climatology baseline.
+
+        The temperature is looked up like in query, and the baseline of the same grid
+        cell and calendar month is a single lookup in the climatology file.
+
+        Returns:
+            dict: The dictionary of query, with the following keys added:
+                - baseline_mean (np.float32): The mean temperature of the calendar month over the baseline years.
+                - baseline_std (np.float32): The standard deviation of the temperature over the baseline years.
+                - anomaly (np.float32): The temperature minus the baseline mean.
+                - standardized_anomaly (np.float32): The anomaly divided by the baseline standard deviation.
+                The anomalies are NaN if there is no temperature or no baseline.
+
+        Raises:
+            ValueError: If no climatology_file was given.
+        """
+        climatology = self._check_climatology()
+        result, cell = self._query(year, month, latitude, longitude)
+        with self.metrics.timer("baseline_lookup"):
+            mean, std = climatology.query(cell, month)
+        result.update(self._anomaly(result["temperature"], mean, std))
+        return result
+
+    def query_anomaly_many(
+        self,
+        years: np.ndarray | pd.DataFrame,
+        months: np.ndarray | None = None,
+        latitudes: np.ndarray | None = None,
+        longitudes: np.ndarray | None = None,
+    ) -> dict:
+        """
+        Query the monthly temperatures and their anomalies for many points at once.
+
+        The temperatures are looked up like in query_many, and the baselines of all
+        the rows are a single lookup in the climatology file.
+
+        Returns:
+            dict: The dictionary of arrays of query_many, with the baseline_mean,
+                baseline_std, anomaly and standardized_anomaly arrays of query_anomaly.
+
+        Raises:
+            ValueError: If no climatology_file was given.
+        """
+        climatology = self._check_climatology()
+        result, months, cells = self._query_many(years, months, latitudes, longitudes)
+        with self.metrics.timer("baseline_lookup"):
+            means, stds = climatology.query_many(cells, months)
+        result.update(self._anomaly(result["temperature"], means, stds))
+        return result
+
+    def _check_climatology(self) -> Climatology:
+        if self.climatology is None:
+            raise ValueError("Anomaly queries require a climatology_file.")
+        return self.climatology
+
+    @staticmethod
+    def _anomaly(temperature, mean, std) -> dict:
+        """the anomalies of temperatures from their baselines, NaN where a temperature is missing"""
+        temperature = np.asarray(temperature, dtype=np.float32)
+        mean = np.asarray(mean, dtype=np.float32)
+        std = np.asarray(std, dtype=np.float32)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            anomaly = np.where(np.isfinite(temperature), temperature - mean, np.nan)
+            standardized = anomaly / std
+
+        # [()] returns a scalar for a single query and the array for a batch
+        return {
+            "baseline_mean": mean[()],
+            "baseline_std": std[()],
+            "anomaly": anomaly.astype(np.float32)[()],
+            "standardized_anomaly": standardized.astype(np.float32)[()],
+        }
+
+    def query_range(
+        self,
+        latitude: float,
+        longitude: float,
+        start: str | date,
+        end: str | date,
+        max_workers: int = 8,
+    ) -> pd.Series:
+        """
+        Query the monthly temperature time series of a location between two months.
+
+        The location is snapped once and the partitions of all the months are loaded
+        in parallel.
+
+        Args:
+            latitude (float): The latitude of the location.
+            longitude (float): The longitude of the location.
+            start (str | date): The first month, e.g. "1990-01" (inclusive).
+            end (str | date): The last month, e.g. "2025-08" (inclusive).
+            max_workers (int, optional): The maximum number of partitions loaded in parallel. Defaults to 8.
+
+        Returns:
+            pd.Series: The temperature in Celsius indexed by the first day of each month.
+                -inf if the snapped grid point or the source folder has no data for a month.
+        """
+        vd.check_coordinates(latitude, longitude)
+        periods = pd.period_range(
+            pd.Period(start, freq="M"), pd.Period(end, freq="M"), freq="M"
+        )
+        if len(periods) == 0:
+            raise ValueError(f"Start {start} is after end {end}.")
+        vd.check_year(periods[0].year)
+        vd.check_year(periods[-1].year)
+
+        logger.debug(
+            "Querying temperature data from %s to %s at %s, %s",
+            periods[0],
+            periods[-1],
+            latitude,
+            longitude,
+        )
+
+        # snap and encode the location once for all the months
+        (snapped_latitude, snapped_longitude), distance, cell = self.snap(
+            latitude, longitude, self.grid_name, return_index=True
+        )
+        vd.check_within_radius(self.search_radius, distance)
+        geohash = pgh.encode(
+            snapped_latitude, snapped_longitude, self.geohash_precision
+        )
+
+        if self.cube is not None:
+            # the months of a cell are contiguous in the cube
+            temperatures = self.cube.query_range(cell, periods[0], periods[-1])
+            temperatures[np.isnan(temperatures)] = np.float32("-inf")
+            return pd.Series(
+                temperatures, index=periods.to_timestamp(), name="temperature"
+            )
+
+        def load(period: pd.Period) -> TemperatureMonthlyUnit | None:
+            try:
+                return self.get_unit(
+                    period.year,
+                    period.month,
+                    geohash,
+                    [snapped_latitude],
+                    [snapped_longitude],
+                )
+            except FileNotFoundError:
+                return None
+
+        # load the partitions in parallel, the months without one stay -inf
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            units = list(executor.map(load, periods))
+        if all(unit is None for unit in units):
+            raise FileNotFoundError(
+                f"No data between {periods[0]} and {periods[-1]}. Please check the source folder."
+            )
+
+        temperatures = np.full(len(units), np.float32("-inf"), dtype=np.float32)
+        for i, unit in enumerate(units):
+            if unit is None:
+                continue
+            temperature = unit.query(snapped_latitude, snapped_longitude)
+            if temperature is not None:
+                temperatures[i] = temperature
+
+        return pd.Series(temperatures, index=periods.to_timestamp(), name="temperature")
+
+    def query_region(
+        self,
+        start: str | date,
+        end: str | date | None = None,
+        bbox: tuple[float, float, float, float] | None = None,
+        polygon: np.ndarray | None = None,
+        weighted: bool = False,
+        max_workers: int = 8,
+    ) -> pd.DataFrame:
+        """
+        Aggregate the monthly temperature of the grid cells in a region.
+
+        The cells are found with a range query on the grid index, and only the
+        partitions of the geohashes the cells fall in are loaded, in parallel.
+        Cells without data for a month, including the cells of a partition missing
+        from the source folder, are left out of that month.
+
+        Args:
+            start (str | date): The first month, e.g. "1990-01" (inclusive).
+            end (str | date, optional): The last month (inclusive). Defaults to start.
+            bbox (tuple[float, float, float, float], optional): The region as (lat_min, lat_max, lon_min, lon_max). lon_min > lon_max crosses the antimeridian.
+            polygon (np.ndarray, optional): The region as an (n, 2) array of (latitude, longitude) vertices.
+            weighted (bool, optional): Weight the mean by cos(latitude), the relative area of the cells. Defaults to False.
+            max_workers (int, optional): The maximum number of partitions loaded in parallel. Defaults to 8.
+
+        Returns:
+            pd.DataFrame: Indexed by the first day of each month, with columns:
+                - mean (float): The mean temperature in Celsius, cos(latitude) weighted if weighted.
+                - min (float): The minimum temperature in Celsius.
+                - max (float): The maximum temperature in Celsius.
+                - cells (int): The number of cells with data.
+                - missing_cells (int): The number of cells in the region without data.
+                The statistics are NaN if no cell has data.
+        """
+        if (bbox is None) == (polygon is None):
+            raise ValueError("Give either bbox or polygon.")
+
+        periods = pd.period_range(
+            pd.Period(start, freq="M"),
+            pd.Period(start if end is None else end, freq="M"),
+            freq="M",
+        )
+        if len(periods) == 0:
+            raise ValueError(f"Start {start} is after end {end}.")
+        vd.check_year(periods[0].year)
+        vd.check_year(periods[-1].year)
+
+        # the cells in the region, from range queries on the grid index
+        grid = Grids()
+        grid_name = CONFIG["grids"][self.grid_name]["grid_name"]
+        grid.get_grid(grid_name)
+        if bbox is not None:
+            boxes = region.check_bbox(bbox)
+        else:
+            polygon = region.check_polygon(polygon)
+            boxes = [
+                (
+                    polygon[:, 0].min(),
+                    polygon[:, 0].max(),
+                    polygon[:, 1].min(),
+                    polygon[:, 1].max(),
+                )
+            ]
+        matches = [grid.query_box(grid_name, *box) for box in boxes]
+        points = np.concatenate([box_points for box_points, _ in matches])
+        cells = np.concatenate([box_cells for _, box_cells in matches])
+        if polygon is not None:
+            inside = region.points_in_polygon(points[:, 0], points[:, 1], polygon)
+            points = points[inside]
+            cells = cells[inside]
+
+        logger.debug(
+            "Aggregating %s cells from %s to %s", len(cells), periods[0], periods[-1]
+        )
+
+        values = np.full((len(periods), len(cells)), np.nan, dtype=np.float32)
+        if self.cube is not None:
+            # the months of a cell are contiguous in the cube
+            first = self.cube.month_index(periods[0].year, periods[0].month)
+            last = self.cube.month_index(periods[-1].year, periods[-1].month)
+            values[:] = self.cube.data[cells, first : last + 1].T
+        elif len(cells):
+            latitudes = points[:, 0]
+            longitudes = points[:, 1]
+            geohashes = gh.encode_many(latitudes, longitudes, self.geohash_precision)
+            groups = pd.Series(geohashes).groupby(geohashes).indices
+            tasks = [
+                (i, period, geohash, index)
+                for i, period in enumerate(periods)
+                for geohash, index in groups.items()
+            ]
+
+            def load(task: tuple) -> TemperatureMonthlyUnit | None:
+                _, period, geohash, index = task
+                try:
+                    return self.get_unit(
+                        period.year,
+                        period.month,
+                        geohash,
+                        latitudes[index],
+                        longitudes[index],
+                    )
+                except FileNotFoundError:
+                    return None
+
+            # load the partitions in parallel, the cells of a missing one stay NaN
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                units = list(executor.map(load, tasks))
+            if all(unit is None for unit in units):
+                raise FileNotFoundError(
+                    f"No data between {periods[0]} and {periods[-1]}. Please check the source folder."
+                )
+
+            for (i, _, _, index), unit in zip(tasks, units):
+                if unit is None:
+                    continue
+                with self.metrics.timer("cell_lookup"):
+                    temperatures, found = unit.query_many(
+                        latitudes[index], longitudes[index]
+                    )
+                values[i, index] = np.where(found, temperatures, np.nan)
+
+        result = region.aggregate(values, points[:, 0], weighted=weighted)
+        result.index = periods.to_timestamp()
+        return result
+
+    def get_unit(
+        self,
+        year: int,
+        month: int,
+        geohash: str,
+        latitudes: np.ndarray | None = None,
+        longitudes: np.ndarray | None = None,
+    ) -> TemperatureUnitBase:
+        """get the unit of a partition from the cache, loading it on a cache miss
+
+        With partial_load, the unit only holds the rows near the given points and
+        is not cached.
+        """
+        if self.partial_load and latitudes is not None:
+            bounds = (
+                float(np.min(latitudes)) - PARTIAL_LOAD_MARGIN,
+                float(np.max(latitudes)) + PARTIAL_LOAD_MARGIN,
+                float(np.min(longitudes)) - PARTIAL_LOAD_MARGIN,
+                float(np.max(longitudes)) + PARTIAL_LOAD_MARGIN,
+            )
+            unit = self.create_unit(year, month, geohash, bounds)
+            self._load_data(unit)
+            return unit
+
+        unit = self._cache_lookup((year, month, geohash))
+        if unit is None:
+            unit = self._load_unit_once(year, month, geohash)
+        return unit
+
+    def _cache_lookup(self, key: tuple) -> TemperatureUnitBase | None:
+        with self.metrics.timer("cache_lookup"):
+            unit = self.units.get(key)
+        self.metrics.increment("cache_misses" if unit is None else "cache_hits")
+        return unit
+
+    async def aget_unit(
+        self,
+        year: int,
+        month: int,
+        geohash: str,
+        latitudes: np.ndarray | None = None,
+        longitudes: np.ndarray | None = None,
+    ) -> TemperatureUnitBase:
+        """coroutine version of get_unit, a cache miss is loaded in an executor
+
+        Coroutines missing the same partition wait for the same load.
+        """
+        loop = asyncio.get_running_loop()
+        slots, loads = self._async_state(loop)
+
+        if self.partial_load and latitudes is not None:
+            # partial units are bounded by the points of each query, nothing to share
+            async with slots:
+                return await loop.run_in_executor(
+                    None, self.get_unit, year, month, geohash, latitudes, longitudes
+                )
+
+        key = (year, month, geohash)
+        unit = self._cache_lookup(key)
+        if unit is not None:
+            return unit
+
+        task = loads.get(key)
+        if task is None:
+            task = loop.create_task(self._aload_unit(slots, year, month, geohash))
+            loads[key] = task
+            task.add_done_callback(lambda _: loads.pop(key, None))
+        # a cancelled query must not cancel the load other queries are waiting for
+        return await asyncio.shield(task)
+
+    async def _aload_unit(
+        self, slots: asyncio.Semaphore, year: int, month: int, geohash: str
+    ) -> TemperatureUnitBase:
+        async with slots:
+            return await asyncio.get_running_loop().run_in_executor(
+                None, self._load_unit_once, year, month, geohash
+            )
+
+    def _async_state(self, loop: asyncio.AbstractEventLoop) -> tuple:
+        """the load semaphore and the in-flight loads of an event loop"""
+        with self._async_lock:
+            state = self._async_states.get(loop)
+            if state is None:
+                state = (asyncio.Semaphore(self.max_concurrent_loads), {})
+                self._async_states[loop] = state
+            return state
+
+    def load_unit(self, year: int, month: int, geohash: str) -> TemperatureUnitBase:
+        """load the unit of a partition and add it to the cache"""
+        # load the monthly data before caching it, so its size is known
+        unit = self.create_unit(year, month, geohash)
+        self._load_shared_data(unit)
+        self.add_unit(year, month, geohash, unit)
+        return unit
+
+    def _load_unit_once(
+        self, year: int, month: int, geohash: str
+    ) -> TemperatureUnitBase:
+        """
+        Load the unit of a partition missing from the cache, or wait for the load of another thread.
+
+        Threads missing the same partition at the same time share a single
+        load, and its unit or its exception.
+        """
+        key = (year, month, geohash)
+        with self._loads_lock:
+            future = self._loads.get(key)
+            if future is None:
+                # the partition may have been loaded since the cache lookup,
+                # which already counted the miss
+                unit = self.units.peek(key)
+                if unit is not None:
+                    return unit
+                future = self._loads[key] = Future()
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            self.metrics.increment("load_waits")
+            return future.result()
+
+        try:
+            unit = self.load_unit(year, month, geohash)
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(unit)
+            return unit
+        finally:
+            with self._loads_lock:
+                del self._loads[key]
+
+    def _load_shared_data(self, unit: TemperatureUnitBase) -> None:
+        """load a unit from the shared cache, publishing it there on a miss"""
+        if self.shared_cache is None:
+            self._load_data(unit)
+            return
+
+        key = (unit.year, unit.month, unit.geohash)
+        arrays = self.shared_cache.get(key)
+        if arrays is None:
+            self.metrics.increment("shared_cache_misses")
+            self._load_data(unit)
+            arrays = self.shared_cache.put(key, unit.shared_arrays())
+        else:
+            self.metrics.increment("shared_cache_hits")
+        # the private arrays of the load are replaced by the shared ones
+        unit.attach(arrays)
+
+    def _load_data(self, unit: TemperatureUnitBase) -> None:
+        with self.metrics.timer("load"):
+            unit.data
+        if self.metrics.enabled:
+            self.metrics.increment("partitions_loaded")
+            self.metrics.increment("bytes_read", unit.bytes_read)
+            if unit.disk_cache_hit is not None:
+                self.metrics.increment(
+                    "disk_cache_hits" if unit.disk_cache_hit else "disk_cache_misses"
+                )
+
+    def create_unit(
+        self,
+        year: int,
+        month: int,
+        geohash: str,
+        bounds: tuple[float, float, float, float] | None = None,
+    ) -> TemperatureUnitBase:
+        """create a unit of a partition with the loader settings of this instance"""
+        return TemperatureMonthlyUnit(
+            self.source_folder,
+            year,
+            month,
+            geohash,
+            self.loader,
+            bounds,
+            self.validation,
+            self.disk_cache,
+        )
+
+    def prefetch_unit(self, year: int, month: int, geohash: str) -> None:
+        """load a partition into the cache if it exists and is not cached yet"""
+        if (year, month, geohash) in self.units:
+            return
+        if not self.create_unit(year, month, geohash).file_exist:
+            return
+        self._load_unit_once(year, month, geohash)
+
+    def close(self) -> None:
+        """stop the background prefetch threads and the query_many worker processes"""
+        if self.prefetcher is not None:
+            self.prefetcher.shutdown()
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
     def add_unit(
         self,
         year: int,
@@ -132,10 +1484,45 @@ class TemperatureMonthly(TemperatureBase):
         unit: TemperatureUnitBase,
     ) -> None:
         """add a unit to self.units to hold TemperatureMonthlyUnit instances"""
-        if len(self.units) >= self.max_cache_size:
-            # remove the oldest unit
-            self.units.popitem(last=False)
-        self.units[(year, month, geohash)] = unit
+        self.units.put((year, month, geohash), unit, unit.nbytes)
+
+    def metrics_snapshot(self) -> dict:
+        """
+        Get the timers and counters recorded with metrics=True.
+
+        Returns:
+            dict: A dictionary containing:
+                - stages (dict): calls, total seconds and mean milliseconds of the validate,
+                  snap, geohash, cache_lookup, load and cell_lookup stages.
+                - counters (dict): queries, batch_queries, batch_points, cache_hits,
+                  cache_misses, cache_evictions, partitions_loaded, bytes_read,
+                  shared_cache_hits, shared_cache_misses, disk_cache_hits,
+                  disk_cache_misses and load_waits, the cache misses that waited
+                  for the load of another thread.
+                - cache (dict): the cache_stats of the cache.
+        """
+        snapshot = self.metrics.snapshot()
+        snapshot["cache"] = self.cache_stats()
+        return snapshot
+
+    def add_metrics_hook(self, hook) -> None:
+        """
+        Call hook(name, value) on every recorded event, e.g. to export metrics.
+
+        Stages are reported as ("stage.<stage>", seconds) and counters as
+        ("<counter>", amount). Hooks run in the querying thread and only when
+        metrics are enabled.
+        """
+        self.metrics.add_hook(hook)
+
+    def cache_stats(self) -> dict:
+        """
+        Get the counters of the monthly data cache.
+
+        Returns:
+            dict: A dictionary containing hits, misses, evictions, entries and bytes.
+        """
+        return self.units.stats()
 
 
 class TemperatureMonthlyUnit(TemperatureUnitBase):
@@ -143,13 +1530,53 @@ class TemperatureMonthlyUnit(TemperatureUnitBase):
     read a single monthly temperature data file
     """
 
-    def __init__(self, source_folder: str, year: int, month: int, geohash: str) -> None:
+    def __init__(
+        self,
+        source_folder: str,
+        year: int,
+        month: int,
+        geohash: str,
+        loader: str = "pandas",
+        bounds: tuple[float, float, float, float] | None = None,
+        validation: str = "fast",
+        disk_cache: DiskUnitCache | None = None,
+    ) -> None:
+        """
+        Args:
+            source_folder (str): the path of the source data folder.
+            year (int): the year of the partition.
+            month (int): the month of the partition.
+            geohash (str): the geohash of the partition.
+            loader (str, optional): "pandas" to read all the columns into a DataFrame, "arrow" to read only latitude, longitude and temperature into NumPy arrays. Defaults to "pandas".
+            bounds (tuple[float, float, float, float] | None, optional): (lat_min, lat_max, lon_min, lon_max), read only the rows within these bounds. Requires the "arrow" loader. Defaults to None.
+            validation (str, optional): "full" (pandera), "fast" (column types and value ranges) or "trusted" (skip). Defaults to "fast".
+            disk_cache (DiskUnitCache | None, optional): the cache of the decoded partition on local disk, used without bounds. Requires the "arrow" loader. Defaults to None.
+        """
         super().__init__()
         self.source_folder = source_folder
         self.year = year
         self.month = month
         self.geohash = geohash
 
+        if loader not in LOADERS:
+            raise ValueError(f"Unsupported loader: {loader}. Use one of {LOADERS}.")
+        if bounds is not None and loader != "arrow":
+            raise ValueError("bounds requires the arrow loader.")
+        self.loader = loader
+        self.bounds = bounds
+
+        if validation not in VALIDATION_MODES:
+            raise ValueError(
+                f"Unsupported validation mode: {validation}. Use one of {VALIDATION_MODES}."
+            )
+        self.validation = validation
+
+        if disk_cache is not None and loader != "arrow":
+            raise ValueError("disk_cache requires the arrow loader.")
+        self.disk_cache = disk_cache if bounds is None else None
+        # True if the data was read from the disk cache, None without one
+        self.disk_cache_hit = None
+
         self.filename = self.build_filename()
 
         # check if file format if valid
@@ -164,12 +1591,66 @@ class TemperatureMonthlyUnit(TemperatureUnitBase):
             self.file_exist = True
 
     @property
-    def data(self) -> pd.DataFrame:
-        """Property to get the DataFrame, loading it if necessary."""
+    def data(self) -> pd.DataFrame | dict[str, np.ndarray]:
+        """Property to get the DataFrame (or the arrays with the arrow loader), loading it if necessary."""
         if not hasattr(self, "_data"):
             self._data = self.load()
         return self._data
 
+    @property
+    def nbytes(self) -> int:
+        """the size of the loaded data in bytes, 0 if not loaded"""
+        if not hasattr(self, "_data"):
+            return 0
+        if isinstance(self._data, pd.DataFrame):
+            nbytes = int(self._data.memory_usage(deep=True).sum())
+        else:
+            nbytes = sum(array.nbytes for array in self._data.values())
+        return nbytes + self._index.nbytes
+
+    @property
+    def bytes_read(self) -> int:
+        """
+        The size on disk of the data a load reads.
+
+        The whole file with the pandas loader. With the arrow loader, the column
+        chunks of ARROW_COLUMNS in the row groups that overlap the bounds, or the
+        file of the disk cache if the data was read from it.
+        """
+        if self.disk_cache_hit:
+            return (
+                self.disk_cache.path(self.year, self.month, self.geohash).stat().st_size
+            )
+        if self.loader == "pandas":
+            return self.filename.stat().st_size
+
+        metadata = pq.read_metadata(self.filename)
+        nbytes = 0
+        for i in range(metadata.num_row_groups):
+            row_group = metadata.row_group(i)
+            columns = {
+                row_group.column(j).path_in_schema: row_group.column(j)
+                for j in range(row_group.num_columns)
+            }
+            if self.bounds is not None and not self._overlaps_bounds(columns):
+                continue
+            nbytes += sum(columns[name].total_compressed_size for name in ARROW_COLUMNS)
+        return nbytes
+
+    def _overlaps_bounds(self, columns: dict) -> bool:
+        # a row group without statistics cannot be skipped
+        lat_min, lat_max, lon_min, lon_max = self.bounds
+        for name, low, high in (
+            ("latitude", lat_min, lat_max),
+            ("longitude", lon_min, lon_max),
+        ):
+            statistics = columns[name].statistics
+            if statistics is None or not statistics.has_min_max:
+                continue
+            if statistics.max < low or statistics.min > high:
+                return False
+        return True
+
     def build_filename(self) -> Path:
         """build the filename"""
         # build the filename
@@ -183,9 +1664,11 @@ class TemperatureMonthlyUnit(TemperatureUnitBase):
         )
         return self.filename
 
-    def load(self) -> pd.DataFrame:
+    def load(self) -> pd.DataFrame | dict[str, np.ndarray]:
         """load the data"""
-        if self.file_exist:
+        if self.file_exist and self.loader == "arrow":
+            df = self.load_from_local_arrow()
+        elif self.file_exist:
             df = self.load_from_local()
         else:
             # if the file doesn't exist, load from API (not implemented yet)
@@ -198,42 +1681,132 @@ class TemperatureMonthlyUnit(TemperatureUnitBase):
 
     def load_from_local(self) -> pd.DataFrame:
         """load data from a file"""
-        logger.info(f"Loading data from {self.filename}")
-        self.df = pd.read_parquet(self.filename)
-        # validate the DataFrame
-        self.validate_dataframe(self.df)
+        logger.debug("Loading data from %s", self.filename)
+        table = pq.read_table(self.filename, memory_map=True)
+        if self.validation == "fast":
+            self.validate_table(table)
+        self.df = table.to_pandas()
+        if self.validation == "full":
+            # validate the DataFrame
+            self.validate_dataframe(self.df)
+        self.build_index(self.df)
         return self.df
 
-    def validate_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Validate the DataFrame using pandera."""
+    def load_from_local_arrow(self) -> dict[str, np.ndarray]:
+        """load only the needed columns (and rows within self.bounds) from a file into NumPy arrays"""
+        logger.debug("Loading data from %s with the arrow loader", self.filename)
+
+        filters = None
+        if self.bounds is not None:
+            # row groups outside the bounds are skipped using their statistics
+            lat_min, lat_max, lon_min, lon_max = self.bounds
+            filters = [
+                ("latitude", ">=", lat_min),
+                ("latitude", "<=", lat_max),
+                ("longitude", ">=", lon_min),
+                ("longitude", "<=", lon_max),
+            ]
+
+        table = None
+        if self.disk_cache is not None:
+            # a cached file was validated before it was written
+            cache_file = self.disk_cache.path(self.year, self.month, self.geohash)
+            table = self.disk_cache.read(self.filename, cache_file)
+            self.disk_cache_hit = table is not None
 
-        # Define the schema
-        schema = pa.DataFrameSchema(
-            {
-                "date": Column(pa.DateTime, nullable=True),
-                "longitude": Column(
-                    pa.Float64,
-                    checks=[
-                        Check.in_range(-180.0, 180.0, error="Longitude out of range")
-                    ],
-                    nullable=False,
-                ),
-                "latitude": Column(
-                    pa.Float64,
-                    checks=[Check.in_range(-90.0, 90.0, error="Latitude out of range")],
-                    nullable=False,
-                ),
-                "temperature_celsius_mean": Column(pa.Float32, nullable=True),
-                "geohash_l1": Column(
-                    pa.String,
-                    # level‑1 geohash is one character
-                    Check.str_length(1),
-                    nullable=False,
-                ),
-            },
-            # Attempts to coerce dtypes to the defined types if possible
-            coerce=False,
+        if table is None:
+            table = pq.read_table(
+                self.filename, columns=ARROW_COLUMNS, filters=filters, memory_map=True
+            )
+            if self.validation == "fast":
+                self.validate_table(table, ARROW_COLUMNS)
+            elif self.validation == "full":
+                self.validate_dataframe(table.to_pandas(), ARROW_COLUMNS)
+            if self.disk_cache is not None:
+                self.disk_cache.write(self.filename, cache_file, table)
+
+        data = {
+            name: table.column(name).to_numpy(zero_copy_only=False)
+            for name in ARROW_COLUMNS
+        }
+        self.build_index(data)
+        return data
+
+    def build_index(self, df: pd.DataFrame | dict[str, np.ndarray]) -> None:
+        """index the rows by grid cell so a point lookup doesn't scan the data"""
+        self._index = CellIndex(
+            np.asarray(df["latitude"]), np.asarray(df["longitude"]), tolerance=1e-2
+        )
+        self._temperatures = np.asarray(df["temperature_celsius_mean"])
+
+    def shared_arrays(self) -> dict[str, np.ndarray]:
+        """the arrays of the arrow loader and of the index, to share with attach"""
+        if self.loader != "arrow":
+            raise ValueError("Only units of the arrow loader can be shared.")
+        arrays = dict(self.data)
+        for name, array in self._index.arrays().items():
+            arrays[f"index_{name}"] = array
+        return arrays
+
+    def attach(self, arrays: dict[str, np.ndarray]) -> None:
+        """use the arrays of shared_arrays, e.g. memory-mapped, without copying them"""
+        self._data = {name: arrays[name] for name in ARROW_COLUMNS}
+        self._index = CellIndex.from_arrays(
+            arrays["latitude"],
+            arrays["longitude"],
+            arrays["index_keys"],
+            arrays["index_order"],
+            tolerance=1e-2,
         )
+        self._temperatures = arrays["temperature_celsius_mean"]
+
+    def validate_table(
+        self, table: pyarrow.Table, columns: list[str] | None = None
+    ) -> None:
+        """Validate an Arrow table quickly: column types plus vectorized null and range checks."""
+        columns = columns or list(MONTHLY_COLUMN_TYPES)
+        for name in columns:
+            if name not in table.column_names:
+                raise ValueError(f"Missing column {name} in {self.filename}.")
+            dtype = table.schema.field(name).type
+            if not MONTHLY_COLUMN_TYPES[name](dtype):
+                raise ValueError(
+                    f"Column {name} in {self.filename} has unexpected type {dtype}."
+                )
+
+        for name, low, high in [
+            ("latitude", -90.0, 90.0),
+            ("longitude", -180.0, 180.0),
+        ]:
+            if name not in columns:
+                continue
+            column = table.column(name)
+            if column.null_count:
+                raise ValueError(f"Column {name} in {self.filename} has nulls.")
+            if len(column) == 0:
+                continue
+            min_max = pc.min_max(column)
+            if min_max["min"].as_py() < low or min_max["max"].as_py() > high:
+                raise ValueError(f"Column {name} in {self.filename} is out of range.")
+
+        if "geohash_l1" in columns and len(table) > 0:
+            column = table.column("geohash_l1")
+            # level‑1 geohash is one character
+            lengths = pc.min_max(pc.utf8_length(column))
+            if (
+                column.null_count
+                or lengths["min"].as_py() != 1
+                or lengths["max"].as_py() != 1
+            ):
+                raise ValueError(f"Column geohash_l1 in {self.filename} is invalid.")
+
+    def validate_dataframe(
+        self, df: pd.DataFrame, columns: list[str] | None = None
+    ) -> pd.DataFrame:
+        """Validate the DataFrame using pandera."""
+        schema = monthly_schema()
+        if columns is not None:
+            schema = schema.select_columns(columns)
 
         # Validate the DataFrame
         schema.validate(df)
@@ -249,20 +1822,36 @@ class TemperatureMonthlyUnit(TemperatureUnitBase):
         # validate the input parameters such latitude and longitude
         vd.check_coordinates(latitude, longitude)
 
-        # Check if the DataFrame is loaded
-        if not hasattr(self, "_data") or self._data.empty:
+        # Check if the data is loaded
+        if not hasattr(self, "_data"):
             self._data = self.load()
 
-        tolerance = 1e-2
-        lat_close = np.isclose(self._data["latitude"], latitude, atol=tolerance)
-        lon_close = np.isclose(self._data["longitude"], longitude, atol=tolerance)
-
-        filter_data = self._data[lat_close & lon_close]
-        if filter_data.empty:
-            logger.info(f"Temperature data not found for {latitude}, {longitude}")
+        row = self._index.lookup(latitude, longitude)
+        if row < 0:
+            logger.debug("Temperature data not found for %s, %s", latitude, longitude)
             return None
         else:
             # get the temperature value
-            value = filter_data["temperature_celsius_mean"].values[0]
+            value = self._temperatures[row]
 
         return value
+
+    def query_many(
+        self, latitudes: np.ndarray, longitudes: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """query the temperature values of many points
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: the temperature values and a mask of the points found
+        """
+        vd.check_coordinates_many(latitudes, longitudes)
+
+        # Check if the data is loaded
+        if not hasattr(self, "_data"):
+            self._data = self.load()
+
+        rows = self._index.lookup_many(latitudes, longitudes)
+        found = rows >= 0
+        values = np.full(len(rows), np.nan, dtype=np.float32)
+        values[found] = self._temperatures[rows[found]]
+        return values, found
@@ -0,0 +1,664 @@
+from datetime import datetime, timezone
+from importlib.metadata import version, PackageNotFoundError
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from time import perf_counter
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from .compact import find_partitions
+from .synthetic import generate
+from ..cache import CACHE_POLICIES
+from ..temperature_monthly import (
+    TemperatureMonthly,
+    TemperatureMonthlyUnit,
+    LOADERS,
+    VALIDATION_MODES,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# the benchmark cases, in the order they run
+CASES = (
+    "single_query_cold",
+    "single_query_warm",
+    "batch_query",
+    "query_range",
+    "partition_load",
+    "cache_pressure",
+    "parallel_batch_query",
+    "threaded_query",
+)
+
+# the maximum distance in degrees of the query points from their grid points
+JITTER = 0.02
+
+
+def summarize(seconds: list[float]) -> dict:
+    """latency percentiles in milliseconds"""
+    milliseconds = 1000 * np.asarray(seconds)
+    return {
+        "n": len(milliseconds),
+        "mean_ms": float(milliseconds.mean()),
+        "p50_ms": float(np.percentile(milliseconds, 50)),
+        "p95_ms": float(np.percentile(milliseconds, 95)),
+        "max_ms": float(milliseconds.max()),
+    }
+
+
+def default_workers() -> list[int]:
+    """0 (in-process), then powers of two up to the number of CPUs"""
+    cpus = os.cpu_count() or 1
+    workers = [0]
+    while workers[-1] < cpus:
+        workers.append(min(max(1, 2 * workers[-1]), cpus))
+    return workers
+
+
+def result(name: str, params: dict, metrics: dict) -> dict:
+    return {"name": name, "params": params, "metrics": metrics}
+
+
+def query(temp_monthly: TemperatureMonthly, point: tuple) -> dict:
+    """query a row of sample_points, which has numpy integers"""
+    return temp_monthly.query(
+        int(point.year), int(point.month), point.latitude, point.longitude
+    )
+
+
+def sample_points(
+    partitions: pd.DataFrame, size: int, rng: np.random.Generator
+) -> pd.DataFrame:
+    """
+    Sample query points near the grid points of some partitions.
+
+    Args:
+        partitions (pd.DataFrame): The partitions to sample from, as returned by find_partitions.
+        size (int): The number of points, one per partition row.
+        rng (np.random.Generator): The random generator.
+
+    Returns:
+        pd.DataFrame: year, month, geohash, latitude and longitude of the points.
+    """
+    coordinates = {}
+    rows = []
+    for partition in partitions.itertuples():
+        if partition.file not in coordinates:
+            table = pq.read_table(partition.file, columns=["latitude", "longitude"])
+            coordinates[partition.file] = (
+                table.column("latitude").to_numpy(),
+                table.column("longitude").to_numpy(),
+            )
+        latitudes, longitudes = coordinates[partition.file]
+        i = rng.integers(len(latitudes))
+        rows.append(
+            (
+                partition.year,
+                partition.month,
+                partition.geohash,
+                latitudes[i],
+                longitudes[i],
+            )
+        )
+
+    points = pd.DataFrame(
+        rows, columns=["year", "month", "geohash", "latitude", "longitude"]
+    )
+    jitter = rng.uniform(-JITTER, JITTER, size=(len(points), 2))
+    points["latitude"] = np.clip(points["latitude"] + jitter[:, 0], -90, 90)
+    points["longitude"] = np.clip(points["longitude"] + jitter[:, 1], -180, 180)
+    return points.iloc[:size]
+
+
+def bench_single_query_cold(
+    source_folder: Path, partitions: pd.DataFrame, rng: np.random.Generator, **options
+) -> list[dict]:
+    """a query per partition, with the partition not in the cache"""
+    size = min(options["queries"], len(partitions))
+    points = sample_points(partitions.sample(size, random_state=rng), size, rng)
+    temp_monthly = TemperatureMonthly(source_folder=source_folder)
+
+    # the first query also loads the grid and its KD-tree
+    start = perf_counter()
+    query(temp_monthly, next(points.itertuples()))
+    first_query = perf_counter() - start
+
+    seconds = []
+    for point in points.itertuples():
+        temp_monthly.units.clear()
+        start = perf_counter()
+        query(temp_monthly, point)
+        seconds.append(perf_counter() - start)
+
+    return [
+        result(
+            "single_query_cold",
+            {"queries": size},
+            {"first_query_ms": 1000 * first_query, **summarize(seconds)},
+        )
+    ]
+
+
+def bench_single_query_warm(
+    source_folder: Path, partitions: pd.DataFrame, rng: np.random.Generator, **options
+) -> list[dict]:
+    """queries of a partition already in the cache"""
+    partition = partitions.iloc[[rng.integers(len(partitions))]]
+    points = sample_points(
+        partition.loc[partition.index.repeat(options["queries"])],
+        options["queries"],
+        rng,
+    )
+    temp_monthly = TemperatureMonthly(source_folder=source_folder)
+    query(temp_monthly, next(points.itertuples()))
+
+    seconds = []
+    for point in points.itertuples():
+        start = perf_counter()
+        query(temp_monthly, point)
+        seconds.append(perf_counter() - start)
+
+    metrics = summarize(seconds)
+    metrics["queries_per_s"] = len(seconds) / sum(seconds)
+    return [result("single_query_warm", {"queries": len(seconds)}, metrics)]
+
+
+def bench_batch_query(
+    source_folder: Path, partitions: pd.DataFrame, rng: np.random.Generator, **options
+) -> list[dict]:
+    """query_many throughput over points spread across all the partitions"""
+    points = sample_points(
+        partitions.sample(options["batch_size"], replace=True, random_state=rng),
+        options["batch_size"],
+        rng,
+    )
+    arrays = [
+        points[column].to_numpy()
+        for column in ["year", "month", "latitude", "longitude"]
+    ]
+
+    results = []
+    for cache in ["cold", "warm"]:
+        seconds = []
+        temp_monthly = TemperatureMonthly(
+            source_folder=source_folder, max_cache_size=len(partitions)
+        )
+        temp_monthly.query_many(*arrays)
+        for _ in range(options["repeat"]):
+            if cache == "cold":
+                temp_monthly.units.clear()
+            start = perf_counter()
+            temp_monthly.query_many(*arrays)
+            seconds.append(perf_counter() - start)
+
+        best = min(seconds)
+        results.append(
+            result(
+                "batch_query",
+                {"batch_size": len(points), "cache": cache},
+                {
+                    "best_s": best,
+                    "mean_s": float(np.mean(seconds)),
+                    "points_per_s": len(points) / best,
+                    "partitions": int(
+                        points[["year", "month", "geohash"]].drop_duplicates().shape[0]
+                    ),
+                },
+            )
+        )
+    return results
+
+
+def bench_query_range(
+    source_folder: Path, partitions: pd.DataFrame, rng: np.random.Generator, **options
+) -> list[dict]:
+    """time-series queries over the first run of consecutive months of a geohash"""
+    geohash = partitions["geohash"].value_counts().index[0]
+    periods = pd.PeriodIndex(
+        sorted(
+            pd.Period(year=year, month=month, freq="M")
+            for year, month in partitions.loc[
+                partitions["geohash"] == geohash, ["year", "month"]
+            ].itertuples(index=False)
+        )
+    )
+    # the first run of consecutive months
+    breaks = np.flatnonzero(np.diff(periods.asi8) != 1)
+    periods = periods[: breaks[0] + 1] if len(breaks) else periods
+
+    in_range = partitions[
+        (partitions["geohash"] == geohash)
+        & (partitions["year"] == periods[0].year)
+        & (partitions["month"] == periods[0].month)
+    ]
+    point = sample_points(in_range, 1, rng).iloc[0]
+
+    results = []
+    for cache in ["cold", "warm"]:
+        seconds = []
+        temp_monthly = TemperatureMonthly(
+            source_folder=source_folder, max_cache_size=len(periods)
+        )
+        temp_monthly.query_range(
+            point.latitude, point.longitude, periods[0], periods[-1]
+        )
+        for _ in range(options["repeat"]):
+            if cache == "cold":
+                temp_monthly.units.clear()
+            start = perf_counter()
+            temp_monthly.query_range(
+                point.latitude, point.longitude, periods[0], periods[-1]
+            )
+            seconds.append(perf_counter() - start)
+
+        metrics = summarize(seconds)
+        metrics["months_per_s"] = len(periods) / min(seconds)
+        results.append(
+            result("query_range", {"months": len(periods), "cache": cache}, metrics)
+        )
+    return results
+
+
+def bench_partition_load(
+    source_folder: Path, partitions: pd.DataFrame, rng: np.random.Generator, **options
+) -> list[dict]:
+    """the cost of reading and validating a partition, per loader and validation mode"""
+    sample = partitions.sample(
+        min(options["load_partitions"], len(partitions)), random_state=rng
+    )
+    rows = sum(pq.ParquetFile(file).metadata.num_rows for file in sample["file"])
+    file_bytes = sum(Path(file).stat().st_size for file in sample["file"])
+
+    results = []
+    for loader in LOADERS:
+        for validation in VALIDATION_MODES:
+            # import the validation and loading dependencies before timing
+            TemperatureMonthlyUnit(
+                source_folder,
+                sample.iloc[0].year,
+                sample.iloc[0].month,
+                sample.iloc[0].geohash,
+                loader=loader,
+                validation=validation,
+            ).data
+
+            seconds = []
+            nbytes = 0
+            for partition in sample.itertuples():
+                start = perf_counter()
+                unit = TemperatureMonthlyUnit(
+                    source_folder,
+                    partition.year,
+                    partition.month,
+                    partition.geohash,
+                    loader=loader,
+                    validation=validation,
+                )
+                unit.data
+                seconds.append(perf_counter() - start)
+                nbytes += unit.nbytes
+
+            total = sum(seconds)
+            metrics = summarize(seconds)
+            metrics.update(
+                {
+                    "rows_per_s": rows / total,
+                    "file_mb_per_s": file_bytes / total / 1e6,
+                    "memory_bytes_per_row": nbytes / rows,
+                }
+            )
+            results.append(
+                result(
+                    "partition_load",
+                    {"loader": loader, "validation": validation},
+                    metrics,
+                )
+            )
+    return results
+
+
+def bench_cache_pressure(
+    source_folder: Path, partitions: pd.DataFrame, rng: np.random.Generator, **options
+) -> list[dict]:
+    """a Zipf-distributed query stream with a memory budget smaller than the dataset"""
+    # the memory of the whole dataset, estimated from one partition
+    rows = np.array(
+        [pq.ParquetFile(file).metadata.num_rows for file in partitions["file"]]
+    )
+    largest = partitions.iloc[rows.argmax()]
+    unit = TemperatureMonthlyUnit(
+        source_folder, largest.year, largest.month, largest.geohash
+    )
+    unit.data
+    dataset_bytes = int(unit.nbytes / rows.max() * rows.sum())
+    max_bytes = int(options["cache_fraction"] * dataset_bytes)
+
+    # the popularity of a partition is 1 / rank
+    ranks = rng.permutation(len(partitions)) + 1
+    probabilities = 1 / ranks / (1 / ranks).sum()
+    stream = partitions.iloc[
+        rng.choice(len(partitions), size=options["stream_length"], p=probabilities)
+    ]
+    points = sample_points(stream, len(stream), rng)
+
+    results = []
+    for policy in CACHE_POLICIES:
+        temp_monthly = TemperatureMonthly(
+            source_folder=source_folder,
+            max_cache_size=len(partitions),
+            max_cache_bytes=max_bytes,
+            cache_policy=policy,
+        )
+        temp_monthly.snap(0.0, 0.0, temp_monthly.grid_name)
+
+        seconds = []
+        for point in points.itertuples():
+            start = perf_counter()
+            query(temp_monthly, point)
+            seconds.append(perf_counter() - start)
+
+        stats = temp_monthly.cache_stats()
+        metrics = summarize(seconds)
+        metrics.update(
+            {
+                "hit_rate": stats["hits"] / (stats["hits"] + stats["misses"]),
+                "evictions": stats["evictions"],
+                "cache_bytes": stats["bytes"],
+            }
+        )
+        results.append(
+            result(
+                "cache_pressure",
+                {
+                    "policy": policy,
+                    "queries": len(points),
+                    "max_cache_bytes": max_bytes,
+                    "dataset_bytes": dataset_bytes,
+                },
+                metrics,
+            )
+        )
+    return results
+
+
+def bench_parallel_batch_query(
+    source_folder: Path, partitions: pd.DataFrame, rng: np.random.Generator, **options
+) -> list[dict]:
+    """query_many with the partitions loaded in worker processes, against in-process"""
+    points = sample_points(
+        partitions.sample(options["batch_size"], replace=True, random_state=rng),
+        options["batch_size"],
+        rng,
+    )
+    arrays = [
+        points[column].to_numpy()
+        for column in ["year", "month", "latitude", "longitude"]
+    ]
+
+    results = []
+    baseline = None
+    for workers in options["workers"]:
+        temp_monthly = TemperatureMonthly(
+            source_folder=source_folder,
+            loader="arrow",
+            max_cache_size=len(partitions),
+            workers=workers,
+        )
+        try:
+            # start the worker processes and load the grid
+            temp_monthly.query_many(*arrays)
+            seconds = []
+            for _ in range(options["repeat"]):
+                # workers cache nothing, the in-process cache is emptied to compare
+                temp_monthly.units.clear()
+                start = perf_counter()
+                temp_monthly.query_many(*arrays)
+                seconds.append(perf_counter() - start)
+        finally:
+            temp_monthly.close()
+
+        best = min(seconds)
+        baseline = baseline or best
+        results.append(
+            result(
+                "parallel_batch_query",
+                {"batch_size": len(points), "workers": workers},
+                {
+                    "best_s": best,
+                    "mean_s": float(np.mean(seconds)),
+                    "points_per_s": len(points) / best,
+                    "speedup": baseline / best,
+                    "efficiency": baseline / best / max(workers, 1),
+                },
+            )
+        )
+    return results
+
+
+def bench_threaded_query(
+    source_folder: Path, partitions: pd.DataFrame, rng: np.random.Generator, **options
+) -> list[dict]:
+    """single queries from threads sharing an instance, cold then warm, per number of cache stripes"""
+    points = sample_points(
+        partitions.sample(options["stream_length"], replace=True, random_state=rng),
+        options["stream_length"],
+        rng,
+    )
+
+    def run_queries(temp_monthly: TemperatureMonthly, chunk: pd.DataFrame) -> None:
+        for point in chunk.itertuples():
+            query(temp_monthly, point)
+
+    results = []
+    for stripes in (1, 8):
+        baseline = None
+        for threads in options["threads"]:
+            temp_monthly = TemperatureMonthly(
+                source_folder=source_folder,
+                # no limit, the stripes would split a limit unevenly
+                max_cache_size=None,
+                cache_stripes=stripes,
+                metrics=True,
+            )
+            temp_monthly.snap(0.0, 0.0, temp_monthly.grid_name)
+            chunks = [points.iloc[i::threads] for i in range(threads)]
+
+            seconds = []
+            with ThreadPoolExecutor(threads) as pool:
+                # the first run loads the partitions, the second one hits the cache
+                for _ in range(2):
+                    start = perf_counter()
+                    list(pool.map(run_queries, [temp_monthly] * threads, chunks))
+                    seconds.append(perf_counter() - start)
+
+            counters = temp_monthly.metrics_snapshot()["counters"]
+            baseline = baseline or seconds[1]
+            results.append(
+                result(
+                    "threaded_query",
+                    {"queries": len(points), "threads": threads, "stripes": stripes},
+                    {
+                        "cold_queries_per_s": len(points) / seconds[0],
+                        "warm_queries_per_s": len(points) / seconds[1],
+                        "speedup": baseline / seconds[1],
+                        "partitions_loaded": counters.get("partitions_loaded", 0),
+                        "load_waits": counters.get("load_waits", 0),
+                    },
+                )
+            )
+    return results
+
+
+BENCHMARKS = {
+    "single_query_cold": bench_single_query_cold,
+    "single_query_warm": bench_single_query_warm,
+    "batch_query": bench_batch_query,
+    "query_range": bench_query_range,
+    "partition_load": bench_partition_load,
+    "cache_pressure": bench_cache_pressure,
+    "parallel_batch_query": bench_parallel_batch_query,
+    "threaded_query": bench_threaded_query,
+}
+
+
+def run(
+    source_folder: str | Path,
+    cases: list[str] | None = None,
+    queries: int = 200,
+    batch_size: int = 10_000,
+    load_partitions: int = 20,
+    repeat: int = 5,
+    stream_length: int = 5000,
+    cache_fraction: float = 0.25,
+    workers: list[int] | None = None,
+    threads: list[int] | None = None,
+    seed: int = 0,
+) -> dict:
+    """
+    Run the benchmarks on a downloaded or synthetic monthly dataset.
+
+    Args:
+        source_folder (str | Path): The folder of the dataset, containing monthly/year=/month=/geohash=/data.parquet.
+        cases (list[str], optional): The benchmarks to run. Defaults to None (all of CASES).
+        queries (int, optional): The number of single queries per benchmark. Defaults to 200.
+        batch_size (int, optional): The number of points of a batch query. Defaults to 10_000.
+        load_partitions (int, optional): The number of partitions loaded per loader and validation mode. Defaults to 20.
+        repeat (int, optional): The number of repeats of batch and time-series queries. Defaults to 5.
+        stream_length (int, optional): The number of queries of the cache pressure stream. Defaults to 5000.
+        cache_fraction (float, optional): The cache memory budget as a fraction of the dataset in memory. Defaults to 0.25.
+        workers (list[int], optional): The numbers of worker processes of the parallel batch queries, the first is the baseline of the speedups. Defaults to None (0, 1, 2, 4, ... up to the number of CPUs).
+        threads (list[int], optional): The numbers of threads of the threaded queries, the first is the baseline of the speedups. Defaults to None (1, 2, 4 and 8).
+        seed (int, optional): The seed of the query points. Defaults to 0.
+
+    Returns:
+        dict: A dictionary containing:
+            - meta (dict): the package version, python, platform, time and dataset of the run.
+            - results (list[dict]): the name, params and metrics of each measurement.
+    """
+    cases = list(CASES) if cases is None else cases
+    for case in cases:
+        if case not in BENCHMARKS:
+            raise ValueError(f"Unsupported benchmark: {case}. Use one of {CASES}.")
+
+    source_folder = Path(source_folder)
+    found = find_partitions(source_folder)
+    if found.empty:
+        raise FileNotFoundError(f"No monthly partitions found in {source_folder}.")
+    found = found.sort_values(["year", "month", "geohash"], ignore_index=True)
+
+    options = {
+        "queries": queries,
+        "batch_size": batch_size,
+        "load_partitions": load_partitions,
+        "repeat": repeat,
+        "stream_length": stream_length,
+        "cache_fraction": cache_fraction,
+        "workers": default_workers() if workers is None else workers,
+        "threads": [1, 2, 4, 8] if threads is None else threads,
+    }
+    rng = np.random.default_rng(seed)
+
+    results = []
+    for case in cases:
+        logger.info(f"Running benchmark {case}")
+        results.extend(BENCHMARKS[case](source_folder, found, rng, **options))
+
+    try:
+        package_version = version("global-temperature")
+    except PackageNotFoundError:
+        package_version = None
+
+    return {
+        "meta": {
+            "version": package_version,
+            "python": platform.python_version(),
+            # False on free-threaded builds running without the GIL
+            "gil_enabled": getattr(sys, "_is_gil_enabled", lambda: True)(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "dataset": {
+                "source_folder": str(source_folder),
+                "partitions": len(found),
+                "years": sorted(found["year"].unique().tolist()),
+                "months": sorted(found["month"].unique().tolist()),
+                "file_bytes": int(sum(file.stat().st_size for file in found["file"])),
+            },
+            "options": {**options, "seed": seed},
+        },
+        "results": results,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark global_temperature queries on a monthly dataset."
+    )
+    parser.add_argument(
+        "--source",
+        help="a monthly dataset folder, a synthetic dataset is generated if omitted",
+    )
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--cases", nargs="+", choices=CASES)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--load-partitions", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--stream-length", type=int, default=5000)
+    parser.add_argument("--cache-fraction", type=float, default=0.25)
+    parser.add_argument("--workers", type=int, nargs="+")
+    parser.add_argument("--threads", type=int, nargs="+")
+    parser.add_argument("--seed", type=int, default=0)
+    synthetic = parser.add_argument_group("synthetic dataset")
+    synthetic.add_argument("--years", type=int, nargs="+", default=[2023, 2024])
+    synthetic.add_argument("--months", type=int, nargs="+", default=list(range(1, 13)))
+    synthetic.add_argument(
+        "--sample",
+        type=float,
+        default=0.1,
+        help="the fraction of the 01x01 grid points to write",
+    )
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as temporary:
+        source = args.source
+        if source is None:
+            source = generate(
+                temporary, args.years, args.months, sample=args.sample, seed=args.seed
+            )
+        results = run(
+            source,
+            cases=args.cases,
+            queries=args.queries,
+            batch_size=args.batch_size,
+            load_partitions=args.load_partitions,
+            repeat=args.repeat,
+            stream_length=args.stream_length,
+            cache_fraction=args.cache_fraction,
+            workers=args.workers,
+            threads=args.threads,
+            seed=args.seed,
+        )
+        if args.source is None:
+            results["meta"]["dataset"].update(
+                {"source_folder": None, "synthetic_sample": args.sample}
+            )
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+from pathlib import Path
+import logging
+import numpy as np
+import pandas as pd
+from .compact import find_partitions
+from .validate import check_year
+from ..climatology import Climatology
+from ..grids.grid import Grids
+
+
+logger = logging.getLogger(__name__)
+
+
+def compute_climatology(
+    source_folder: str | Path,
+    target_file: str | Path,
+    start_year: int = 1991,
+    end_year: int = 2020,
+    grid_name: str = "01x01",
+    min_years: int = 1,
+    ddof: int = 1,
+    tolerance: float = 1e-2,
+) -> Path:
+    """
+    Compute the mean and standard deviation of each grid cell and calendar month over a baseline period.
+
+    The dataset is read in a single streaming pass, one calendar month at a time:
+    the partitions of that month in each baseline year update running counts,
+    means and sums of squared deviations (Welford's algorithm) of every grid
+    cell, so memory is a few arrays of the size of the grid whatever the number
+    of years. Each partition row is mapped to its row position in the grid
+    parquet file, like in tools.compact.compact.
+
+    Args:
+        source_folder (str | Path): The folder the data was downloaded to.
+        target_file (str | Path): The path of the climatology file to write.
+        start_year (int, optional): The first year of the baseline (inclusive). Defaults to 1991.
+        end_year (int, optional): The last year of the baseline (inclusive). Defaults to 2020.
+        grid_name (str, optional): The grid the data is on. Defaults to "01x01".
+        min_years (int, optional): The minimum number of years with data for a cell and month to have a baseline. Defaults to 1.
+        ddof (int, optional): The delta degrees of freedom of the standard deviation, 1 for the sample standard deviation. Defaults to 1.
+        tolerance (float, optional): The maximum distance in degrees between a data point and its grid cell. Defaults to 1e-2.
+
+    Returns:
+        Path: The path of the climatology file.
+
+    Raises:
+        FileNotFoundError: If there are no partitions of the baseline years in the source folder.
+    """
+    check_year(start_year)
+    check_year(end_year)
+    if start_year > end_year:
+        raise ValueError(f"Start year {start_year} is after end year {end_year}.")
+    if min_years < 1:
+        raise ValueError(f"min_years {min_years} must be positive.")
+
+    partitions = find_partitions(source_folder)
+    if not partitions.empty:
+        partitions = partitions[partitions["year"].between(start_year, end_year)]
+    if partitions.empty:
+        raise FileNotFoundError(
+            f"No monthly partitions from {start_year} to {end_year} found in {source_folder}."
+        )
+
+    grid = Grids()
+    tree = grid.get_grid(grid_name)
+    n_cells = len(tree.data)
+
+    logger.info(
+        f"Computing the {start_year}-{end_year} climatology of {len(partitions)} partitions into {target_file}"
+    )
+    climatology = Climatology.create(
+        target_file, grid_name, n_cells, start_year, end_year, min_years
+    )
+
+    for month in range(1, 13):
+        counts = np.zeros(n_cells, dtype=np.int32)
+        means = np.zeros(n_cells, dtype=np.float64)
+        squares = np.zeros(n_cells, dtype=np.float64)
+
+        for partition in partitions[partitions["month"] == month].itertuples():
+            df = pd.read_parquet(
+                partition.file,
+                columns=["latitude", "longitude", "temperature_celsius_mean"],
+            )
+            distances, cells = tree.query(df[["latitude", "longitude"]].to_numpy())
+            on_grid = distances <= tolerance
+            if not on_grid.all():
+                logger.warning(
+                    f"{(~on_grid).sum()} points in {partition.file} are not on grid {grid_name}"
+                )
+            temperatures = df["temperature_celsius_mean"].to_numpy(dtype=np.float64)
+            # missing temperatures are not finite
+            valid = on_grid & np.isfinite(temperatures)
+
+            # a cell appears once in a partition, so the updates are vectorized
+            cells = cells[valid]
+            values = temperatures[valid]
+            counts[cells] += 1
+            deltas = values - means[cells]
+            means[cells] += deltas / counts[cells]
+            squares[cells] += deltas * (values - means[cells])
+
+        enough = counts >= min_years
+        with np.errstate(divide="ignore", invalid="ignore"):
+            stds = np.sqrt(squares / (counts - ddof))
+        climatology.data[:, month - 1, 0] = np.where(enough, means, np.nan)
+        climatology.data[:, month - 1, 1] = np.where(
+            enough & (counts > ddof), stds, np.nan
+        )
+
+    climatology.data.flush()
+    logger.info(f"Computed the climatology of {source_folder} into {target_file}")
+    return Path(target_file)
@@ -0,0 +1,105 @@
+from pathlib import Path
+import re
+import logging
+import numpy as np
+import pandas as pd
+from ..cube import TemperatureCube
+from ..grids.grid import Grids
+
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PATTERN = re.compile(r"year=(\d+)/month=(\d+)/geohash=([^/]+)/data\.parquet$")
+
+
+def find_partitions(
+    source_folder: str | Path, data_type: str = "monthly"
+) -> pd.DataFrame:
+    """
+    Find the partition files of a downloaded dataset.
+
+    Returns:
+        pd.DataFrame: A DataFrame with columns year, month, geohash and file.
+    """
+    rows = []
+    for file in (Path(source_folder) / data_type).glob(
+        "year=*/month=*/geohash=*/data.parquet"
+    ):
+        match = PARTITION_PATTERN.search(file.as_posix())
+        if match:
+            rows.append((int(match[1]), int(match[2]), match[3], file))
+    return pd.DataFrame(rows, columns=["year", "month", "geohash", "file"])
+
+
+def compact(
+    source_folder: str | Path,
+    target_file: str | Path,
+    grid_name: str = "01x01",
+    months_per_block: int = 12,
+    tolerance: float = 1e-2,
+) -> Path:
+    """
+    Compact a downloaded monthly dataset into a memory-mapped grid cell x month cube.
+
+    Each partition row is mapped to its row position in the grid parquet file, so a
+    query on the cube is a single array lookup. Months are written in blocks to
+    limit the number of passes over the file.
+
+    Args:
+        source_folder (str | Path): The folder the data was downloaded to.
+        target_file (str | Path): The path of the cube file to write.
+        grid_name (str, optional): The grid the data is on. Defaults to "01x01".
+        months_per_block (int, optional): The number of months held in memory before writing. Defaults to 12.
+        tolerance (float, optional): The maximum distance in degrees between a data point and its grid cell. Defaults to 1e-2.
+
+    Returns:
+        Path: The path of the cube file.
+
+    Raises:
+        FileNotFoundError: If there are no partitions in the source folder.
+    """
+    partitions = find_partitions(source_folder)
+    if partitions.empty:
+        raise FileNotFoundError(f"No monthly partitions found in {source_folder}.")
+
+    periods = pd.PeriodIndex.from_fields(
+        year=partitions["year"], month=partitions["month"], freq="M"
+    )
+    start, end = periods.min(), periods.max()
+    n_months = (end - start).n + 1
+    partitions["column"] = [(period - start).n for period in periods]
+
+    grid = Grids()
+    tree = grid.get_grid(grid_name)
+    n_cells = len(tree.data)
+
+    logger.info(
+        f"Compacting {len(partitions)} partitions from {start} to {end} into {target_file}"
+    )
+    cube = TemperatureCube.create(target_file, grid_name, n_cells, start, n_months)
+
+    for first in range(0, n_months, months_per_block):
+        block_months = min(months_per_block, n_months - first)
+        block = np.full((block_months, n_cells), np.nan, dtype=np.float32)
+
+        in_block = partitions["column"].between(first, first + block_months - 1)
+        for partition in partitions[in_block].itertuples():
+            df = pd.read_parquet(
+                partition.file,
+                columns=["latitude", "longitude", "temperature_celsius_mean"],
+            )
+            distances, cells = tree.query(df[["latitude", "longitude"]].to_numpy())
+            valid = distances <= tolerance
+            if not valid.all():
+                logger.warning(
+                    f"{(~valid).sum()} points in {partition.file} are not on grid {grid_name}"
+                )
+            block[partition.column - first, cells[valid]] = df[
+                "temperature_celsius_mean"
+            ].to_numpy()[valid]
+
+        cube.data[:, first : first + block_months] = block.T
+
+    cube.data.flush()
+    logger.info(f"Compacted {source_folder} into {target_file}")
+    return Path(target_file)
@@ -1,7 +1,14 @@
 from pathlib import Path
 import requests
+from requests.adapters import HTTPAdapter
 from typing import List, Union
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
 import tarfile
+import time
+import os
+import shutil
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
 from .validate import check_year
 from ..config import load_config
 from urllib.parse import urljoin
@@ -12,6 +19,15 @@ from datetime import datetime
 CONFIG = load_config()
 logger = logging.getLogger(__name__)
 
+# suffix of a partially downloaded file, kept between attempts to resume with a Range request
+PARTIAL_SUFFIX = ".part"
+# suffix of the file next to a partial file holding the ETag or Last-Modified
+# validator of its response, sent in If-Range so a changed file is not resumed
+VALIDATOR_SUFFIX = ".validator"
+# seconds to wait for the server to connect and to send data
+DOWNLOAD_TIMEOUT = (10, 60)
+DOWNLOAD_CHUNK_SIZE = 1 << 16
+
 
 def download(
     target_path: str,
@@ -22,10 +38,20 @@ def download(
     data_type: str = "monthly",
     delete_archived_files: bool = True,
     overwrite: bool = False,
+    max_workers: int = 4,
+    extract_workers: int = 2,
+    backoff: float = 1.0,
+    base_url: str | None = None,
+    stream: bool = False,
 ) -> List[int]:
     """
     Downloads data from Cloudflare R2 for the specified years or range of years.
 
+    Years are downloaded in parallel over a shared connection pool, and each
+    archive is extracted in a process pool as soon as it is downloaded, so
+    extraction overlaps with the remaining downloads. An interrupted download
+    is resumed from where it stopped on the next attempt.
+
     Args:
         target_path (str): The directory where the data will be downloaded.
         years (List[int], optional): A list of specific years to download.
@@ -35,6 +61,11 @@ def download(
         data_type (str): The type of data to download. Currently, only "monthly" is supported.
         delete_archived_files (bool): Whether to delete the archived files after extraction.
         overwrite (bool): Whether to overwrite existing files. e.g. If monthly/year=2021 folder exist, skip downloading this year. Defaults to False.
+        max_workers (int, optional): The number of years downloaded at the same time. Defaults to 4.
+        extract_workers (int, optional): The number of extraction processes. 0 extracts in the download threads. Defaults to 2.
+        backoff (float, optional): The wait in seconds before the first retry, doubled for each further retry. Defaults to 1.0.
+        base_url (str, optional): The server to download from. Defaults to the base_url in the config.
+        stream (bool, optional): Extract each archive while it is downloading, without writing the archive to disk. Interrupted downloads restart from the beginning, and the year folder is only replaced once its stream is complete. Defaults to False.
 
     Returns:
         List[int]: A list of years for which the download failed.
@@ -56,20 +87,19 @@ def download(
     # Validate the year
     [check_year(year) for year in years]
 
-    target_path = Path(target_path) / f"{data_type}"
-    target_path.mkdir(parents=True, exist_ok=True)
-
-    failed_years = []
+    if max_workers < 1 or extract_workers < 0:
+        raise ValueError(
+            "max_workers must be positive and extract_workers must not be negative."
+        )
 
-    for year in years:
-        # Form download URL
+    if base_url is None:
         base_url = CONFIG["base_url"]
-        path_template = f"{data_type}/year={year}.tar.xz"
-        url = urljoin(base_url, path_template)
 
-        file_name = f"year={year}.tar.xz"
-        file_path = target_path / file_name
+    target_path = Path(target_path) / f"{data_type}"
+    target_path.mkdir(parents=True, exist_ok=True)
 
+    archives = {}
+    for year in years:
         # Check if the year={year} folder already exists. For current year, we must overwrite it in case there is a new monthly data.
         if (
             overwrite is False
@@ -79,87 +109,375 @@ def download(
             logger.info(f"Skipping download for {year}. Folder already exists.")
             continue
 
-        success = False
-        retries = 0
-        while retries < max_tries and not success:
-            success = download_file(file_path, url)
-            if success:
-                break
-            else:
-                logger.info(f"Failed to download {url}. Retrying...")
-                retries += 1
-
-        if not success:
-            logger.info(f"Failed to download {url} after {max_tries} attempts.")
-            failed_years.append(year)
-
-        # Extract the file if download was successful
-        if success:
-            extract_file(file_path)
-            if delete_archived_files:
-                delete_file(file_path)
+        # Form download URL
+        path_template = f"{data_type}/year={year}.tar.xz"
+        url = urljoin(base_url, path_template)
+        archives[year] = (target_path / f"year={year}.tar.xz", url)
+
+    failed_years = set()
+    session = create_session(max_workers)
+    # streamed archives are extracted in the download threads. The extraction
+    # processes are spawned, as forking while the download threads hold the
+    # session's connection pool or logging locks can deadlock the children.
+    extractor = (
+        ProcessPoolExecutor(extract_workers, mp_context=get_context("spawn"))
+        if extract_workers and not stream
+        else None
+    )
 
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as downloader:
+            downloads = {
+                downloader.submit(
+                    download_with_retries,
+                    file_path,
+                    url,
+                    session,
+                    max_tries,
+                    backoff,
+                    None if extractor or stream else extract_file,
+                    stream,
+                ): year
+                for year, (file_path, url) in archives.items()
+            }
+
+            extractions = {}
+            for future in as_completed(downloads):
+                year = downloads[future]
+                file_path, url = archives[year]
+                if not future.result():
+                    logger.info(f"Failed to download {url} after {max_tries} attempts.")
+                    failed_years.add(year)
+                elif extractor:
+                    # Extract the file while the other years are downloading
+                    extractions[extractor.submit(extract_file, file_path)] = year
+                elif delete_archived_files and not stream:
+                    delete_file(file_path)
+
+            for future in as_completed(extractions):
+                year = extractions[future]
+                if not future.result():
+                    failed_years.add(year)
+                elif delete_archived_files:
+                    delete_file(archives[year][0])
+    finally:
+        if extractor:
+            extractor.shutdown()
+        session.close()
+
+    # keep the order of the requested years
+    failed_years = [year for year in archives if year in failed_years]
     if failed_years:
         logger.info(
-            f"Download failed for the following years after 2 retries: {failed_years}"
+            f"Download failed for the following years after {max_tries} tries: {failed_years}"
         )
 
     return failed_years
 
 
-def download_file(target_file: Path, url: str) -> bool:
+def create_session(pool_size: int = 4) -> requests.Session:
+    """
+    Create a session whose connection pool is shared by the download threads.
+
+    Args:
+        pool_size (int, optional): The number of connections kept open per host. Defaults to 4.
+
+    Returns:
+        requests.Session: The session.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def download_with_retries(
+    target_file: Path,
+    url: str,
+    session: requests.Session | None = None,
+    max_tries: int = 2,
+    backoff: float = 1.0,
+    extract=None,
+    stream: bool = False,
+) -> bool:
+    """
+    Download a file, retrying with exponential backoff.
+
+    Each retry resumes the partial file left by the previous attempt, except in
+    stream mode, where the archive is never written to disk.
+
+    Args:
+        target_file (Path): The path to the file to download.
+        url (str): The URL to download the file from.
+        session (requests.Session, optional): The session to download with.
+        max_tries (int, optional): The maximum number of download attempts. Defaults to 2.
+        backoff (float, optional): The wait in seconds before the first retry, doubled for each further retry. Defaults to 1.0.
+        extract (Callable[[Path], bool], optional): Called on the downloaded file, its result is returned.
+        stream (bool, optional): Extract the archive to the folder extract_file would use while it is downloading. Defaults to False.
+
+    Returns:
+        bool: True if the download (and extraction) was successful, False otherwise.
+    """
+    for retries in range(max_tries):
+        if retries:
+            delay = backoff * 2 ** (retries - 1)
+            logger.info(f"Failed to download {url}. Retrying in {delay} seconds...")
+            time.sleep(delay)
+        if stream:
+            if stream_file(url, extract_folder(target_file), session):
+                return True
+        elif download_file(target_file, url, session):
+            return extract(target_file) if extract else True
+    return False
+
+
+def download_file(
+    target_file: Path, url: str, session: requests.Session | None = None
+) -> bool:
     """
     Downloads a file from the specified URL.
 
+    The data is written to a ".part" file next to the target file, which is renamed
+    once complete. If a ".part" file is left by an interrupted download, only the
+    missing bytes are requested with an HTTP Range request. The ETag, or else the
+    Last-Modified date, of the response is kept next to the ".part" file and sent
+    in an If-Range header, so the download starts again from the beginning if the
+    remote file changed. A ".part" file without a validator is not resumed.
+
     Args:
         target_file (Path): The path to the file to download.
         url (str): The URL to download the file from.
+        session (requests.Session, optional): The session to download with. Defaults to a new connection.
 
     Returns:
         bool: True if the download was successful, False otherwise.
     """
-    logger.info(f"Downloading {url}")
-    response = requests.get(url, stream=True)
+    target_file = Path(target_file)
+    partial_file = target_file.with_name(target_file.name + PARTIAL_SUFFIX)
+    validator_file = partial_file.with_name(partial_file.name + VALIDATOR_SUFFIX)
 
     # Ensure the target directory exists
     target_file.parent.mkdir(parents=True, exist_ok=True)
 
-    if response.status_code == 200:
-        with target_file.open("wb") as file:
-            try:
-                for chunk in response.iter_content(chunk_size=8192):
+    offset = partial_file.stat().st_size if partial_file.is_file() else 0
+    validator = validator_file.read_text() if validator_file.is_file() else None
+    headers = {}
+    if offset and validator:
+        headers = {"Range": f"bytes={offset}-", "If-Range": validator}
+    else:
+        offset = 0
+
+    logger.info(f"Downloading {url}" + (f" from byte {offset}" if offset else ""))
+    try:
+        with (session or requests).get(
+            url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT
+        ) as response:
+            if response.status_code == 416 or (
+                response.status_code == 206
+                and response_validator(response) != validator
+            ):
+                # the partial file is not a prefix of the remote file, start again
+                partial_file.unlink()
+                validator_file.unlink(missing_ok=True)
+                logger.info(f"Cannot resume {url}, discarded {partial_file}")
+                return False
+            if response.status_code not in (200, 206):
+                logger.error(
+                    f"Failed to download {url}: HTTP status {response.status_code}"
+                )
+                return False
+
+            # a 200 response ignores the Range header, e.g. because the file
+            # changed, and sends the whole file
+            if response.status_code == 200:
+                validator = response_validator(response)
+                if validator:
+                    validator_file.write_text(validator)
+                else:
+                    validator_file.unlink(missing_ok=True)
+            mode = "ab" if response.status_code == 206 else "wb"
+            with partial_file.open(mode) as file:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
                     file.write(chunk)
-                logger.info(f"Downloaded {target_file.name} to {target_file}")
-                return True
-            except Exception as e:
+    except (requests.RequestException, OSError) as e:
+        logger.error(f"Error during download or writing file {target_file.name}: {e}")
+        return False
+
+    partial_file.replace(target_file)
+    validator_file.unlink(missing_ok=True)
+    logger.info(f"Downloaded {target_file.name} to {target_file}")
+    return True
+
+
+def response_validator(response: requests.Response) -> str | None:
+    """the strong ETag of a response, else its Last-Modified date, None if it has neither"""
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        # weak ETags cannot be used in If-Range
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+def stream_file(
+    url: str, extract_path: str | Path, session: requests.Session | None = None
+) -> bool:
+    """
+    Downloads a .tar.xz archive and extracts it as it arrives.
+
+    The response is decompressed and read in tarfile stream mode, so only the
+    extracted files are written to disk. The archive is extracted into a
+    temporary folder next to extract_path, which replaces extract_path once the
+    stream is complete, so a failed stream leaves no partial folder behind.
+
+    Args:
+        url (str): The URL of the .tar.xz archive.
+        extract_path (str | Path): The folder to extract the archive to.
+        session (requests.Session, optional): The session to download with. Defaults to a new connection.
+
+    Returns:
+        bool: True if the download and extraction were successful, False otherwise.
+    """
+    extract_path = Path(extract_path)
+    temp_path = extract_path.with_name(f".{extract_path.name}{PARTIAL_SUFFIX}")
+    # a folder left by an interrupted process
+    shutil.rmtree(temp_path, ignore_errors=True)
+
+    logger.info(f"Streaming {url} to {extract_path}")
+    try:
+        with (session or requests).get(
+            url, stream=True, timeout=DOWNLOAD_TIMEOUT
+        ) as response:
+            if response.status_code != 200:
                 logger.error(
-                    f"Error during download or writing file {target_file.name}: {e}"
+                    f"Failed to download {url}: HTTP status {response.status_code}"
                 )
                 return False
 
+            # undo any HTTP content encoding before the xz decompression
+            response.raw.decode_content = True
+            with tarfile.open(
+                fileobj=response.raw, mode="r|xz", bufsize=DOWNLOAD_CHUNK_SIZE
+            ) as tar:
+                extract_members(tar, temp_path)
+        replace_folder(temp_path, extract_path)
+    except (
+        requests.RequestException,
+        Urllib3HTTPError,
+        tarfile.TarError,
+        EOFError,
+        OSError,
+        ValueError,
+    ) as e:
+        logger.error(f"Failed to stream {url} to {extract_path}: {e}")
+        return False
+    finally:
+        shutil.rmtree(temp_path, ignore_errors=True)
+
+    logger.info(f"Extracted {url} to {extract_path}")
+    return True
+
+
+def replace_folder(source: Path, target: Path) -> None:
+    """
+    Move a folder to target, replacing the folder or link already there.
+
+    The old folder is renamed aside first and deleted once the new one is in place.
+    """
+    previous = target.with_name(f".{target.name}.previous")
+    if target.is_symlink():
+        target.unlink()
+    elif target.exists():
+        shutil.rmtree(previous, ignore_errors=True)
+        target.rename(previous)
+    source.rename(target)
+    shutil.rmtree(previous, ignore_errors=True)
+
+
+def extract_members(tar: tarfile.TarFile, extract_path: str | Path) -> None:
+    """
+    Extracts the members of an archive one by one, in archive order.
+
+    Works on archives opened in stream mode. Each file is written to a temporary
+    file and renamed, so a file is either complete or missing. Only regular files
+    and folders are extracted.
+
+    Args:
+        tar (tarfile.TarFile): The opened archive.
+        extract_path (str | Path): The folder to extract the archive to.
+
+    Raises:
+        ValueError: If a member would be extracted outside extract_path.
+    """
+    extract_path = Path(extract_path).resolve()
+    extract_path.mkdir(parents=True, exist_ok=True)
+
+    for member in tar:
+        target = member_path(extract_path, member.name)
+        if member.isdir():
+            target.mkdir(parents=True, exist_ok=True)
+            continue
+        if not member.isfile():
+            logger.warning(f"Skipping archive member {member.name}: not a file.")
+            continue
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = target.with_name(f".{target.name}{PARTIAL_SUFFIX}")
+        try:
+            with tar.extractfile(member) as source, temp_file.open("wb") as file:
+                shutil.copyfileobj(source, file, DOWNLOAD_CHUNK_SIZE)
+            os.replace(temp_file, target)
+        except BaseException:
+            temp_file.unlink(missing_ok=True)
+            raise
+
 
-def extract_file(file_path: str | Path):
+def member_path(extract_path: Path, name: str) -> Path:
+    """
+    The path an archive member is extracted to.
+
+    Raises:
+        ValueError: If the member would be extracted outside extract_path.
+    """
+    target = (extract_path / name).resolve()
+    if not target.is_relative_to(extract_path):
+        raise ValueError(f"Archive member {name} is outside {extract_path}.")
+    return target
+
+
+def extract_folder(file_path: str | Path) -> Path:
+    """the folder an archive is extracted to, e.g. monthly/year=2024 for monthly/year=2024.tar.xz"""
+    file_path = Path(file_path)
+    return file_path.parent / str(file_path.name).split(".")[0]
+
+
+def extract_file(file_path: str | Path) -> bool:
     """
     Extracts a .tar.xz file to the same folder as the file's parent folder.
 
     Args:
         file_path (str | Path): The path to the .tar.xz file to extract.
+
+    Returns:
+        bool: True if the extraction was successful, False otherwise.
     """
     file_path = Path(file_path)
 
     if not file_path.is_file() or not file_path.suffixes == [".tar", ".xz"]:
         logger.error(f"Invalid file: {file_path}. Must be a .tar.xz file.")
-        return
+        return False
 
-    extract_path = file_path.parent / str(file_path.name).split(".")[0]
+    extract_path = extract_folder(file_path)
 
     try:
         logger.info(f"Extracting {file_path} to {extract_path}")
         with tarfile.open(file_path, "r:xz") as tar:
-            tar.extractall(path=extract_path)
+            extract_members(tar, extract_path)
             logger.info(f"Extracted {file_path} to {extract_path}")
     except Exception as e:
         logger.error(f"Failed to extract {file_path}: {e}")
+        return False
+    return True
 
 
 def delete_file(file_path: str | Path):
@@ -0,0 +1,232 @@
+from pathlib import Path
+from time import perf_counter
+from typing import Iterator
+import argparse
+import logging
+import os
+import sys
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from .download import PARTIAL_SUFFIX
+from .. import setup_logging
+from ..temperature_monthly import TemperatureMonthly
+
+
+logger = logging.getLogger(__name__)
+
+# the columns added to each row, from the results of query_many
+OUTPUT_COLUMNS = [
+    "temperature",
+    "distance",
+    "snapped_latitude",
+    "snapped_longitude",
+    "status",
+]
+
+
+def file_format(path: str | Path) -> str:
+    """the format of a point file, "csv" or "parquet", from its extension"""
+    suffixes = Path(path).suffixes
+    if ".parquet" in suffixes or ".pq" in suffixes:
+        return "parquet"
+    if ".csv" in suffixes:
+        return "csv"
+    raise ValueError(f"Unsupported file format: {path}. Use .csv or .parquet.")
+
+
+def read_chunks(input_file: str | Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """read a CSV or Parquet file in DataFrames of at most chunk_size rows"""
+    if file_format(input_file) == "csv":
+        with pd.read_csv(input_file, chunksize=chunk_size) as reader:
+            yield from reader
+        return
+
+    for batch in pq.ParquetFile(input_file).iter_batches(batch_size=chunk_size):
+        yield batch.to_pandas()
+
+
+class ChunkWriter:
+    """Append DataFrames to a CSV or Parquet file."""
+
+    def __init__(self, output_file: str | Path, file_format: str) -> None:
+        self.output_file = output_file
+        self.file_format = file_format
+        self._parquet_writer = None
+        self._header = True
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self.file_format == "csv":
+            df.to_csv(
+                self.output_file,
+                mode="w" if self._header else "a",
+                header=self._header,
+                index=False,
+            )
+            self._header = False
+            return
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._parquet_writer is None:
+            self._parquet_writer = pq.ParquetWriter(self.output_file, table.schema)
+        else:
+            # a column of a CSV chunk may be inferred with another type
+            table = table.cast(self._parquet_writer.schema)
+        self._parquet_writer.write_table(table)
+
+    def close(self) -> None:
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        elif self._header:
+            # no chunk was written, write an empty file
+            open(self.output_file, "w").close()
+
+
+def enrich(
+    input_file: str | Path,
+    output_file: str | Path,
+    source_folder: str | Path = "",
+    chunk_size: int = 100_000,
+    date_column: str = "date",
+    year_column: str | None = None,
+    month_column: str | None = None,
+    latitude_column: str = "latitude",
+    longitude_column: str = "longitude",
+    **options,
+) -> dict:
+    """
+    Add the monthly temperature of each row of a CSV or Parquet point file.
+
+    The input is read and written chunk by chunk, so memory is bounded by the chunk
+    size and the partition cache, whatever the size of the input. Each chunk is
+    resolved with a single query_many: the points are snapped together and grouped
+    by partition. Inputs sorted by date load each partition fewer times.
+
+    The output has the input columns plus temperature, distance, snapped_latitude,
+    snapped_longitude and status, see TemperatureMonthly.query_many. It is written
+    to a partial file that is renamed to output_file when complete.
+
+    Args:
+        input_file (str | Path): The .csv or .parquet file of points.
+        output_file (str | Path): The .csv or .parquet file to write.
+        source_folder (str | Path, optional): The folder the data was downloaded to. Defaults to the default monthly data location.
+        chunk_size (int, optional): The number of rows read, queried and written at a time. Defaults to 100_000.
+        date_column (str, optional): The column of the dates, used unless year_column and month_column are given. Defaults to "date".
+        year_column (str, optional): The column of the years. Defaults to None.
+        month_column (str, optional): The column of the months. Defaults to None.
+        latitude_column (str, optional): The column of the latitudes. Defaults to "latitude".
+        longitude_column (str, optional): The column of the longitudes. Defaults to "longitude".
+        **options: Further arguments of TemperatureMonthly, e.g. search_radius, loader, max_cache_bytes or cube_file.
+
+    Returns:
+        dict: A dictionary containing rows, chunks, seconds and rows_per_s.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"Chunk size {chunk_size} must be positive.")
+    if (year_column is None) != (month_column is None):
+        raise ValueError("Give both year_column and month_column, or neither.")
+
+    output_file = Path(output_file)
+    partial_file = output_file.with_name(output_file.name + PARTIAL_SUFFIX)
+    writer = ChunkWriter(partial_file, file_format(output_file))
+    temp_monthly = TemperatureMonthly(source_folder=source_folder, **options)
+
+    rows = 0
+    chunks = 0
+    start = perf_counter()
+    try:
+        for df in read_chunks(input_file, chunk_size):
+            clashes = [column for column in OUTPUT_COLUMNS if column in df.columns]
+            if clashes:
+                raise ValueError(f"Input columns {clashes} would be overwritten.")
+
+            if year_column is not None:
+                years = df[year_column].to_numpy()
+                months = df[month_column].to_numpy()
+            else:
+                dates = pd.to_datetime(df[date_column])
+                years = dates.dt.year.to_numpy()
+                months = dates.dt.month.to_numpy()
+
+            result = temp_monthly.query_many(
+                years,
+                months,
+                df[latitude_column].to_numpy(),
+                df[longitude_column].to_numpy(),
+            )
+            for column in OUTPUT_COLUMNS:
+                df[column] = result[column]
+            writer.write(df)
+
+            rows += len(df)
+            chunks += 1
+            seconds = perf_counter() - start
+            logger.info(
+                f"Enriched {rows} rows in {seconds:.1f} s ({rows / seconds:.0f} rows/s)"
+            )
+        writer.close()
+    except BaseException:
+        writer.close()
+        partial_file.unlink(missing_ok=True)
+        raise
+    finally:
+        temp_monthly.close()
+
+    os.replace(partial_file, output_file)
+    seconds = perf_counter() - start
+    logger.info(f"Wrote {rows} rows to {output_file} in {seconds:.1f} s")
+    return {
+        "rows": rows,
+        "chunks": chunks,
+        "seconds": seconds,
+        "rows_per_s": rows / seconds,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Add monthly temperatures to a CSV or Parquet file of points."
+    )
+    parser.add_argument("input", help="a .csv or .parquet file of points")
+    parser.add_argument("output", help="the .csv or .parquet file to write")
+    parser.add_argument(
+        "--source", default="", help="the folder the data was downloaded to"
+    )
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--date-column", default="date")
+    parser.add_argument("--year-column")
+    parser.add_argument("--month-column")
+    parser.add_argument("--latitude-column", default="latitude")
+    parser.add_argument("--longitude-column", default="longitude")
+    parser.add_argument("--search-radius", type=float, default=0.1)
+    parser.add_argument("--loader", choices=["pandas", "arrow"], default="arrow")
+    parser.add_argument("--max-cache-size", type=int, default=200)
+    parser.add_argument("--max-cache-bytes", type=int)
+    parser.add_argument("--cube-file", help="query a cube written by tools.compact")
+    parser.add_argument("--quiet", action="store_true", help="do not report progress")
+    args = parser.parse_args(argv)
+
+    if not args.quiet:
+        setup_logging("INFO", console=True)
+
+    enrich(
+        args.input,
+        args.output,
+        source_folder=args.source,
+        chunk_size=args.chunk_size,
+        date_column=args.date_column,
+        year_column=args.year_column,
+        month_column=args.month_column,
+        latitude_column=args.latitude_column,
+        longitude_column=args.longitude_column,
+        search_radius=args.search_radius,
+        loader=args.loader,
+        max_cache_size=args.max_cache_size,
+        max_cache_bytes=args.max_cache_bytes,
+        cube_file=args.cube_file,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+import numpy as np
+
+
+# base32 alphabet used by geohash
+BASE32 = np.array(list("0123456789bcdefghjkmnpqrstuvwxyz"), dtype=object)
+
+
+def encode_many(
+    latitudes: np.ndarray, longitudes: np.ndarray, precision: int = 1
+) -> np.ndarray:
+    """
+    Encode arrays of latitudes and longitudes into geohashes.
+
+    Vectorized equivalent of pygeohash.encode, producing identical results.
+
+    Args:
+        latitudes (np.ndarray): The latitudes to encode.
+        longitudes (np.ndarray): The longitudes to encode.
+        precision (int, optional): The number of characters in the geohash. Defaults to 1.
+
+    Returns:
+        np.ndarray: An object array of geohash strings.
+    """
+    if not (1 <= precision <= 12):
+        raise ValueError(f"Precision {precision} is out of bounds.")
+
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+
+    lat_lo = np.full(latitudes.shape, -90.0)
+    lat_hi = np.full(latitudes.shape, 90.0)
+    lon_lo = np.full(longitudes.shape, -180.0)
+    lon_hi = np.full(longitudes.shape, 180.0)
+
+    geohashes = np.full(latitudes.shape, "", dtype=object)
+    is_longitude = True
+    for _ in range(precision):
+        code = np.zeros(latitudes.shape, dtype=np.int64)
+        for _ in range(5):
+            # bits alternate between longitude and latitude, longitude first
+            if is_longitude:
+                value, lo, hi = longitudes, lon_lo, lon_hi
+            else:
+                value, lo, hi = latitudes, lat_lo, lat_hi
+            mid = (lo + hi) * 0.5
+            upper = value >= mid
+            np.copyto(lo, mid, where=upper)
+            np.copyto(hi, mid, where=~upper)
+            code = (code << 1) | upper
+            is_longitude = not is_longitude
+        geohashes = geohashes + BASE32[code]
+
+    return geohashes
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+from . import validate as vd
+
+
+# the statistics of a region, in the order of the columns of query_region
+REGION_COLUMNS = ["mean", "min", "max", "cells", "missing_cells"]
+
+
+def check_bbox(bbox: tuple[float, float, float, float]) -> list[tuple]:
+    """
+    Check a (lat_min, lat_max, lon_min, lon_max) box.
+
+    A box with lon_min > lon_max crosses the antimeridian and is split in two.
+
+    Returns:
+        list[tuple]: the boxes to search, each with lon_min <= lon_max.
+    """
+    if len(bbox) != 4:
+        raise ValueError(f"Box {bbox} must be (lat_min, lat_max, lon_min, lon_max).")
+    lat_min, lat_max, lon_min, lon_max = map(float, bbox)
+    vd.check_coordinates_many(
+        np.array([lat_min, lat_max]), np.array([lon_min, lon_max])
+    )
+    if lat_min > lat_max:
+        raise ValueError(f"Box latitude {lat_min} is above {lat_max}.")
+
+    if lon_min > lon_max:
+        return [
+            (lat_min, lat_max, lon_min, 180.0),
+            (lat_min, lat_max, -180.0, lon_max),
+        ]
+    return [(lat_min, lat_max, lon_min, lon_max)]
+
+
+def check_polygon(polygon: np.ndarray) -> np.ndarray:
+    """
+    Check the (latitude, longitude) vertices of a polygon.
+
+    Returns:
+        np.ndarray: the (n, 2) float64 array of the vertices.
+    """
+    polygon = np.asarray(polygon, dtype=np.float64)
+    if polygon.ndim != 2 or polygon.shape[1] != 2 or len(polygon) < 3:
+        raise ValueError("Polygon must have at least 3 (latitude, longitude) vertices.")
+    vd.check_coordinates_many(polygon[:, 0], polygon[:, 1])
+    return polygon
+
+
+def points_in_polygon(
+    latitudes: np.ndarray, longitudes: np.ndarray, polygon: np.ndarray
+) -> np.ndarray:
+    """
+    Test which points are inside a polygon, with the even-odd ray casting rule.
+
+    The loop is over the edges of the polygon, each edge is tested against all
+    the points at once. The polygon may be closed or not, and must not cross the
+    antimeridian.
+
+    Args:
+        latitudes (np.ndarray): The latitudes of the points.
+        longitudes (np.ndarray): The longitudes of the points.
+        polygon (np.ndarray): The (n, 2) array of (latitude, longitude) vertices.
+
+    Returns:
+        np.ndarray: A boolean mask of the points inside the polygon.
+    """
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    inside = np.zeros(latitudes.shape, dtype=bool)
+
+    for (lat_a, lon_a), (lat_b, lon_b) in zip(polygon, np.roll(polygon, -1, axis=0)):
+        # the edges crossing the parallel of each point, left of the point
+        crosses = (lat_a > latitudes) != (lat_b > latitudes)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            crossing = lon_a + (latitudes - lat_a) * (lon_b - lon_a) / (lat_b - lat_a)
+        inside ^= crosses & (longitudes < crossing)
+
+    return inside
+
+
+def aggregate(
+    values: np.ndarray, latitudes: np.ndarray, weighted: bool = False
+) -> pd.DataFrame:
+    """
+    Aggregate the temperatures of the cells of a region, month by month.
+
+    Args:
+        values (np.ndarray): The (months, cells) temperatures, not finite where there is no data.
+        latitudes (np.ndarray): The latitudes of the cells.
+        weighted (bool, optional): Weight the mean by cos(latitude), the relative area of the cells. Defaults to False.
+
+    Returns:
+        pd.DataFrame: One row per month with columns mean, min, max, cells (with data)
+            and missing_cells. The statistics are NaN for months without data.
+    """
+    valid = np.isfinite(values)
+    cells = valid.sum(axis=1)
+
+    weights = np.ones(values.shape[1])
+    if weighted:
+        weights = np.cos(np.radians(np.asarray(latitudes, dtype=np.float64)))
+    weights = np.where(valid, weights, 0.0)
+    totals = np.where(valid, values, 0.0).astype(np.float64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = (totals * weights).sum(axis=1) / weights.sum(axis=1)
+    empty = cells == 0
+    minimum = np.where(valid, values, np.inf).min(axis=1, initial=np.inf)
+    maximum = np.where(valid, values, -np.inf).max(axis=1, initial=-np.inf)
+
+    return pd.DataFrame(
+        {
+            "mean": np.where(empty, np.nan, mean),
+            "min": np.where(empty, np.nan, minimum),
+            "max": np.where(empty, np.nan, maximum),
+            "cells": cells,
+            "missing_cells": values.shape[1] - cells,
+        },
+        columns=REGION_COLUMNS,
+    )
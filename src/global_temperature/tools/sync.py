@@ -0,0 +1,321 @@
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Union
+from urllib.parse import urljoin
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tarfile
+import time
+import requests
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+from .download import create_session, member_path, DOWNLOAD_TIMEOUT
+from .validate import check_year
+from ..config import load_config
+
+
+CONFIG = load_config()
+logger = logging.getLogger(__name__)
+
+# the manifest of a year folder, listing the size and checksum of each file
+MANIFEST_NAME = "manifest.json"
+# synced year folders are links to a version in this folder
+VERSIONS_FOLDER = ".versions"
+
+
+def sync(
+    target_path: str,
+    years: Union[List[int], None] = None,
+    start_year: Union[int, None] = None,
+    end_year: Union[int, None] = None,
+    max_tries: int = 2,
+    data_type: str = "monthly",
+    max_workers: int = 4,
+    backoff: float = 1.0,
+    base_url: str | None = None,
+) -> List[int]:
+    """
+    Update downloaded years, writing only the partitions that were added or changed.
+
+    Each year folder keeps a manifest of the size and SHA-256 of its files. If the
+    server publishes a manifest next to the archive (year=YYYY.manifest.json) and
+    it matches the local one, the year is skipped without downloading. Otherwise
+    the archive is streamed and compared member by member with the local manifest.
+
+    The new files, and hard links to the unchanged ones, are written to a new
+    version folder under monthly/.versions, and monthly/year=YYYY is switched to
+    it with an atomic rename of a symbolic link, so readers see either the old or
+    the new year, never a mix. The previous version is kept for readers still
+    using it, older versions are deleted.
+
+    Args:
+        target_path (str): The directory the data was downloaded to.
+        years (List[int], optional): A list of specific years to sync.
+        start_year (int, optional): The start year for the range of years to sync.
+        end_year (int, optional): The end year for the range of years to sync.
+        max_tries (int, optional): The maximum number of attempts per year. Defaults to 2.
+        data_type (str): The type of data to sync. Currently, only "monthly" is supported.
+        max_workers (int, optional): The number of years synced at the same time. Defaults to 4.
+        backoff (float, optional): The wait in seconds before the first retry, doubled for each further retry. Defaults to 1.0.
+        base_url (str, optional): The server to download from. Defaults to the base_url in the config.
+
+    Returns:
+        List[int]: A list of years for which the sync failed.
+
+    Raises:
+        ValueError: If neither `years` nor `start_year` and `end_year` are provided.
+    """
+    if data_type != "monthly":
+        raise ValueError("Only 'monthly' data type is supported.")
+
+    if years is None and (start_year is None or end_year is None):
+        raise ValueError(
+            "You must provide either a list of years or a start and end year."
+        )
+
+    if years is None:
+        years = list(range(start_year, end_year + 1))
+
+    # Validate the year
+    [check_year(year) for year in years]
+
+    if base_url is None:
+        base_url = CONFIG["base_url"]
+
+    target_path = Path(target_path) / f"{data_type}"
+    target_path.mkdir(parents=True, exist_ok=True)
+
+    def sync_with_retries(year: int) -> bool:
+        url = urljoin(base_url, f"{data_type}/year={year}.tar.xz")
+        manifest_url = urljoin(base_url, f"{data_type}/year={year}.manifest.json")
+        for retries in range(max_tries):
+            if retries:
+                delay = backoff * 2 ** (retries - 1)
+                logger.info(f"Failed to sync {url}. Retrying in {delay} seconds...")
+                time.sleep(delay)
+            try:
+                changes = sync_year(
+                    target_path / f"year={year}", url, manifest_url, session
+                )
+            except (
+                requests.RequestException,
+                Urllib3HTTPError,
+                tarfile.TarError,
+                EOFError,
+                OSError,
+                ValueError,
+            ) as e:
+                logger.error(f"Failed to sync {url}: {e}")
+                continue
+            logger.info(f"Synced {year}: {changes}")
+            return True
+        return False
+
+    session = create_session(max_workers)
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(sync_with_retries, years))
+    finally:
+        session.close()
+
+    failed_years = [year for year, success in zip(years, results) if not success]
+    if failed_years:
+        logger.info(
+            f"Sync failed for the following years after {max_tries} tries: {failed_years}"
+        )
+    return failed_years
+
+
+def sync_year(
+    year_path: Path,
+    url: str,
+    manifest_url: str | None = None,
+    session: requests.Session | None = None,
+) -> dict:
+    """
+    Sync one year folder with its archive.
+
+    Args:
+        year_path (Path): The year folder, e.g. data/monthly/year=2025.
+        url (str): The URL of the year archive.
+        manifest_url (str, optional): The URL of the remote manifest. Defaults to None.
+        session (requests.Session, optional): The session to download with.
+
+    Returns:
+        dict: The number of files added, changed, removed and unchanged.
+    """
+    year_path = Path(year_path)
+    local = read_manifest(year_path)
+    remote = fetch_manifest(manifest_url, session) if manifest_url else None
+
+    if remote is not None and remote == local:
+        logger.info(f"{year_path} is up to date with {manifest_url}")
+        return {"added": 0, "changed": 0, "removed": 0, "unchanged": len(local)}
+
+    versions = year_path.parent / VERSIONS_FOLDER / year_path.name
+    version = versions / str(time.time_ns())
+    version.mkdir(parents=True)
+
+    try:
+        files, changes = write_version(
+            version, year_path, url, local, remote or {}, session
+        )
+        (version / MANIFEST_NAME).write_text(json.dumps({"files": files}))
+    except BaseException:
+        shutil.rmtree(version, ignore_errors=True)
+        raise
+
+    changes["removed"] = len(local.keys() - files.keys())
+    if year_path.exists() and not (
+        changes["added"] or changes["changed"] or changes["removed"]
+    ):
+        # nothing to switch to, the archive matches the local files
+        shutil.rmtree(version)
+        if not (year_path / MANIFEST_NAME).exists():
+            (year_path / MANIFEST_NAME).write_text(json.dumps({"files": files}))
+        return changes
+
+    switch_version(year_path, version)
+    return changes
+
+
+def write_version(
+    version: Path,
+    year_path: Path,
+    url: str,
+    local: dict,
+    remote: dict,
+    session: requests.Session | None = None,
+) -> tuple[dict, dict]:
+    """
+    Stream an archive into a new version folder, linking the unchanged files.
+
+    A member is only read if the remote manifest does not already show it as
+    unchanged.
+
+    Returns:
+        tuple[dict, dict]: the manifest of the version, and the number of files added, changed and unchanged.
+    """
+    version = version.resolve()
+    files = {}
+    changes = {"added": 0, "changed": 0, "unchanged": 0}
+
+    logger.info(f"Syncing {url} to {year_path}")
+    with (session or requests).get(
+        url, stream=True, timeout=DOWNLOAD_TIMEOUT
+    ) as response:
+        response.raise_for_status()
+        # undo any HTTP content encoding before the xz decompression
+        response.raw.decode_content = True
+        with tarfile.open(fileobj=response.raw, mode="r|xz") as tar:
+            for member in tar:
+                if not member.isfile():
+                    continue
+                target = member_path(version, member.name)
+                name = target.relative_to(version).as_posix()
+                if name == MANIFEST_NAME:
+                    continue
+
+                data = None
+                entry = remote.get(name)
+                if entry is None or entry != local.get(name):
+                    data = tar.extractfile(member).read()
+                    entry = file_entry(data)
+
+                target.parent.mkdir(parents=True, exist_ok=True)
+                if entry == local.get(name):
+                    link_or_copy(year_path / name, target)
+                    changes["unchanged"] += 1
+                else:
+                    target.write_bytes(data)
+                    changes["changed" if name in local else "added"] += 1
+                files[name] = entry
+
+    return files, changes
+
+
+def switch_version(year_path: Path, version: Path) -> None:
+    """
+    Point a year folder to a version with an atomic rename, and delete old versions.
+    """
+    versions = version.parent
+    link = year_path.with_name(f".{year_path.name}.link")
+    link.unlink(missing_ok=True)
+    link.symlink_to(version.relative_to(year_path.parent), target_is_directory=True)
+
+    previous = None
+    if year_path.is_symlink():
+        previous = year_path.resolve()
+    elif year_path.is_dir():
+        # a folder written by download, move it next to the versions first
+        previous = versions / "downloaded"
+        year_path.rename(previous)
+        previous = previous.resolve()
+
+    os.replace(link, year_path)
+    logger.info(f"Switched {year_path} to {version}")
+
+    # keep the previous version for readers still using it
+    for other in versions.iterdir():
+        if other.resolve() not in (version.resolve(), previous):
+            shutil.rmtree(other, ignore_errors=True)
+
+
+def read_manifest(year_path: Path) -> dict:
+    """
+    Read the manifest of a year folder.
+
+    Folders without a manifest, e.g. written by download, are hashed instead.
+
+    Returns:
+        dict: The size and SHA-256 of each file, by path relative to the folder.
+    """
+    manifest = Path(year_path) / MANIFEST_NAME
+    if manifest.is_file():
+        return json.loads(manifest.read_text())["files"]
+    if Path(year_path).is_dir():
+        return build_manifest(year_path)
+    return {}
+
+
+def build_manifest(year_path: str | Path) -> dict:
+    """
+    Hash the files of a year folder.
+
+    Returns:
+        dict: The size and SHA-256 of each file, by path relative to the folder.
+    """
+    year_path = Path(year_path)
+    return {
+        file.relative_to(year_path).as_posix(): file_entry(file.read_bytes())
+        for file in sorted(year_path.rglob("*"))
+        if file.is_file() and file.name != MANIFEST_NAME
+    }
+
+
+def fetch_manifest(url: str, session: requests.Session | None = None) -> dict | None:
+    """fetch a remote manifest, None if the server does not publish one"""
+    try:
+        response = (session or requests).get(url, timeout=DOWNLOAD_TIMEOUT)
+    except requests.RequestException as e:
+        logger.info(f"Failed to fetch manifest {url}: {e}")
+        return None
+    if response.status_code != 200:
+        logger.info(f"No manifest at {url}: HTTP status {response.status_code}")
+        return None
+    return response.json()["files"]
+
+
+def file_entry(data: bytes) -> dict:
+    """the manifest entry of a file"""
+    return {"size": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+
+
+def link_or_copy(source: Path, target: Path) -> None:
+    """hard link a file, copying it if the file system does not support links"""
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
@@ -0,0 +1,138 @@
+from pathlib import Path
+import logging
+import numpy as np
+import pandas as pd
+from . import geohash as gh
+from ..config import load_config, PACKAGE_ROOT
+
+
+CONFIG = load_config()
+logger = logging.getLogger(__name__)
+
+
+def synthetic_temperature(
+    year: int, month: int, latitude: np.ndarray, longitude: np.ndarray
+) -> np.ndarray:
+    """
+    The deterministic temperature of the synthetic dataset, so queries can be checked.
+    """
+    return np.float32(
+        30.0 - np.abs(latitude) / 3.0 + month / 10.0 + (year - 2000) / 100.0
+    )
+
+
+def grid_points(
+    grid_name: str = "01x01",
+    areas: list[tuple[float, float, float, float]] | None = None,
+    sample: float = 1.0,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Select points of a grid.
+
+    Args:
+        grid_name (str, optional): The grid to take the points from. Defaults to "01x01".
+        areas (list[tuple[float, float, float, float]], optional): (lat_min, lat_max, lon_min, lon_max) boxes to keep. Defaults to None (the whole grid).
+        sample (float, optional): The fraction of the points to keep. Defaults to 1.0.
+        seed (int, optional): The seed of the sampling. Defaults to 0.
+
+    Returns:
+        pd.DataFrame: The latitude, longitude and geohash_l1 of the points, sorted by geohash.
+    """
+    if grid_name not in CONFIG["grids"]:
+        raise ValueError(f"Grid {grid_name} is not defined in config.")
+    if not 0 < sample <= 1:
+        raise ValueError(f"Sample {sample} must be in (0, 1].")
+
+    points = pd.read_parquet(PACKAGE_ROOT / CONFIG["grids"][grid_name]["grid_file"])
+    if areas is not None:
+        points = pd.concat(
+            [
+                points[
+                    points["latitude"].between(lat_min, lat_max)
+                    & points["longitude"].between(lon_min, lon_max)
+                ]
+                for lat_min, lat_max, lon_min, lon_max in areas
+            ],
+            ignore_index=True,
+        )
+    if sample < 1:
+        points = points.sample(frac=sample, random_state=seed)
+
+    # the partitions are keyed by the geohash of the snapped (rounded) coordinates
+    points["geohash_l1"] = gh.encode_many(
+        np.round(points["latitude"].to_numpy(), 1),
+        np.round(points["longitude"].to_numpy(), 1),
+        1,
+    )
+    return points.sort_values("geohash_l1", kind="stable", ignore_index=True)
+
+
+def generate(
+    target_folder: str | Path,
+    years: list[int],
+    months: list[int] = list(range(1, 13)),
+    areas: list[tuple[float, float, float, float]] | None = None,
+    grid_name: str = "01x01",
+    sample: float = 1.0,
+    seed: int = 0,
+    row_group_size: int | None = None,
+) -> Path:
+    """
+    Write a synthetic monthly dataset built from real grid points.
+
+    The files have the layout and schema of the downloaded data,
+    monthly/year={year}/month={month}/geohash={geohash}/data.parquet, and the
+    temperatures of synthetic_temperature. The size is set by the years, months,
+    areas and sample: the whole 01x01 grid is about 2.2 million points per month.
+
+    Args:
+        target_folder (str | Path): The folder to write the dataset to.
+        years (list[int]): The years to write.
+        months (list[int], optional): The months to write. Defaults to 1 to 12.
+        areas (list[tuple[float, float, float, float]], optional): (lat_min, lat_max, lon_min, lon_max) boxes to keep. Defaults to None (the whole grid).
+        grid_name (str, optional): The grid to take the points from. Defaults to "01x01".
+        sample (float, optional): The fraction of the grid points to keep. Defaults to 1.0.
+        seed (int, optional): The seed of the sampling. Defaults to 0.
+        row_group_size (int, optional): The maximum number of rows per parquet row group. Defaults to None (the pyarrow default).
+
+    Returns:
+        Path: The target folder.
+    """
+    target_folder = Path(target_folder)
+    points = grid_points(grid_name, areas, sample, seed)
+    latitudes = points["latitude"].to_numpy()
+    longitudes = points["longitude"].to_numpy()
+
+    # the points of each geohash are contiguous
+    geohashes, starts = np.unique(points["geohash_l1"].to_numpy(), return_index=True)
+    ends = np.append(starts[1:], len(points))
+
+    logger.info(
+        f"Writing {len(points)} points x {len(years)} years x {len(months)} months to {target_folder}"
+    )
+    for year in years:
+        for month in months:
+            temperatures = synthetic_temperature(year, month, latitudes, longitudes)
+            for geohash, start, end in zip(geohashes, starts, ends):
+                folder = (
+                    target_folder
+                    / "monthly"
+                    / f"year={year}"
+                    / f"month={month}"
+                    / f"geohash={geohash}"
+                )
+                folder.mkdir(parents=True, exist_ok=True)
+                pd.DataFrame(
+                    {
+                        "date": pd.Timestamp(year=year, month=month, day=1),
+                        "longitude": longitudes[start:end],
+                        "latitude": latitudes[start:end],
+                        "temperature_celsius_mean": temperatures[start:end],
+                        "geohash_l1": geohash,
+                    }
+                ).to_parquet(
+                    folder / "data.parquet", index=False, row_group_size=row_group_size
+                )
+
+    return target_folder
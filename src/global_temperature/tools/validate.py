@@ -1,5 +1,6 @@
-import pandas as pd
+import numpy as np
 from pathlib import Path
+from typing import TYPE_CHECKING
 import logging
 from .. import errors as err
 from datetime import datetime
@@ -9,6 +10,9 @@ from ..config import load_config
 CONFIG = load_config()
 logger = logging.getLogger(__name__)
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 def check_file_format(file_path: str | Path, file_format: str = "parquet") -> bool:
     """
@@ -25,13 +29,13 @@ def check_file_exists(file_path: str) -> bool:
     Check if the file exists.
     """
     if not Path(file_path).exists():
-        logger.info(f"File {file_path} does not exist on local disk.")
+        logger.debug("File %s does not exist on local disk.", file_path)
         raise FileNotFoundError(f"File {file_path} does not exist.")
 
     return True
 
 
-def check_df_columns(df: pd.DataFrame, columns: list[str]) -> bool:
+def check_df_columns(df: "pd.DataFrame", columns: list[str]) -> bool:
     """
     Check if the DataFrame has the required columns.
     """
@@ -52,6 +56,23 @@ def check_coordinates(latitude: float, longitude: float) -> bool:
     return True
 
 
+def check_coordinates_many(latitudes: np.ndarray, longitudes: np.ndarray) -> bool:
+    """
+    Check if arrays of coordinates are valid.
+    """
+    latitudes = np.asarray(latitudes)
+    longitudes = np.asarray(longitudes)
+    if latitudes.shape != longitudes.shape:
+        raise ValueError("Latitudes and longitudes must have the same shape.")
+    invalid = ~((-90 <= latitudes) & (latitudes <= 90))
+    if invalid.any():
+        raise ValueError(f"Latitude {latitudes[invalid][0]} is out of bounds.")
+    invalid = ~((-180 <= longitudes) & (longitudes <= 180))
+    if invalid.any():
+        raise ValueError(f"Longitude {longitudes[invalid][0]} is out of bounds.")
+    return True
+
+
 def check_year(year: int) -> bool:
     """
     Check if the year is valid.
@@ -65,6 +86,23 @@ def check_year(year: int) -> bool:
     return True
 
 
+def check_year_many(years: np.ndarray) -> bool:
+    """
+    Check if an array of years is valid.
+    """
+    years = np.asarray(years)
+    if not np.issubdtype(years.dtype, np.integer):
+        raise ValueError(f"Years are not integers: {years.dtype}.")
+
+    latest_year = datetime.now().year
+    invalid = ~(
+        (CONFIG["monthly_data"]["start_year"] <= years) & (years <= latest_year)
+    )
+    if invalid.any():
+        raise ValueError(f"Year {years[invalid][0]} is out of bounds.")
+    return True
+
+
 def check_month(month: int) -> bool:
     """
     Check if the month is valid.
@@ -76,6 +114,19 @@ def check_month(month: int) -> bool:
     return True
 
 
+def check_month_many(months: np.ndarray) -> bool:
+    """
+    Check if an array of months is valid.
+    """
+    months = np.asarray(months)
+    if not np.issubdtype(months.dtype, np.integer):
+        raise ValueError(f"Months are not integers: {months.dtype}.")
+    invalid = ~((1 <= months) & (months <= 12))
+    if invalid.any():
+        raise ValueError(f"Month {months[invalid][0]} is out of bounds.")
+    return True
+
+
 def check_day(day: int) -> bool:
     """
     Check if the day is valid.
@@ -98,3 +149,14 @@ def check_within_radius(radius: float, distance: float) -> bool:
             f"Cannot find a valid point point on the grid nearby."
         )
     return True
+
+
+def check_within_radius_many(radius: float, distances: np.ndarray) -> np.ndarray:
+    """
+    Check which distances are within the search radius.
+
+    Unlike check_within_radius, this returns a boolean mask instead of raising.
+    """
+    if radius < 0:
+        raise ValueError(f"Search radius {radius} is negative.")
+    return np.asarray(distances) <= radius
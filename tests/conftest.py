@@ -0,0 +1,116 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import hashlib
+import io
+import re
+import tarfile
+import threading
+import pytest
+from global_temperature.tools.synthetic import generate, synthetic_temperature
+
+
+# small areas around the locations used in the tests, as (lat_min, lat_max, lon_min, lon_max)
+SYNTHETIC_AREAS = [
+    (-39.0, -37.0, 144.0, 146.0),  # Melbourne
+    (40.0, 41.5, -75.0, -73.0),  # New York
+]
+SYNTHETIC_YEARS = [2023, 2024]
+SYNTHETIC_MONTHS = [1, 2, 3]
+
+
+@pytest.fixture(scope="session")
+def synthetic_source(tmp_path_factory):
+    """Write a small partitioned monthly dataset built from real grid points."""
+    return generate(
+        tmp_path_factory.mktemp("synthetic"),
+        SYNTHETIC_YEARS,
+        SYNTHETIC_MONTHS,
+        areas=SYNTHETIC_AREAS,
+    )
+
+
+@pytest.fixture(scope="session")
+def gapped_source(tmp_path_factory):
+    """A synthetic dataset of New York with no partition for March 2020."""
+    return generate(
+        tmp_path_factory.mktemp("gapped"), [2020], [1, 2, 4], areas=SYNTHETIC_AREAS[1:]
+    )
+
+
+@pytest.fixture(scope="session")
+def synthetic_archives(synthetic_source):
+    """The synthetic years packed like the published year=YYYY.tar.xz archives."""
+    archives = {}
+    for year in SYNTHETIC_YEARS:
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w:xz") as tar:
+            folder = synthetic_source / "monthly" / f"year={year}"
+            for file in sorted(folder.rglob("*.parquet")):
+                tar.add(file, arcname=file.relative_to(folder).as_posix())
+        archives[f"/monthly/year={year}.tar.xz"] = buffer.getvalue()
+    return archives
+
+
+class ArchiveHandler(BaseHTTPRequestHandler):
+    """Serve the archives of the server, with Range and If-Range requests and injected failures."""
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, self.headers.get("Range")))
+
+        if server.fail_next > 0:
+            server.fail_next -= 1
+            self.send_error(503)
+            return
+        if self.path not in server.files:
+            self.send_error(404)
+            return
+
+        data = server.files[self.path]
+        etag = f'"{hashlib.sha256(data).hexdigest()[:16]}"'
+        start = 0
+        match = re.fullmatch(r"bytes=(\d+)-", self.headers.get("Range") or "")
+        # a Range with a stale If-Range validator gets the whole file
+        if match and self.headers.get("If-Range", etag) == etag:
+            start = int(match[1])
+            if start >= len(data):
+                self.send_error(416)
+                return
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}"
+            )
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(data) - start))
+        self.send_header("ETag", etag)
+        self.end_headers()
+
+        body = data[start:]
+        if server.truncate_next > 0:
+            # send half of the body and drop the connection
+            server.truncate_next -= 1
+            self.wfile.write(body[: len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def archive_server(synthetic_archives):
+    """A local stand-in for the download server, serving the synthetic archives."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ArchiveHandler)
+    server.files = dict(synthetic_archives)
+    server.requests = []
+    server.fail_next = 0
+    server.truncate_next = 0
+    server.url = f"http://127.0.0.1:{server.server_port}/"
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
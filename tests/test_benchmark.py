@@ -0,0 +1,67 @@
+from global_temperature.tools import benchmark
+import json
+import pytest
+
+
+def test_run(synthetic_source):
+    results = benchmark.run(
+        synthetic_source,
+        queries=5,
+        batch_size=50,
+        load_partitions=2,
+        repeat=2,
+        stream_length=20,
+        workers=[0, 1],
+        threads=[1, 2],
+    )
+
+    assert results["meta"]["dataset"]["partitions"] == 12
+    names = [result["name"] for result in results["results"]]
+    assert sorted(set(names), key=names.index) == list(benchmark.CASES)
+    assert len(names) == 1 + 1 + 2 + 2 + 6 + 3 + 2 + 4
+    threaded = [
+        result["metrics"]
+        for result in results["results"]
+        if result["name"] == "threaded_query"
+    ]
+    # the partitions are loaded once whatever the number of threads
+    assert len({metrics["partitions_loaded"] for metrics in threaded}) == 1
+    speedups = [
+        result["metrics"]["speedup"]
+        for result in results["results"]
+        if result["name"] == "parallel_batch_query"
+    ]
+    assert speedups[0] == 1.0
+    # the results are machine-readable
+    assert json.loads(json.dumps(results)) == results
+
+    with pytest.raises(ValueError):
+        benchmark.run(synthetic_source, cases=["not_a_case"])
+
+
+def test_main(synthetic_source, tmp_path):
+    output = tmp_path / "results.json"
+    benchmark.main(
+        [
+            "--source",
+            str(synthetic_source),
+            "--output",
+            str(output),
+            "--cases",
+            "single_query_warm",
+            "query_range",
+            "--queries",
+            "5",
+            "--repeat",
+            "2",
+        ]
+    )
+
+    results = json.loads(output.read_text())
+    assert [result["name"] for result in results["results"]] == [
+        "single_query_warm",
+        "query_range",
+        "query_range",
+    ]
+    assert results["results"][0]["metrics"]["n"] == 5
+    assert results["results"][1]["params"] == {"months": 3, "cache": "cold"}
@@ -0,0 +1,156 @@
+from global_temperature.cache import UnitCache, StripedUnitCache
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+
+
+def test_lru():
+    cache = UnitCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    cache.put("c", 3)
+
+    assert cache.keys() == ["a", "c"]
+    assert cache.get("b") is None
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 1,
+        "evictions": 1,
+        "entries": 2,
+        "bytes": 0,
+    }
+
+
+def test_lfu():
+    cache = UnitCache(max_entries=2, policy="lfu")
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+    cache.put("c", 3)
+    assert "b" not in cache
+    cache.put("d", 4)
+    assert cache.keys() == ["a", "d"]
+
+
+def test_size():
+    cache = UnitCache(max_entries=2, policy="size")
+    cache.put("small", 1, nbytes=10)
+    cache.put("large", 2, nbytes=1000)
+    cache.get("large")
+    cache.put("c", 3, nbytes=10)
+    # "large" has more hits but far fewer hits per byte
+    assert cache.keys() == ["small", "c"]
+
+
+def test_max_bytes():
+    cache = UnitCache(max_entries=None, max_bytes=100)
+    cache.put("a", 1, nbytes=40)
+    cache.put("b", 2, nbytes=40)
+    cache.put("c", 3, nbytes=40)
+    assert cache.keys() == ["b", "c"]
+    assert cache.nbytes == 80
+
+    # a unit larger than the budget is kept until the next insertion
+    cache.put("d", 4, nbytes=500)
+    assert cache.keys() == ["d"]
+    cache.put("e", 5, nbytes=10)
+    assert cache.keys() == ["e"]
+    assert cache.stats()["evictions"] == 4
+
+
+def test_replace_and_pop():
+    cache = UnitCache(max_bytes=100)
+    cache.put("a", 1, nbytes=40)
+    cache.put("a", 2, nbytes=60)
+    assert cache.nbytes == 60
+    assert cache.pop("a") == 2
+    assert cache.pop("a") is None
+    assert len(cache) == 0 and cache.nbytes == 0
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{"policy": "fifo"}, {"max_entries": -1}, {"max_bytes": -1}]
+)
+def test_invalid(kwargs):
+    with pytest.raises(ValueError):
+        UnitCache(**kwargs)
+
+
+def test_peek():
+    # the integers 0 and 1 are in different stripes
+    for cache in [UnitCache(max_entries=2), StripedUnitCache(max_entries=2, stripes=2)]:
+        cache.put(0, "0")
+        cache.put(1, "1")
+        assert cache.peek(0) == "0" and cache.peek(2) is None
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (0, 0)
+
+
+def test_striped():
+    cache = StripedUnitCache(max_entries=8, max_bytes=800, stripes=4)
+    for i in range(8):
+        cache.put(i, str(i), nbytes=10)
+    assert len(cache) == 8 and cache.nbytes == 80
+    assert sorted(cache.keys()) == list(range(8))
+    assert cache.get(3) == "3" and cache.get(100) is None
+    assert 3 in cache and 100 not in cache
+    assert cache.pop(3) == "3"
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 7)
+    cache.clear()
+    assert len(cache) == 0 and cache.stats()["hits"] == 1
+
+
+def test_striped_limits():
+    evicted = []
+    cache = StripedUnitCache(max_entries=4, stripes=2, on_evict=evicted.append)
+    # the integers 0, 2, 4, ... are in the same stripe, which holds 2 of them
+    for key in [0, 2, 4]:
+        cache.put(key, key)
+    assert evicted == [0]
+    assert sorted(cache.keys()) == [2, 4]
+    assert cache.stats()["evictions"] == 1
+
+    # the shares of the stripes add up to the limits
+    cache = StripedUnitCache(max_entries=10, max_bytes=1001, stripes=4)
+    assert [stripe.max_entries for stripe in cache._stripes] == [3, 3, 2, 2]
+    assert sum(stripe.max_bytes for stripe in cache._stripes) == 1001
+
+
+def test_striped_threads():
+    cache = StripedUnitCache(max_entries=50, stripes=4)
+
+    def work(offset: int) -> int:
+        hits = 0
+        for i in range(1000):
+            key = (offset + i) % 100
+            if cache.get(key) is None:
+                cache.put(key, key, nbytes=1)
+            else:
+                hits += 1
+        return hits
+
+    with ThreadPoolExecutor(8) as pool:
+        hits = sum(pool.map(work, range(8)))
+
+    stats = cache.stats()
+    assert stats["hits"] == hits
+    assert stats["hits"] + stats["misses"] == 8000
+    assert stats["entries"] == stats["bytes"] <= 52
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"stripes": 0},
+        {"max_entries": -1},
+        {"policy": "fifo"},
+        {"max_entries": 2, "stripes": 4},
+    ],
+)
+def test_striped_invalid(kwargs):
+    with pytest.raises(ValueError):
+        StripedUnitCache(**kwargs)
@@ -0,0 +1,62 @@
+from global_temperature.cell_index import CellIndex
+import numpy as np
+
+
+def brute_force(latitudes, longitudes, latitude, longitude):
+    """the linear scan used before the index"""
+    close = np.isclose(latitudes, latitude, atol=1e-2) & np.isclose(
+        longitudes, longitude, atol=1e-2
+    )
+    rows = np.flatnonzero(close)
+    return rows[0] if len(rows) else -1
+
+
+def test_lookup_matches_scan():
+    rng = np.random.default_rng(0)
+    # grid points with the float noise found in the data files
+    latitudes = np.round(rng.uniform(-60, 80, 2000), 1) + 3e-13
+    longitudes = np.round(rng.uniform(-180, 180, 2000), 1) - 5e-12
+    index = CellIndex(latitudes, longitudes)
+
+    queries_lat = np.r_[latitudes[:500], rng.uniform(-60, 80, 500)]
+    queries_lon = np.r_[longitudes[:500], rng.uniform(-180, 180, 500)]
+    # some points off the grid but within the tolerance
+    queries_lat[:100] += 0.009
+    queries_lon[100:200] -= 0.009
+
+    expected = [
+        brute_force(latitudes, longitudes, lat, lon)
+        for lat, lon in zip(queries_lat, queries_lon)
+    ]
+    assert list(index.lookup_many(queries_lat, queries_lon)) == expected
+    assert [
+        index.lookup(lat, lon) for lat, lon in zip(queries_lat, queries_lon)
+    ] == expected
+
+
+def test_lookup_across_cell_edge():
+    # a row near a cell edge is still found from the neighbouring cell
+    index = CellIndex(np.array([10.049]), np.array([20.0]))
+    assert index.lookup(10.055, 20.0) == 0
+    assert list(index.lookup_many(np.array([10.055]), np.array([20.0]))) == [0]
+
+
+def test_lookup_empty():
+    index = CellIndex(np.array([]), np.array([]))
+    assert len(index) == 0
+    assert index.lookup(10.0, 20.0) == -1
+    assert list(index.lookup_many(np.array([10.0]), np.array([20.0]))) == [-1]
+
+
+def test_from_arrays():
+    rng = np.random.default_rng(1)
+    latitudes = np.round(rng.uniform(-60, 80, 500), 1)
+    longitudes = np.round(rng.uniform(-180, 180, 500), 1)
+    index = CellIndex(latitudes, longitudes)
+
+    arrays = index.arrays()
+    copy = CellIndex.from_arrays(latitudes, longitudes, arrays["keys"], arrays["order"])
+    assert copy._keys is arrays["keys"]
+    assert list(copy.lookup_many(latitudes, longitudes)) == list(
+        index.lookup_many(latitudes, longitudes)
+    )
@@ -0,0 +1,133 @@
+from global_temperature.tools.climatology import compute_climatology
+from global_temperature.tools.compact import compact
+from global_temperature.climatology import Climatology
+from global_temperature.temperature_monthly import TemperatureMonthly
+from global_temperature.temperature_base import STATUS_OK, STATUS_NOT_FOUND
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope="module")
+def climatology_file(synthetic_source, tmp_path_factory):
+    return compute_climatology(
+        synthetic_source,
+        tmp_path_factory.mktemp("climatology") / "monthly.clim",
+        start_year=2023,
+        end_year=2024,
+    )
+
+
+def test_compute_climatology(synthetic_source, climatology_file):
+    climatology = Climatology(climatology_file)
+    assert climatology.grid_name == "01x01"
+    assert (climatology.start_year, climatology.end_year) == (2023, 2024)
+    assert climatology.data.shape == (climatology.n_cells, 12, 2)
+    # calendar months without data have no baseline
+    assert np.isnan(climatology.data[:, 3:]).all()
+
+    temp_monthly = TemperatureMonthly(source_folder=synthetic_source)
+    result, cell = temp_monthly._query(2023, 3, 40.7128, -74.0060)
+    temperatures = [
+        result["temperature"],
+        temp_monthly.query(2024, 3, 40.7128, -74.0060)["temperature"],
+    ]
+    mean, std = climatology.query(cell, 3)
+    assert mean == pytest.approx(np.mean(temperatures), abs=1e-4)
+    assert std == pytest.approx(np.std(temperatures, ddof=1), abs=1e-4)
+    # the points not snapped to the grid have no baseline
+    assert np.isnan(climatology.query_many([-1, cell], [3, 3])[0][0])
+
+
+def test_compute_climatology_min_years(synthetic_source, tmp_path):
+    file = compute_climatology(
+        synthetic_source, tmp_path / "monthly.clim", 2023, 2024, min_years=3
+    )
+    assert np.isnan(Climatology(file).data).all()
+
+
+def test_compute_climatology_single_year(synthetic_source, tmp_path):
+    file = compute_climatology(synthetic_source, tmp_path / "monthly.clim", 2024, 2024)
+    data = Climatology(file).data
+    # a single year has a mean but no sample standard deviation
+    assert np.isfinite(data[:, 0, 0]).any()
+    assert np.isnan(data[:, :, 1]).all()
+
+
+def test_compute_climatology_invalid(synthetic_source, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        compute_climatology(synthetic_source, tmp_path / "monthly.clim", 1991, 2020)
+    with pytest.raises(ValueError):
+        compute_climatology(synthetic_source, tmp_path / "monthly.clim", 2024, 2023)
+
+
+def test_climatology_header(synthetic_source, tmp_path):
+    cube_file = compact(synthetic_source, tmp_path / "monthly.cube")
+    with pytest.raises(ValueError):
+        Climatology(cube_file)
+
+
+def test_query_anomaly(synthetic_source, climatology_file):
+    temp_monthly = TemperatureMonthly(
+        source_folder=synthetic_source, climatology_file=climatology_file
+    )
+    result = temp_monthly.query_anomaly(2024, 1, -37.89994, 145.06802)
+    expected = temp_monthly.query(2024, 1, -37.89994, 145.06802)
+    for key in expected:
+        assert result[key] == expected[key], key
+
+    assert result["anomaly"] == pytest.approx(
+        result["temperature"] - result["baseline_mean"], abs=1e-5
+    )
+    assert result["standardized_anomaly"] == pytest.approx(
+        result["anomaly"] / result["baseline_std"], abs=1e-5
+    )
+
+
+def test_query_anomaly_many(synthetic_source, climatology_file):
+    temp_monthly = TemperatureMonthly(
+        source_folder=synthetic_source, climatology_file=climatology_file
+    )
+    args = (
+        np.array([2024, 2023, 2024]),
+        np.array([1, 3, 2]),
+        np.array([-37.89994, 40.7128, 40.5]),
+        np.array([145.06802, -74.0060, -74.3]),
+    )
+    result = temp_monthly.query_anomaly_many(*args)
+
+    for i in range(3):
+        expected = temp_monthly.query_anomaly(*(a[i].item() for a in args))
+        for key in ["baseline_mean", "baseline_std", "anomaly", "standardized_anomaly"]:
+            assert result[key][i] == pytest.approx(expected[key], nan_ok=True), key
+    assert (result["status"] == STATUS_OK).all()
+
+
+def test_query_anomaly_cube(synthetic_source, climatology_file, tmp_path):
+    cube_file = compact(synthetic_source, tmp_path / "monthly.cube")
+    parquet = TemperatureMonthly(
+        source_folder=synthetic_source, climatology_file=climatology_file
+    )
+    cube = TemperatureMonthly(
+        source_folder=synthetic_source,
+        cube_file=cube_file,
+        climatology_file=climatology_file,
+    )
+    assert cube.query_anomaly(2023, 3, 40.7128, -74.0060) == parquet.query_anomaly(
+        2023, 3, 40.7128, -74.0060
+    )
+
+    # a point on the grid with no data has no anomaly
+    result = cube.query_anomaly_many([2024], [2], [10.0], [10.0])
+    assert result["status"][0] == STATUS_NOT_FOUND
+    assert np.isnan(result["anomaly"][0])
+    assert np.isnan(result["standardized_anomaly"][0])
+
+
+def test_query_anomaly_without_climatology(synthetic_source, climatology_file):
+    temp_monthly = TemperatureMonthly(source_folder=synthetic_source)
+    with pytest.raises(ValueError):
+        temp_monthly.query_anomaly(2024, 1, -37.89994, 145.06802)
+    with pytest.raises(ValueError):
+        temp_monthly.query_anomaly_many([2024], [1], [-37.89994], [145.06802])
+    with pytest.raises(ValueError):
+        TemperatureMonthly(climatology_file=climatology_file, grid_name="03x03")
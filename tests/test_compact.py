@@ -0,0 +1,86 @@
+from global_temperature.tools.compact import compact, find_partitions
+from global_temperature.cube import TemperatureCube, read_cube_header
+from global_temperature.temperature_monthly import TemperatureMonthly
+from global_temperature.temperature_base import STATUS_OK, STATUS_NOT_FOUND
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope="module")
+def cube_file(synthetic_source, tmp_path_factory):
+    return compact(synthetic_source, tmp_path_factory.mktemp("cube") / "monthly.cube")
+
+
+def test_find_partitions(synthetic_source):
+    partitions = find_partitions(synthetic_source)
+    assert len(partitions) == 2 * 3 * 2
+    assert set(partitions["geohash"]) == {"r", "d"}
+
+
+def test_compact(cube_file):
+    meta = read_cube_header(cube_file)
+    assert meta["grid_name"] == "01x01"
+    assert meta["start"] == "2023-01"
+    # 2023-01 to 2024-03
+    assert meta["n_months"] == 15
+
+    cube = TemperatureCube(cube_file)
+    assert cube.data.shape == (meta["n_cells"], 15)
+    # months between the synthetic months have no data
+    assert np.isnan(cube.data[:, 3:12]).all()
+
+
+def test_compact_empty(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        compact(tmp_path, tmp_path / "monthly.cube")
+
+
+@pytest.mark.parametrize(
+    "year, month, latitude, longitude",
+    [
+        (2024, 1, -37.89994, 145.06802),
+        (2023, 3, 40.7128, -74.0060),
+        (2024, 2, 40.5, -74.3),
+    ],
+)
+def test_cube_query(synthetic_source, cube_file, year, month, latitude, longitude):
+    parquet = TemperatureMonthly(source_folder=synthetic_source)
+    cube = TemperatureMonthly(source_folder=synthetic_source, cube_file=cube_file)
+    assert cube.query(year, month, latitude, longitude) == parquet.query(
+        year, month, latitude, longitude
+    )
+
+
+def test_cube_query_many(synthetic_source, cube_file):
+    parquet = TemperatureMonthly(source_folder=synthetic_source)
+    cube = TemperatureMonthly(source_folder=synthetic_source, cube_file=cube_file)
+    args = (
+        np.array([2024, 2023, 2024, 2024]),
+        np.array([1, 3, 2, 2]),
+        np.array([-37.89994, 40.7128, -38.1235, 10.0]),
+        np.array([145.06802, -74.0060, 144.9779, 10.0]),
+    )
+    expected = parquet.query_many(*(a[:3] for a in args))
+    result = cube.query_many(*args)
+
+    for key in expected:
+        assert list(result[key][:3].astype(str)) == list(expected[key].astype(str)), key
+    # a point on the grid with no data
+    assert result["status"][3] == STATUS_NOT_FOUND
+    assert result["status"][0] == STATUS_OK
+
+
+def test_cube_query_range(synthetic_source, cube_file):
+    parquet = TemperatureMonthly(source_folder=synthetic_source)
+    cube = TemperatureMonthly(source_folder=synthetic_source, cube_file=cube_file)
+
+    series = cube.query_range(40.7128, -74.0060, "2024-01", "2024-03")
+    assert series.equals(parquet.query_range(40.7128, -74.0060, "2024-01", "2024-03"))
+
+    with pytest.raises(FileNotFoundError):
+        cube.query_range(40.7128, -74.0060, "2022-12", "2023-02")
+
+
+def test_cube_grid_mismatch(cube_file):
+    with pytest.raises(ValueError):
+        TemperatureMonthly(cube_file=cube_file, grid_name="03x03")
@@ -0,0 +1,148 @@
+from global_temperature.disk_cache import DiskUnitCache
+from global_temperature.temperature_monthly import TemperatureMonthly
+import hashlib
+import os
+import numpy as np
+import pyarrow as pa
+import pytest
+
+
+def table(value: float = 1.0) -> pa.Table:
+    return pa.table(
+        {
+            "latitude": np.full(10, value),
+            "temperature_celsius_mean": np.full(10, value, dtype=np.float32),
+        }
+    )
+
+
+@pytest.fixture
+def source_file(tmp_path):
+    file = tmp_path / "data.parquet"
+    file.write_bytes(b"parquet")
+    return file
+
+
+def test_write_read(source_file, tmp_path):
+    cache = DiskUnitCache(tmp_path / "cache")
+    path = cache.path(2024, 1, "r")
+    assert path.name == "2024-01-r.arrow"
+    assert cache.read(source_file, path) is None
+
+    cache.write(source_file, path, table())
+    cached = cache.read(source_file, path)
+    assert cached.equals(table())
+    assert cached.schema.metadata is None
+
+    # the arrays point into the memory-mapped file
+    temperatures = cached.column("temperature_celsius_mean").to_numpy()
+    assert temperatures.dtype == np.float32
+    assert not temperatures.flags.owndata
+    assert [file.name for file in cache.folder.iterdir()] == [path.name]
+
+
+def test_read_stale_mtime(source_file, tmp_path):
+    cache = DiskUnitCache(tmp_path / "cache")
+    path = cache.path(2024, 1, "r")
+    cache.write(source_file, path, table())
+
+    stat = source_file.stat()
+    os.utime(source_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert cache.read(source_file, path) is None
+
+    # rewriting the file makes it valid again
+    cache.write(source_file, path, table(2.0))
+    assert cache.read(source_file, path).equals(table(2.0))
+
+
+def test_read_stale_checksum(source_file, tmp_path):
+    cache = DiskUnitCache(tmp_path / "cache", check="checksum")
+    path = cache.path(2024, 1, "r")
+    cache.write(source_file, path, table())
+
+    # same size and modification time, different content
+    stat = source_file.stat()
+    source_file.write_bytes(b"PARQUET")
+    os.utime(source_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert DiskUnitCache(cache.folder).read(source_file, path) is not None
+    assert cache.read(source_file, path) is None
+
+
+def test_checksum_once(source_file, tmp_path, monkeypatch):
+    cache = DiskUnitCache(tmp_path / "cache", check="checksum")
+    path = cache.path(2024, 1, "r")
+    cache.write(source_file, path, table())
+
+    hashed = []
+    sha256 = hashlib.sha256
+    monkeypatch.setattr(hashlib, "sha256", lambda: hashed.append(1) or sha256())
+    assert cache.read(source_file, path) is not None
+    assert cache.read(source_file, path) is not None
+    assert hashed == []
+
+    # a new modification time hashes the file again
+    stat = source_file.stat()
+    os.utime(source_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert cache.read(source_file, path) is None
+    assert hashed == [1]
+
+
+def test_read_corrupted(source_file, tmp_path):
+    cache = DiskUnitCache(tmp_path / "cache")
+    path = cache.path(2024, 1, "r")
+    path.write_bytes(b"not arrow")
+    assert cache.read(source_file, path) is None
+
+
+def test_invalid_check(tmp_path):
+    with pytest.raises(ValueError):
+        DiskUnitCache(tmp_path, check="size")
+
+
+def test_disk_cache_query(synthetic_source, tmp_path):
+    options = dict(
+        source_folder=synthetic_source,
+        loader="arrow",
+        disk_cache=tmp_path,
+        metrics=True,
+    )
+    first = TemperatureMonthly(**options)
+    expected = TemperatureMonthly(source_folder=synthetic_source).query(
+        2024, 1, -37.89994, 145.06802
+    )
+    assert first.query(2024, 1, -37.89994, 145.06802) == expected
+    assert first.metrics_snapshot()["counters"]["disk_cache_misses"] == 1
+    assert (tmp_path / "2024-01-r.arrow").exists()
+
+    # a new instance memory-maps the cached file
+    second = TemperatureMonthly(**options)
+    assert second.query(2024, 1, -37.89994, 145.06802) == expected
+    counters = second.metrics_snapshot()["counters"]
+    assert counters["disk_cache_hits"] == 1
+    assert "disk_cache_misses" not in counters
+    assert counters["bytes_read"] == (tmp_path / "2024-01-r.arrow").stat().st_size
+
+    result = second.query_many(
+        np.array([2023, 2024]),
+        np.array([3, 1]),
+        np.array([40.7128, -37.89994]),
+        np.array([-74.0060, 145.06802]),
+    )
+    assert result["temperature"][1] == expected["temperature"]
+
+
+def test_disk_cache_partial_load(synthetic_source, tmp_path):
+    temp_monthly = TemperatureMonthly(
+        source_folder=synthetic_source,
+        loader="arrow",
+        partial_load=True,
+        disk_cache=tmp_path,
+    )
+    temp_monthly.query(2024, 1, -37.89994, 145.06802)
+    # partial loads are not cached
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_disk_cache_loader(tmp_path):
+    with pytest.raises(ValueError):
+        TemperatureMonthly(loader="pandas", disk_cache=tmp_path)
@@ -1,11 +1,16 @@
+from global_temperature.tools import download as download_module
 from global_temperature.tools.download import (
     download_file,
     extract_file,
     delete_file,
     download,
+    stream_file,
 )
+from conftest import SYNTHETIC_YEARS
 from pathlib import Path
+import io
 import shutil
+import tarfile
 import pytest
 
 
@@ -92,3 +97,181 @@ def test_download():
 
     # Clean up
     shutil.rmtree(target_folder, ignore_errors=True)
+
+
+def assert_same_tree(source, target):
+    files = sorted(p.relative_to(source) for p in source.rglob("*") if p.is_file())
+    assert files
+    assert files == sorted(
+        p.relative_to(target) for p in target.rglob("*") if p.is_file()
+    )
+    for file in files:
+        assert (source / file).read_bytes() == (target / file).read_bytes()
+
+
+@pytest.mark.parametrize("extract_workers, stream", [(0, False), (2, False), (2, True)])
+def test_download_local_server(
+    archive_server, synthetic_source, tmp_path, extract_workers, stream
+):
+    """Download years in parallel from a local server"""
+    failed_years = download(
+        target_path=tmp_path,
+        years=SYNTHETIC_YEARS + [2000],
+        base_url=archive_server.url,
+        max_workers=3,
+        extract_workers=extract_workers,
+        backoff=0,
+        stream=stream,
+    )
+
+    assert failed_years == [2000]
+    assert_same_tree(synthetic_source / "monthly", tmp_path / "monthly")
+    assert not list((tmp_path / "monthly").glob("*.tar.xz*"))
+
+
+def test_download_retries(archive_server, synthetic_source, tmp_path, monkeypatch):
+    """A failed request is retried and an interrupted download resumes"""
+    monkeypatch.setattr(download_module, "DOWNLOAD_CHUNK_SIZE", 256)
+    archive_server.fail_next = 1
+    archive_server.truncate_next = 1
+
+    failed_years = download(
+        target_path=tmp_path,
+        years=[2024],
+        base_url=archive_server.url,
+        max_tries=3,
+        backoff=0,
+    )
+
+    assert failed_years == []
+    assert_same_tree(
+        synthetic_source / "monthly" / "year=2024",
+        tmp_path / "monthly" / "year=2024",
+    )
+    ranges = [header for _, header in archive_server.requests]
+    assert ranges[:2] == [None, None]
+    assert ranges[2].startswith("bytes=") and ranges[2] != "bytes=0-"
+
+
+def test_download_file_resume(
+    archive_server, synthetic_archives, tmp_path, monkeypatch
+):
+    """download_file keeps a partial file and requests only the missing bytes"""
+    monkeypatch.setattr(download_module, "DOWNLOAD_CHUNK_SIZE", 256)
+    path = "/monthly/year=2023.tar.xz"
+    url = archive_server.url + path.lstrip("/")
+    target_file = tmp_path / "year=2023.tar.xz"
+    partial_file = tmp_path / "year=2023.tar.xz.part"
+
+    validator_file = tmp_path / "year=2023.tar.xz.part.validator"
+
+    archive_server.truncate_next = 1
+    assert not download_file(target_file, url)
+    assert not target_file.exists()
+    offset = partial_file.stat().st_size
+    assert 0 < offset < len(synthetic_archives[path])
+    validator = validator_file.read_text()
+
+    assert download_file(target_file, url)
+    assert archive_server.requests[-1] == (path, f"bytes={offset}-")
+    assert target_file.read_bytes() == synthetic_archives[path]
+    assert not partial_file.exists()
+    assert not validator_file.exists()
+
+    # a partial file longer than the remote file cannot be resumed
+    partial_file.write_bytes(b"0" * (len(synthetic_archives[path]) + 1))
+    validator_file.write_text(validator)
+    assert not download_file(target_file, url)
+    assert not partial_file.exists()
+    assert not validator_file.exists()
+
+    # a partial file without a validator is downloaded again from the start
+    partial_file.write_bytes(b"0" * 10)
+    assert download_file(target_file, url)
+    assert archive_server.requests[-1] == (path, None)
+    assert target_file.read_bytes() == synthetic_archives[path]
+
+
+def test_download_file_resume_changed(
+    archive_server, synthetic_archives, tmp_path, monkeypatch
+):
+    """a partial file of a remote file that changed since is not resumed"""
+    monkeypatch.setattr(download_module, "DOWNLOAD_CHUNK_SIZE", 256)
+    path = "/monthly/year=2023.tar.xz"
+    url = archive_server.url + path.lstrip("/")
+    target_file = tmp_path / "year=2023.tar.xz"
+
+    archive_server.truncate_next = 1
+    assert not download_file(target_file, url)
+
+    # the If-Range validator no longer matches, so the server sends the whole file
+    archive_server.files[path] = synthetic_archives["/monthly/year=2024.tar.xz"]
+    assert download_file(target_file, url)
+    assert archive_server.requests[-1][1].startswith("bytes=")
+    assert target_file.read_bytes() == archive_server.files[path]
+
+
+def make_archive(members: dict) -> bytes:
+    """pack {name: content} into a .tar.xz, a None content adds a symlink"""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:xz") as tar:
+        for name, content in members.items():
+            info = tarfile.TarInfo(name)
+            if content is None:
+                info.type = tarfile.SYMTYPE
+                info.linkname = "/etc/passwd"
+                tar.addfile(info)
+            else:
+                info.size = len(content)
+                tar.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+def test_stream_file(archive_server, tmp_path):
+    """Streamed archives are extracted without writing the archive"""
+    archive_server.files["/ok.tar.xz"] = make_archive(
+        {"month=1/a.bin": b"a" * 1000, "month=2/b.bin": b"b", "link": None}
+    )
+
+    assert stream_file(archive_server.url + "ok.tar.xz", tmp_path / "year=2024")
+    assert (tmp_path / "year=2024/month=1/a.bin").read_bytes() == b"a" * 1000
+    assert (tmp_path / "year=2024/month=2/b.bin").read_bytes() == b"b"
+    assert not (tmp_path / "year=2024/link").exists()
+    assert sorted(p.name for p in tmp_path.rglob("*") if p.is_file()) == [
+        "a.bin",
+        "b.bin",
+    ]
+
+    assert not stream_file(archive_server.url + "missing.tar.xz", tmp_path / "x")
+
+    # an interrupted stream leaves no partial year folder behind
+    archive_server.truncate_next = 1
+    assert not stream_file(archive_server.url + "ok.tar.xz", tmp_path / "y")
+    assert not (tmp_path / "y").exists()
+    assert not list(tmp_path.glob(".y*"))
+
+    # a complete stream replaces the folder, a failed one keeps it
+    archive_server.files["/new.tar.xz"] = make_archive({"month=3/c.bin": b"c"})
+    assert stream_file(archive_server.url + "new.tar.xz", tmp_path / "year=2024")
+    assert [p.name for p in (tmp_path / "year=2024").rglob("*.bin")] == ["c.bin"]
+    archive_server.truncate_next = 1
+    assert not stream_file(archive_server.url + "ok.tar.xz", tmp_path / "year=2024")
+    assert [p.name for p in (tmp_path / "year=2024").rglob("*.bin")] == ["c.bin"]
+    assert not list(tmp_path.glob(".year=2024*"))
+
+
+@pytest.mark.parametrize("name", ["../evil.bin", "/tmp/evil.bin", "a/../../evil.bin"])
+def test_extract_path_traversal(archive_server, tmp_path, name):
+    """Members outside the extraction folder are rejected"""
+    archive = make_archive({name: b"evil"})
+    archive_server.files["/evil.tar.xz"] = archive
+
+    assert not stream_file(archive_server.url + "evil.tar.xz", tmp_path / "stream")
+
+    file_path = tmp_path / "archive" / "year=2024.tar.xz"
+    file_path.parent.mkdir()
+    file_path.write_bytes(archive)
+    assert not extract_file(file_path)
+
+    assert not (tmp_path / "evil.bin").exists()
+    assert not (tmp_path / "archive" / "evil.bin").exists()
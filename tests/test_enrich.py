@@ -0,0 +1,109 @@
+from global_temperature.temperature_base import STATUS_OK, STATUS_NO_NEARBY_POINT
+from global_temperature.tools import enrich
+from conftest import synthetic_temperature
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def points():
+    return pd.DataFrame(
+        {
+            "id": np.arange(5),
+            "date": pd.to_datetime(
+                ["2024-01-15", "2023-02-01", "2024-03-31", "2024-01-01", "2023-01-01"]
+            ),
+            "latitude": [40.7128, -37.89994, 40.7128, 0.0, -37.8],
+            "longitude": [-74.0060, 145.06802, -74.0060, -30.0, 144.9],
+        }
+    )
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_enrich(synthetic_source, tmp_path, points, suffix):
+    input_file = tmp_path / f"points{suffix}"
+    output_file = tmp_path / f"enriched{suffix}"
+    if suffix == ".csv":
+        points.to_csv(input_file, index=False)
+    else:
+        points.to_parquet(input_file, index=False)
+
+    summary = enrich.enrich(
+        input_file, output_file, source_folder=synthetic_source, chunk_size=2
+    )
+
+    assert summary["rows"] == 5
+    assert summary["chunks"] == 3
+    assert not (tmp_path / f"enriched{suffix}.part").exists()
+
+    df = pd.read_csv(output_file) if suffix == ".csv" else pd.read_parquet(output_file)
+    assert list(df.columns) == list(points.columns) + enrich.OUTPUT_COLUMNS
+    np.testing.assert_array_equal(df["id"], points["id"])
+    assert df["status"].tolist() == [STATUS_OK] * 3 + [
+        STATUS_NO_NEARBY_POINT,
+        STATUS_OK,
+    ]
+
+    dates = pd.to_datetime(points["date"])
+    found = df["status"] == STATUS_OK
+    np.testing.assert_allclose(
+        df.loc[found, "temperature"],
+        synthetic_temperature(
+            dates[found].dt.year,
+            dates[found].dt.month,
+            df.loc[found, "snapped_latitude"],
+            df.loc[found, "snapped_longitude"],
+        ),
+        rtol=1e-6,
+    )
+
+
+def test_enrich_columns(synthetic_source, tmp_path, points):
+    points["year"] = points["date"].dt.year
+    points["month"] = points["date"].dt.month
+    points = points.drop(columns="date").rename(
+        columns={"latitude": "lat", "longitude": "lon"}
+    )
+    input_file = tmp_path / "points.csv"
+    points.to_csv(input_file, index=False)
+
+    enrich.main(
+        [
+            str(input_file),
+            str(tmp_path / "enriched.parquet"),
+            "--source",
+            str(synthetic_source),
+            "--year-column",
+            "year",
+            "--month-column",
+            "month",
+            "--latitude-column",
+            "lat",
+            "--longitude-column",
+            "lon",
+            "--quiet",
+        ]
+    )
+
+    df = pd.read_parquet(tmp_path / "enriched.parquet")
+    assert len(df) == 5
+    assert (df["status"] == STATUS_OK).sum() == 4
+
+
+def test_enrich_errors(synthetic_source, tmp_path, points):
+    input_file = tmp_path / "points.csv"
+    output_file = tmp_path / "enriched.csv"
+
+    points["temperature"] = 0.0
+    points.to_csv(input_file, index=False)
+    with pytest.raises(ValueError, match="overwritten"):
+        enrich.enrich(input_file, output_file, source_folder=synthetic_source)
+    assert list(tmp_path.glob("enriched*")) == []
+
+    with pytest.raises(ValueError):
+        enrich.enrich(input_file, tmp_path / "enriched.txt")
+    with pytest.raises(ValueError):
+        enrich.enrich(input_file, output_file, year_column="year")
+    with pytest.raises(ValueError):
+        enrich.enrich(input_file, output_file, chunk_size=0)
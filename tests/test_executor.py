@@ -0,0 +1,95 @@
+from global_temperature.executor import PartitionExecutor
+from global_temperature.temperature_monthly import TemperatureMonthly
+from global_temperature.temperature_base import STATUS_OK, STATUS_NO_NEARBY_POINT
+from pathlib import Path
+import numpy as np
+import pytest
+
+
+YEARS = np.array([2024, 2024, 2023, 2024, 2024, 2023, 2024])
+MONTHS = np.array([1, 1, 3, 2, 2, 1, 3])
+LATITUDES = np.array([-37.89994, 40.7128, 40.7128, -38.1235, -37.5, 40.9, -38.2])
+LONGITUDES = np.array([145.06802, -74.0060, -74.0060, 144.9779, 144.5, -73.8, 145.3])
+
+
+def shared_memory_blocks() -> set:
+    return set(Path("/dev/shm").glob("psm_*"))
+
+
+def test_shards():
+    executor = PartitionExecutor("", max_workers=2, shards_per_worker=1)
+    tasks = [
+        (2024, 1, "d", 0, 50),
+        (2024, 2, "d", 50, 60),
+        (2024, 3, "d", 60, 100),
+        (2024, 1, "r", 100, 110),
+    ]
+    shards = executor.shards(tasks)
+    executor.shutdown()
+
+    # every partition is in exactly one shard, and the shards are balanced
+    assert sorted(task for shard in shards for task in shard) == sorted(tasks)
+    assert sorted(
+        sum(stop - start for *_, start, stop in shard) for shard in shards
+    ) == [
+        50,
+        60,
+    ]
+
+    with pytest.raises(ValueError):
+        PartitionExecutor("", max_workers=2, shards_per_worker=0)
+
+
+@pytest.mark.parametrize("partial_load", [False, True])
+def test_query_many_workers(synthetic_source, partial_load):
+    blocks = shared_memory_blocks()
+    expected = TemperatureMonthly(source_folder=synthetic_source).query_many(
+        YEARS, MONTHS, LATITUDES, LONGITUDES
+    )
+    temp_monthly = TemperatureMonthly(
+        source_folder=synthetic_source,
+        loader="arrow",
+        partial_load=partial_load,
+        workers=2,
+        metrics=True,
+    )
+    if not partial_load:
+        # a cached partition is looked up in this process
+        temp_monthly.query(2024, 1, 40.7128, -74.0060)
+
+    try:
+        result = temp_monthly.query_many(YEARS, MONTHS, LATITUDES, LONGITUDES)
+    finally:
+        temp_monthly.close()
+
+    assert temp_monthly.executor is None
+    assert result["status"][3] == STATUS_NO_NEARBY_POINT
+    assert (np.delete(result["status"], 3) == STATUS_OK).all()
+    for key in expected:
+        np.testing.assert_array_equal(result[key], expected[key], err_msg=key)
+
+    counters = temp_monthly.metrics_snapshot()["counters"]
+    # the cached partition was loaded by the single query
+    assert counters["partitions_loaded"] == 6
+    assert counters["bytes_read"] > 0
+    assert len(temp_monthly.units) == (0 if partial_load else 1)
+    assert shared_memory_blocks() == blocks
+
+
+def test_query_many_workers_errors(synthetic_source):
+    blocks = shared_memory_blocks()
+    temp_monthly = TemperatureMonthly(source_folder=synthetic_source, workers=1)
+    try:
+        with pytest.raises(FileNotFoundError):
+            temp_monthly.query_many(
+                np.array([2024, 2024]),
+                np.array([1, 1]),
+                np.array([40.7128, 10.0]),
+                np.array([-74.0060, 10.0]),
+            )
+    finally:
+        temp_monthly.close()
+    assert shared_memory_blocks() == blocks
+
+    with pytest.raises(ValueError):
+        TemperatureMonthly(source_folder=synthetic_source, workers=-1)
@@ -0,0 +1,25 @@
+from global_temperature.tools.geohash import encode_many
+import numpy as np
+import pygeohash as pgh
+import pytest
+
+
+@pytest.mark.parametrize("precision", [1, 2, 5])
+def test_encode_many(precision):
+    """encode_many should match pygeohash.encode"""
+    rng = np.random.default_rng(0)
+    latitudes = np.r_[rng.uniform(-90, 90, 1000), -90.0, 0.0, 90.0]
+    longitudes = np.r_[rng.uniform(-180, 180, 1000), -180.0, 0.0, 180.0]
+
+    geohashes = encode_many(latitudes, longitudes, precision)
+
+    expected = [
+        pgh.encode(float(lat), float(lon), precision)
+        for lat, lon in zip(latitudes, longitudes)
+    ]
+    assert list(geohashes) == expected
+
+
+def test_encode_many_invalid_precision():
+    with pytest.raises(ValueError):
+        encode_many(np.array([0.0]), np.array([0.0]), 13)
@@ -57,3 +57,228 @@ def test_query_invalid_grid():
     with pytest.raises(ValueError):
         # "02x02" is an invalid grid name
         grid.query("02x02", -37.89994, 145.06802)
+
+
+def test_load_grid_once():
+    grid = Grids()
+    tree = grid.get_grid("03x03")
+    # loading again must not rebuild the tree
+    grid.load_grid("src/global_temperature/grids/03x03/data.parquet", "03x03")
+    assert grid.get_grid("03x03") is tree, "Grid should only be built once"
+
+
+def test_get_grid_invalid():
+    with pytest.raises(ValueError):
+        Grids().get_grid("02x02")
+
+
+def test_singleton_threads():
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        trees = list(executor.map(lambda _: Grids().get_grid("03x03"), range(16)))
+    assert all(tree is trees[0] for tree in trees), "Threads should share one tree"
+
+
+def test_save_and_load_saved_grid(tmp_path):
+    grid = Grids()
+    grid.get_grid("03x03")
+    folder = grid.save_grid("03x03", tmp_path / "03x03")
+    expected = grid.query("03x03", 40.7128, -74.0060)
+
+    grid.load_saved_grid(folder, "03x03_saved", mmap_mode="r")
+    assert isinstance(grid.grids["03x03_saved"].data, np.memmap)
+
+    point, distance = grid.query("03x03_saved", 40.7128, -74.0060)
+    assert np.allclose(point, expected[0])
+    assert distance == expected[1]
+
+    del grid.grids["03x03_saved"]
+
+
+def test_load_saved_grid_missing(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        Grids().load_saved_grid(tmp_path, "03x03")
+
+
+def test_query_many():
+    grid = Grids()
+    grid.get_grid("01x01")
+    latitudes = np.array([-37.89994, 40.7128, 34.0522])
+    longitudes = np.array([145.06802, -74.0060, -118.2437])
+
+    points, distances, indices = grid.query_many(
+        "01x01", latitudes, longitudes, return_index=True
+    )
+    for i in range(len(latitudes)):
+        point, distance = grid.query("01x01", latitudes[i], longitudes[i])
+        assert np.array_equal(points[i], point)
+        assert distances[i] == distance
+    assert distances.dtype == np.float32
+    assert indices.shape == (3,)
+
+
+def test_query_box():
+    grid = Grids()
+    tree = grid.get_grid("01x01")
+
+    points, indices = grid.query_box("01x01", 40.0, 41.5, -75.0, -73.0)
+
+    data = tree.data
+    expected = np.flatnonzero(
+        (data[:, 0] >= 40.0 - 1e-6)
+        & (data[:, 0] <= 41.5 + 1e-6)
+        & (data[:, 1] >= -75.0 - 1e-6)
+        & (data[:, 1] <= -73.0 + 1e-6)
+    )
+    assert np.array_equal(indices, expected)
+    assert np.array_equal(points, np.round(data[expected], 1).astype(np.float32))
+    # the bounds are included
+    assert points[:, 0].min() == np.float32(40.0)
+    assert points[:, 0].max() == np.float32(41.5)
+
+    with pytest.raises(ValueError):
+        grid.query_box("01x01", 41.0, 40.0, -75.0, -73.0)
+    with pytest.raises(ValueError):
+        grid.query_box("not_loaded", 40.0, 41.0, -75.0, -73.0)
+
+
+def test_query_nearest():
+    grid = Grids()
+    grid.get_grid("01x01")
+    latitudes = np.array([-37.89994, 40.7128])
+    longitudes = np.array([145.06802, -74.0060])
+
+    points, distances, indices = grid.query_nearest("01x01", latitudes, longitudes, 4)
+    assert points.shape == (2, 4, 2)
+    assert distances.shape == indices.shape == (2, 4)
+    # the nearest point first, as in query_many
+    nearest, nearest_distances = grid.query_many("01x01", latitudes, longitudes)
+    assert np.array_equal(points[:, 0], nearest)
+    assert np.array_equal(distances[:, 0], nearest_distances)
+    assert (np.diff(distances, axis=1) >= 0).all()
+
+    assert grid.query_nearest("01x01", latitudes, longitudes, 1)[1].shape == (2, 1)
+    with pytest.raises(ValueError):
+        grid.query_nearest("01x01", latitudes, longitudes, 0)
+
+
+@pytest.mark.parametrize(
+    "grid_name, expected",
+    [("01x01", (-90.0, -179.9, 0.1)), ("03x03", (-89.8, -179.9, 0.3))],
+)
+def test_lattice(grid_name, expected):
+    grid = Grids()
+    grid.get_grid(grid_name)
+    assert grid.lattice(grid_name) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize(
+    "grid_name, search_radius, factor",
+    [("01x01", 0.1, 1), ("03x03", 0.3, 1), ("03x03", 0.1, 2)],
+)
+def test_query_raster(grid_name, search_radius, factor):
+    grid = Grids()
+    tree = grid.get_grid(grid_name)
+    raster = grid.build_raster(grid_name, search_radius, factor)
+    assert grid.get_raster(grid_name, search_radius) is raster
+
+    # random points, points near the grid and points on the cell edges
+    rng = np.random.default_rng(0)
+    rows = rng.integers(0, len(tree.data), 10000)
+    latitudes = np.concatenate(
+        [
+            rng.uniform(-90, 90, 10000),
+            np.clip(tree.data[rows, 0] + rng.uniform(-0.4, 0.4, 10000), -90, 90),
+            np.round(tree.data[rows[:500], 0], 1) + 0.05,
+        ]
+    )
+    longitudes = np.concatenate(
+        [
+            rng.uniform(-180, 180, 10000),
+            np.clip(tree.data[rows, 1] + rng.uniform(-0.4, 0.4, 10000), -180, 180),
+            np.round(tree.data[rows[:500], 1], 1) + 0.05,
+        ]
+    )
+
+    expected = grid.query_many(grid_name, latitudes, longitudes, return_index=True)
+    points, distances, indices = grid.query_raster(
+        grid_name, raster, latitudes, longitudes, return_index=True
+    )
+    within = expected[1] <= search_radius
+    assert np.array_equal(indices >= 0, within)
+    assert np.array_equal(points[within], expected[0][within])
+    assert np.array_equal(distances[within], expected[1][within])
+    assert np.array_equal(indices[within], expected[2][within])
+    assert np.isnan(points[~within]).all()
+    assert np.isinf(distances[~within]).all()
+
+
+def test_raster_stats():
+    grid = Grids()
+    grid.get_grid("01x01")
+    stats = grid.get_raster("01x01", 0.1).stats()
+    # the KD-tree is only needed along the coasts
+    assert stats["refine"] < 0.05
+    assert stats["points"] + stats["no_point"] + stats["refine"] == pytest.approx(1)
+
+
+def test_save_and_load_saved_raster(tmp_path):
+    grid = Grids()
+    grid.get_grid("03x03")
+    built = grid.build_raster("03x03", 0.3)
+    folder = grid.save_raster("03x03", 0.3, tmp_path / "03x03")
+    expected = grid.query_raster("03x03", built, [40.7128, 0.0], [-74.0060, 0.0])
+
+    del grid.rasters[("03x03", 0.3, 1)]
+    assert grid.load_saved_raster(folder) is grid.get_raster("03x03", 0.3)
+    raster = grid.get_raster("03x03", 0.3, factor=1)
+    assert isinstance(raster.values, np.memmap)
+
+    points, distances = grid.query_raster(
+        "03x03", raster, [40.7128, 0.0], [-74.0060, 0.0]
+    )
+    assert np.array_equal(points, expected[0], equal_nan=True)
+    assert np.array_equal(distances, expected[1])
+
+    # a raster for another search radius is built again
+    assert grid.get_raster("03x03", 0.2) is not raster
+
+
+def test_raster_search_radii():
+    grid = Grids()
+    grid.get_grid("03x03")
+    wide = grid.get_raster("03x03", 0.3)
+    narrow = grid.get_raster("03x03", 0.2)
+    fine = grid.get_raster("03x03", 0.2, factor=2)
+
+    # the rasters of each search radius and factor are kept side by side
+    assert narrow is not wide and fine is not narrow
+    assert grid.get_raster("03x03", 0.3) is wide
+    assert grid.get_raster("03x03", 0.2, factor=1) is narrow
+    assert grid.get_raster("03x03", 0.2, factor=2) is fine
+    assert {("03x03", 0.3, 1), ("03x03", 0.2, 1), ("03x03", 0.2, 2)} <= set(
+        grid.rasters
+    )
+
+    # a point 0.205 degrees from the nearest grid point
+    latitude, longitude = grid.grids["03x03"].data[0] + 0.145
+    _, wide_distances = grid.query_raster("03x03", wide, [latitude], [longitude])
+    _, narrow_distances = grid.query_raster("03x03", narrow, [latitude], [longitude])
+    assert np.isfinite(wide_distances[0]) and np.isinf(narrow_distances[0])
+
+
+def test_raster_invalid(tmp_path):
+    grid = Grids()
+    grid.get_grid("03x03")
+    grid.get_grid("01x01")
+    with pytest.raises(ValueError):
+        grid.build_raster("03x03", -0.1)
+    with pytest.raises(ValueError):
+        grid.build_raster("03x03", 0.3, factor=0)
+    with pytest.raises(ValueError):
+        grid.query_raster("not_loaded", None, [0.0], [0.0])
+    with pytest.raises(ValueError):
+        grid.query_raster("03x03", grid.get_raster("01x01", 0.1), [0.0], [0.0])
+    with pytest.raises(FileNotFoundError):
+        grid.load_saved_raster(tmp_path)
@@ -0,0 +1,86 @@
+import global_temperature as gt
+from pathlib import Path
+import logging
+import os
+import subprocess
+import sys
+import pytest
+
+
+# cumulative time in microseconds `import global_temperature` may take, as reported
+# by python -X importtime. It was about 1.3 s with the eager imports.
+IMPORT_TIME_BUDGET_US = 100_000
+
+HEAVY_MODULES = ["pandas", "scipy", "pandera", "pyarrow", "requests", "yaml"]
+
+
+def run_python(code: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_import_time_budget():
+    """Importing the package stays within the import time budget"""
+    # the best of a few runs, to ignore a slow start of the interpreter
+    times = []
+    for _ in range(3):
+        result = run_python("import global_temperature")
+        line = [
+            line
+            for line in result.stderr.splitlines()
+            if line.endswith("| global_temperature")
+        ][0]
+        times.append(int(line.split("|")[1]))
+    assert min(times) < IMPORT_TIME_BUDGET_US
+
+
+def test_import_is_lazy():
+    """Heavy dependencies are imported on first use"""
+    result = run_python(
+        "import sys, global_temperature\n"
+        f"print([m for m in {HEAVY_MODULES} if m in sys.modules])\n"
+        "global_temperature.TemperatureFactory\n"
+        "print('pandas' in sys.modules)"
+    )
+    assert result.stdout.split() == ["[]", "True"]
+
+    with pytest.raises(AttributeError):
+        gt.NotAnAttribute
+
+
+def test_import_has_no_side_effects():
+    """Importing the package writes no files and adds no log handlers"""
+    log_dir = Path(gt.__file__).parent / "logs"
+    before = sorted(log_dir.glob("*")) if log_dir.exists() else None
+
+    result = run_python(
+        "import logging, global_temperature\n"
+        "print([type(h).__name__ for h in logging.getLogger('global_temperature').handlers])"
+    )
+
+    assert result.stdout.strip() == "['NullHandler']"
+    after = sorted(log_dir.glob("*")) if log_dir.exists() else None
+    assert before == after
+
+
+def test_setup_logging(tmp_path):
+    old_log = tmp_path / "log_old.log"
+    old_log.write_text("")
+    two_days_ago = old_log.stat().st_mtime - 2 * 86400
+    os.utime(old_log, (two_days_ago, two_days_ago))
+
+    try:
+        logger = gt.setup_logging("DEBUG", log_dir=tmp_path, retention_days=1)
+        assert logger.level == logging.DEBUG
+        assert not old_log.exists()
+        assert len(list(tmp_path.glob("log_*.log"))) == 1
+
+        # a second call replaces the handlers
+        gt.setup_logging(console=False)
+        assert [type(h).__name__ for h in logger.handlers] == ["NullHandler"]
+    finally:
+        gt.setup_logging(console=False)
@@ -0,0 +1,117 @@
+from global_temperature.metrics import Metrics, STAGES
+from global_temperature.temperature_monthly import TemperatureMonthly
+import numpy as np
+import pytest
+
+
+def test_metrics_disabled():
+    metrics = Metrics()
+    events = []
+    metrics.add_hook(lambda name, value: events.append(name))
+
+    with metrics.timer("snap"):
+        pass
+    metrics.record("load", 1.0)
+    metrics.increment("queries")
+
+    assert metrics.snapshot() == {"stages": {}, "counters": {}}
+    assert events == []
+
+
+def test_metrics_enabled():
+    metrics = Metrics(enabled=True)
+    events = []
+    hook = lambda name, value: events.append((name, value))
+    metrics.add_hook(hook)
+
+    with metrics.timer("snap"):
+        pass
+    metrics.record("validate", 0.5)
+    metrics.record("validate", 1.5)
+    metrics.increment("bytes_read", 100)
+
+    snapshot = metrics.snapshot()
+    # stages are listed in query order
+    assert list(snapshot["stages"]) == ["validate", "snap"]
+    assert snapshot["stages"]["validate"] == {
+        "calls": 2,
+        "seconds": 2.0,
+        "mean_ms": 1000.0,
+    }
+    assert snapshot["stages"]["snap"]["calls"] == 1
+    assert snapshot["counters"] == {"bytes_read": 100}
+    assert [name for name, _ in events] == [
+        "stage.snap",
+        "stage.validate",
+        "stage.validate",
+        "bytes_read",
+    ]
+
+    metrics.remove_hook(hook)
+    metrics.reset()
+    metrics.increment("queries")
+    assert metrics.snapshot() == {"stages": {}, "counters": {"queries": 1}}
+    assert len(events) == 4
+
+
+def test_query_metrics(synthetic_source):
+    temp_monthly = TemperatureMonthly(
+        source_folder=synthetic_source, metrics=True, max_cache_size=1
+    )
+    events = []
+    temp_monthly.add_metrics_hook(lambda name, value: events.append(name))
+
+    temp_monthly.query(2024, 1, 40.7128, -74.0060)
+    temp_monthly.query(2024, 1, 40.7128, -74.0060)
+    temp_monthly.query(2024, 2, 40.7128, -74.0060)
+
+    snapshot = temp_monthly.metrics_snapshot()
+    assert list(snapshot["stages"]) == list(STAGES)
+    assert snapshot["stages"]["snap"]["calls"] == 3
+    assert snapshot["stages"]["load"]["calls"] == 2
+    assert snapshot["counters"] == {
+        "queries": 3,
+        "cache_misses": 2,
+        "cache_hits": 1,
+        "partitions_loaded": 2,
+        "bytes_read": sum(
+            (
+                synthetic_source
+                / f"monthly/year=2024/month={month}/geohash=d/data.parquet"
+            )
+            .stat()
+            .st_size
+            for month in [1, 2]
+        ),
+        "cache_evictions": 1,
+    }
+    assert snapshot["cache"] == temp_monthly.cache_stats()
+    assert events.count("cache_evictions") == 1
+    assert events.count("stage.cell_lookup") == 3
+
+
+def test_query_many_metrics(synthetic_source):
+    temp_monthly = TemperatureMonthly(
+        source_folder=synthetic_source, metrics=True, loader="arrow"
+    )
+    temp_monthly.query_many(
+        np.array([2024, 2024, 2023]),
+        np.array([1, 1, 1]),
+        np.array([40.7128, -37.89994, 40.7128]),
+        np.array([-74.0060, 145.06802, -74.0060]),
+    )
+
+    snapshot = temp_monthly.metrics_snapshot()
+    assert snapshot["counters"]["batch_points"] == 3
+    assert snapshot["counters"]["partitions_loaded"] == 3
+    assert snapshot["stages"]["cell_lookup"]["calls"] == 3
+    assert snapshot["stages"]["validate"]["calls"] == 1
+
+
+@pytest.mark.parametrize("bounds", [None, (40.6, 40.8, -74.1, -73.9)])
+def test_unit_bytes_read(synthetic_source, bounds):
+    temp_monthly = TemperatureMonthly(source_folder=synthetic_source, loader="arrow")
+    unit = temp_monthly.create_unit(2024, 1, "d", bounds)
+    file_size = unit.filename.stat().st_size
+
+    assert 0 < unit.bytes_read < file_size
@@ -0,0 +1,106 @@
+from global_temperature.prefetch import Prefetcher
+from global_temperature.temperature_monthly import TemperatureMonthly
+import threading
+import time
+import pytest
+
+
+def test_neighbours():
+    prefetcher = Prefetcher(lambda *key: None, depth=2)
+    neighbours = prefetcher.neighbours(2024, 1, "d")
+    assert neighbours[:4] == [
+        (2024, 2, "d"),
+        (2023, 12, "d"),
+        (2024, 3, "d"),
+        (2023, 11, "d"),
+    ]
+    assert set(neighbours[4:]) == {
+        (2024, 1, "f"),
+        (2024, 1, "9"),
+        (2024, 1, "6"),
+        (2024, 1, "e"),
+    }
+    prefetcher.shutdown()
+
+
+def test_schedule_does_not_block():
+    release = threading.Event()
+    loaded = []
+
+    def load(*key):
+        release.wait()
+        loaded.append(key)
+
+    prefetcher = Prefetcher(load, depth=1, max_workers=1, max_pending=3)
+    start = time.perf_counter()
+    prefetcher.schedule(2024, 6, "d")
+    # already pending partitions are not scheduled twice
+    prefetcher.schedule(2024, 6, "d")
+    assert time.perf_counter() - start < 0.5
+
+    assert prefetcher.scheduled == 3
+    assert prefetcher.dropped == 6
+    release.set()
+    prefetcher.wait(timeout=5)
+    assert len(loaded) == 3
+    prefetcher.shutdown()
+
+
+def test_load_errors_are_ignored():
+    def load(*key):
+        raise FileNotFoundError(key)
+
+    prefetcher = Prefetcher(load)
+    prefetcher.schedule(2024, 6, "d")
+    prefetcher.wait(timeout=5)
+    prefetcher.shutdown()
+
+
+def test_schedule_after_shutdown():
+    release = threading.Event()
+    prefetcher = Prefetcher(lambda *key: release.wait(), max_workers=1)
+    prefetcher.schedule(2024, 6, "d")
+    prefetcher.shutdown()
+    release.set()
+
+    # the cancelled loads are not pending, and later schedules are ignored
+    assert prefetcher._pending == {}
+    scheduled = prefetcher.scheduled
+    prefetcher.schedule(2024, 7, "d")
+    assert prefetcher.scheduled == scheduled
+    prefetcher.wait(timeout=5)
+
+
+def test_invalid():
+    with pytest.raises(ValueError):
+        Prefetcher(lambda *key: None, depth=-1)
+    with pytest.raises(ValueError):
+        Prefetcher(lambda *key: None, max_workers=0)
+
+
+def test_temperature_monthly_prefetch(synthetic_source):
+    temp_monthly = TemperatureMonthly(source_folder=synthetic_source, prefetch=True)
+    temp_monthly.query(2024, 2, 40.7128, -74.0060)
+    temp_monthly.prefetcher.wait(timeout=10)
+
+    # the neighbouring months were loaded, missing partitions are skipped
+    assert (2024, 1, "d") in temp_monthly.units
+    assert (2024, 3, "d") in temp_monthly.units
+    assert len(temp_monthly.units) == 3
+
+    temp_monthly.query(2024, 3, 40.7128, -74.0060)
+    assert temp_monthly.cache_stats()["hits"] == 1
+    temp_monthly.close()
+
+    # queries still work once the prefetcher is shut down
+    assert temp_monthly.query(2023, 2, 40.7128, -74.0060)["temperature"] is not None
+
+
+def test_temperature_monthly_prefetch_invalid(synthetic_source):
+    with pytest.raises(ValueError):
+        TemperatureMonthly(
+            source_folder=synthetic_source,
+            prefetch=True,
+            loader="arrow",
+            partial_load=True,
+        )
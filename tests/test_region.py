@@ -0,0 +1,66 @@
+from global_temperature.tools import region
+import numpy as np
+import pytest
+
+
+def test_check_bbox():
+    assert region.check_bbox((1, 2, 3, 4)) == [(1.0, 2.0, 3.0, 4.0)]
+    # a box crossing the antimeridian is split in two
+    assert region.check_bbox((-10, 10, 170, -170)) == [
+        (-10.0, 10.0, 170.0, 180.0),
+        (-10.0, 10.0, -180.0, -170.0),
+    ]
+
+    for bbox in [(1, 2, 3), (2, 1, 3, 4), (0, 91, 0, 1), (0, 1, 0, 181)]:
+        with pytest.raises(ValueError):
+            region.check_bbox(bbox)
+
+
+def test_check_polygon():
+    polygon = region.check_polygon([(0, 0), (1, 0), (0, 1)])
+    assert polygon.shape == (3, 2)
+
+    for polygon in [[(0, 0), (1, 1)], [0, 1, 2], [(0, 0), (1, 0), (95, 1)]]:
+        with pytest.raises(ValueError):
+            region.check_polygon(polygon)
+
+
+@pytest.mark.parametrize("closed", [False, True])
+def test_points_in_polygon(closed):
+    # a triangle with its right angle at the origin
+    polygon = np.array([(0.0, 0.0), (10.0, 0.0), (0.0, 10.0)])
+    if closed:
+        polygon = np.vstack([polygon, polygon[:1]])
+
+    latitudes = np.array([1.0, 4.0, 6.0, -1.0, 1.0, 9.0])
+    longitudes = np.array([1.0, 4.0, 6.0, 1.0, -1.0, 0.5])
+
+    assert region.points_in_polygon(latitudes, longitudes, polygon).tolist() == [
+        True,
+        True,
+        False,
+        False,
+        False,
+        True,
+    ]
+
+
+def test_aggregate():
+    values = np.array(
+        [
+            [10.0, 20.0, np.float32("-inf")],
+            [np.nan, np.nan, np.nan],
+        ],
+        dtype=np.float32,
+    )
+    latitudes = np.array([0.0, 60.0, 30.0])
+
+    result = region.aggregate(values, latitudes)
+    assert list(result.columns) == region.REGION_COLUMNS
+    assert result.loc[0].tolist() == [15.0, 10.0, 20.0, 2, 1]
+    assert result.loc[1, ["cells", "missing_cells"]].tolist() == [0, 3]
+    assert result.loc[1, ["mean", "min", "max"]].isna().all()
+
+    # cos(60) is half of cos(0)
+    weighted = region.aggregate(values, latitudes, weighted=True)
+    assert weighted.loc[0, "mean"] == pytest.approx((10.0 + 0.5 * 20.0) / 1.5)
@@ -0,0 +1,141 @@
+from global_temperature.shared_cache import SharedUnitStore, TEMPORARY_PREFIX
+from global_temperature.temperature_monthly import TemperatureMonthly
+from global_temperature.grids.grid import Grids
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+import os
+import subprocess
+import sys
+import numpy as np
+import pytest
+
+
+def arrays(size: int, value: float = 0.0) -> dict:
+    return {
+        "latitude": np.full(size, value),
+        "temperature_celsius_mean": np.full(size, value, dtype=np.float32),
+    }
+
+
+def publish(folder: str) -> int:
+    """publish an entry from another process"""
+    SharedUnitStore(folder).put((2024, 1, "r"), arrays(10, 1.0))
+    return len(SharedUnitStore(folder).get((2024, 1, "r"))["latitude"])
+
+
+def test_put_get(tmp_path):
+    store = SharedUnitStore(tmp_path)
+    assert store.get((2024, 1, "r")) is None
+
+    shared = store.put((2024, 1, "r"), arrays(10, 1.0))
+    assert isinstance(shared["latitude"], np.memmap)
+    assert not shared["latitude"].flags.writeable
+    assert (shared["latitude"] == 1.0).all()
+    assert shared["temperature_celsius_mean"].dtype == np.float32
+    assert (2024, 1, "r") in store
+
+    # another store on the same folder sees the entry
+    other = SharedUnitStore(tmp_path)
+    assert (other.get((2024, 1, "r"))["latitude"] == 1.0).all()
+    # the first publication wins
+    other.put((2024, 1, "r"), arrays(10, 2.0))
+    assert (store.get((2024, 1, "r"))["latitude"] == 1.0).all()
+    assert store.stats()["entries"] == 1
+
+
+def test_put_from_process(tmp_path):
+    with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as executor:
+        assert executor.submit(publish, str(tmp_path)).result() == 10
+    assert (SharedUnitStore(tmp_path).get((2024, 1, "r"))["latitude"] == 1.0).all()
+
+
+def test_evict(tmp_path):
+    SharedUnitStore(tmp_path).put("a", arrays(1000))
+    size = SharedUnitStore(tmp_path).stats()["bytes"]
+    # room for two entries
+    store = SharedUnitStore(tmp_path, max_bytes=int(2.5 * size))
+
+    mapped = store.get("a")
+    store.put("b", arrays(1000))
+    # "a" is used again, so "b" is the least recently used
+    store.get("a")
+    store.put("c", arrays(1000))
+    assert store.stats()["entries"] == 2
+    assert "a" in store and "b" not in store and "c" in store
+
+    store.put("d", arrays(1000))
+    assert "a" not in store
+    # an evicted entry can still be read through its existing mapping
+    assert (mapped["latitude"] == 0.0).all()
+
+    # the entry just published is kept even if it is over the limit alone
+    SharedUnitStore(tmp_path, max_bytes=0).put("e", arrays(1000))
+    assert SharedUnitStore(tmp_path).stats()["entries"] == 1
+
+    store.clear()
+    assert store.stats() == {"entries": 0, "bytes": 0}
+
+
+def test_cleanup_dead_process(tmp_path):
+    store = SharedUnitStore(tmp_path)
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+
+    # the partial entries of a process that died while publishing
+    dead = store.partitions / f"{TEMPORARY_PREFIX}{process.pid}-0"
+    dead.mkdir()
+    (dead / "latitude.npy").write_bytes(b"partial")
+    alive = store.partitions / f"{TEMPORARY_PREFIX}{os.getpid()}-0"
+    alive.mkdir()
+
+    SharedUnitStore(tmp_path)
+    assert not dead.exists()
+    assert alive.exists()
+    assert store.stats()["entries"] == 0
+
+
+def test_invalid_max_bytes(tmp_path):
+    with pytest.raises(ValueError):
+        SharedUnitStore(tmp_path, max_bytes=-1)
+
+
+def test_shared_cache_query(synthetic_source, tmp_path):
+    options = dict(
+        source_folder=synthetic_source,
+        loader="arrow",
+        shared_cache=tmp_path,
+        metrics=True,
+    )
+    first = TemperatureMonthly(**options)
+    second = TemperatureMonthly(**options)
+
+    # the grid is published and mapped from the shared folder
+    assert (tmp_path / "grids" / "01x01" / "data.npy").exists()
+    assert isinstance(Grids().get_grid("01x01").data, np.memmap)
+
+    expected = TemperatureMonthly(source_folder=synthetic_source).query(
+        2024, 1, -37.89994, 145.06802
+    )
+    assert first.query(2024, 1, -37.89994, 145.06802) == expected
+    assert second.query(2024, 1, -37.89994, 145.06802) == expected
+
+    # the second instance reads the partition decoded by the first one
+    counters = second.metrics_snapshot()["counters"]
+    assert counters["shared_cache_hits"] == 1
+    assert "partitions_loaded" not in counters
+    assert first.metrics_snapshot()["counters"]["shared_cache_misses"] == 1
+    unit = second.units.get((2024, 1, "r"))
+    assert isinstance(unit.data["temperature_celsius_mean"], np.memmap)
+
+    result = second.query_many(
+        np.array([2023, 2024]),
+        np.array([3, 1]),
+        np.array([40.7128, -37.89994]),
+        np.array([-74.0060, 145.06802]),
+    )
+    assert result["temperature"][1] == expected["temperature"]
+
+
+def test_shared_cache_loader(tmp_path):
+    with pytest.raises(ValueError):
+        TemperatureMonthly(loader="pandas", shared_cache=tmp_path)
@@ -0,0 +1,121 @@
+from global_temperature.tools.sync import (
+    sync,
+    build_manifest,
+    read_manifest,
+    MANIFEST_NAME,
+    VERSIONS_FOLDER,
+)
+from global_temperature.tools.download import download
+from global_temperature.temperature_monthly import TemperatureMonthly
+from test_download import make_archive
+import json
+import pytest
+
+
+def archive_requests(server, year):
+    return [
+        path for path, _ in server.requests if path == f"/monthly/year={year}.tar.xz"
+    ]
+
+
+def test_sync(archive_server, synthetic_source, tmp_path):
+    """The first sync writes every file, the next ones only the changes"""
+    assert sync(tmp_path, years=[2024], base_url=archive_server.url) == []
+
+    year_path = tmp_path / "monthly" / "year=2024"
+    source = synthetic_source / "monthly" / "year=2024"
+    assert year_path.is_symlink()
+    assert build_manifest(year_path) == build_manifest(source)
+    assert read_manifest(year_path) == build_manifest(source)
+    first_version = year_path.resolve()
+
+    # the data is readable through the link
+    temp_monthly = TemperatureMonthly(source_folder=tmp_path)
+    assert temp_monthly.query(2024, 1, 40.7128, -74.0060)["temperature"] > 0
+
+    # nothing changed: the archive is compared but the version is kept
+    assert sync(tmp_path, years=[2024], base_url=archive_server.url) == []
+    assert year_path.resolve() == first_version
+    assert len(archive_requests(archive_server, 2024)) == 2
+
+    # publish a new month, a changed month and drop a month
+    archive_server.files["/monthly/year=2024.tar.xz"] = make_archive(
+        {
+            "month=1/geohash=d/data.parquet": (
+                source / "month=1/geohash=d/data.parquet"
+            ).read_bytes(),
+            "month=2/geohash=d/data.parquet": b"changed",
+            "month=4/geohash=d/data.parquet": b"new",
+        }
+    )
+    assert sync(tmp_path, years=[2024], base_url=archive_server.url) == []
+
+    second_version = year_path.resolve()
+    assert second_version != first_version
+    assert sorted(build_manifest(year_path)) == [
+        "month=1/geohash=d/data.parquet",
+        "month=2/geohash=d/data.parquet",
+        "month=4/geohash=d/data.parquet",
+    ]
+    assert (year_path / "month=2/geohash=d/data.parquet").read_bytes() == b"changed"
+    # the unchanged partition is a link to the previous version, not a copy
+    assert (year_path / "month=1/geohash=d/data.parquet").stat().st_ino == (
+        first_version / "month=1/geohash=d/data.parquet"
+    ).stat().st_ino
+
+    # only the current and the previous versions are kept
+    versions = tmp_path / "monthly" / VERSIONS_FOLDER / "year=2024"
+    assert sorted(versions.iterdir()) == sorted([first_version, second_version])
+
+
+def test_sync_remote_manifest(archive_server, synthetic_source, tmp_path):
+    """A matching remote manifest skips the archive download"""
+    source = synthetic_source / "monthly" / "year=2023"
+    archive_server.files["/monthly/year=2023.manifest.json"] = json.dumps(
+        {"files": build_manifest(source)}
+    ).encode()
+
+    assert sync(tmp_path, years=[2023], base_url=archive_server.url) == []
+    assert sync(tmp_path, years=[2023], base_url=archive_server.url) == []
+
+    assert len(archive_requests(archive_server, 2023)) == 1
+    assert build_manifest(tmp_path / "monthly" / "year=2023") == build_manifest(source)
+
+
+def test_sync_downloaded_folder(archive_server, synthetic_source, tmp_path):
+    """A folder written by download is hashed once and switched to a version on change"""
+    download(tmp_path, years=[2024], base_url=archive_server.url, extract_workers=0)
+    year_path = tmp_path / "monthly" / "year=2024"
+
+    assert sync(tmp_path, years=[2024], base_url=archive_server.url) == []
+    assert not year_path.is_symlink()
+    assert (year_path / MANIFEST_NAME).is_file()
+
+    archive_server.files["/monthly/year=2024.tar.xz"] = make_archive(
+        {"month=1/geohash=d/data.parquet": b"changed"}
+    )
+    assert sync(tmp_path, years=[2024], base_url=archive_server.url) == []
+    assert year_path.is_symlink()
+    assert (year_path / "month=1/geohash=d/data.parquet").read_bytes() == b"changed"
+
+
+def test_sync_failure(archive_server, synthetic_source, tmp_path):
+    """A failed sync leaves the current version untouched"""
+    assert sync(tmp_path, years=[2024], base_url=archive_server.url) == []
+    year_path = tmp_path / "monthly" / "year=2024"
+    version = year_path.resolve()
+
+    archive_server.files["/monthly/year=2024.tar.xz"] = make_archive(
+        {"../evil.bin": b"evil"}
+    )
+    failed_years = sync(
+        tmp_path, years=[2024, 2000], base_url=archive_server.url, backoff=0
+    )
+    assert failed_years == [2024, 2000]
+    assert year_path.resolve() == version
+    assert list(version.parent.iterdir()) == [version]
+
+
+def test_sync_invalid_parameters(tmp_path):
+    with pytest.raises(ValueError):
+        sync(tmp_path)
@@ -0,0 +1,55 @@
+from global_temperature.temperature_monthly import TemperatureMonthly
+from global_temperature.tools.compact import find_partitions
+from global_temperature.tools.synthetic import (
+    generate,
+    grid_points,
+    synthetic_temperature,
+)
+import numpy as np
+import pandas as pd
+import pytest
+
+
+AREAS = [(-39.0, -38.0, 144.0, 145.0), (40.0, 40.5, -74.5, -74.0)]
+
+
+def test_grid_points():
+    points = grid_points(areas=AREAS)
+    assert set(points["geohash_l1"]) == {"r", "d"}
+    assert points["geohash_l1"].is_monotonic_increasing
+
+    sample = grid_points(areas=AREAS, sample=0.5, seed=1)
+    assert len(sample) == round(len(points) / 2)
+    assert sample.equals(grid_points(areas=AREAS, sample=0.5, seed=1))
+
+    with pytest.raises(ValueError):
+        grid_points(sample=0)
+    with pytest.raises(ValueError):
+        grid_points(grid_name="not_a_grid")
+
+
+def test_generate(tmp_path):
+    generate(tmp_path, [2020], [6, 7], areas=AREAS, row_group_size=100)
+
+    partitions = find_partitions(tmp_path)
+    assert sorted(partitions[["year", "month", "geohash"]].itertuples(index=False)) == [
+        (2020, 6, "d"),
+        (2020, 6, "r"),
+        (2020, 7, "d"),
+        (2020, 7, "r"),
+    ]
+
+    # the partitions pass the full schema validation
+    temp_monthly = TemperatureMonthly(source_folder=tmp_path, validation="full")
+    unit = temp_monthly.create_unit(2020, 7, "r")
+    df = unit.data
+    assert (df["date"] == pd.Timestamp("2020-07-01")).all()
+    np.testing.assert_array_equal(
+        df["temperature_celsius_mean"],
+        synthetic_temperature(2020, 7, df["latitude"], df["longitude"]),
+    )
+
+    result = temp_monthly.query(2020, 6, 40.2, -74.2)
+    assert result["temperature"] == synthetic_temperature(
+        2020, 6, result["snapped_latitude"], result["snapped_longitude"]
+    )
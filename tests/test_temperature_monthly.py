@@ -1,4 +1,18 @@
-from global_temperature.temperature_monthly import TemperatureMonthly
+from global_temperature.temperature_monthly import (
+    TemperatureMonthly,
+    TemperatureMonthlyUnit,
+)
+from global_temperature.temperature_base import STATUS_OK, STATUS_NO_NEARBY_POINT
+from global_temperature.errors import NoNearbyPointError
+from global_temperature.tools.compact import compact
+from global_temperature.tools.synthetic import generate
+from conftest import synthetic_temperature
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
+import time
+import pandas as pd
+import pandera
 import pytest
 import numpy as np
 
@@ -66,3 +80,605 @@ def test_TemperatureMonthly_file_not_found():
             latitude=10.0,
             longitude=10.0,
         )
+
+
+def test_query_synthetic(synthetic_source):
+    temp_monthly = TemperatureMonthly(source_folder=synthetic_source)
+    result = temp_monthly.query(2024, 2, -37.89994, 145.06802)
+
+    assert result["geohash"] == "r"
+    assert np.isclose(
+        result["temperature"],
+        synthetic_temperature(2024, 2, result["snapped_latitude"], 0.0),
+        atol=1e-3,
+    )
+
+
+def test_query_many(synthetic_source):
+    temp_monthly = TemperatureMonthly(source_folder=synthetic_source)
+    years = np.array([2024, 2024, 2023, 2024, 2024])
+    months = np.array([1, 1, 3, 2, 2])
+    latitudes = np.array([-37.89994, 40.7128, 40.7128, -38.1235, -37.5])
+    longitudes = np.array([145.06802, -74.0060, -74.0060, 144.9779, 144.5])
+
+    result = temp_monthly.query_many(years, months, latitudes, longitudes)
+
+    assert list(result["status"]) == [
+        STATUS_OK,
+        STATUS_OK,
+        STATUS_OK,
+        STATUS_NO_NEARBY_POINT,
+        STATUS_OK,
+    ]
+    # batch results match single queries
+    for i in [0, 1, 2, 4]:
+        expected = temp_monthly.query(
+            int(years[i]), int(months[i]), latitudes[i], longitudes[i]
+        )
+        for key in expected:
+            assert result[key][i] == expected[key], key
+    assert np.isnan(result["temperature"][3])
+    assert result["geohash"][3] == ""
+
+
+def test_query_many_snap_raster(synthetic_source):
+    args = (
+        np.array([2024, 2024, 2023, 2024, 2024]),
+        np.array([1, 1, 3, 2, 2]),
+        np.array([-37.89994, 40.7128, 40.7128, -38.1235, -37.5]),
+        np.array([145.06802, -74.0060, -74.0060, 144.9779, 144.5]),
+    )
+    expected = TemperatureMonthly(source_folder=synthetic_source).query_many(*args)
+    result = TemperatureMonthly(
+        source_folder=synthetic_source, snap_raster=True
+    ).query_many(*args)
+
+    assert np.array_equal(result["status"], expected["status"])
+    for key in expected:
+        assert np.array_equal(
+            np.delete(result[key], 3), np.delete(expected[key], 3)
+        ), key
+    # the point in the sea is rejected without its nearest grid point
+    assert np.isinf(result["distance"][3])
+    assert np.isnan(result["snapped_latitude"][3])
+    assert result["geohash"][3] == ""
+
+
+def test_query_many_dataframe(synthetic_source):
+    temp_monthly = TemperatureMonthly(source_folder=synthetic_source)
+    df = pd.DataFrame(
+        {
+            "year": [2024, 2024],
+            "month": [1, 1],
+            "latitude": [-37.89994, 10.0],
+            "longitude": [145.06802, 10.0],
+        }
+    )
+    with pytest.raises(FileNotFoundError):
+        temp_monthly.query_many(df)
+
+    result = temp_monthly.query_many(df.iloc[:1])
+    assert result["status"][0] == STATUS_OK
+
+
+@pytest.mark.parametrize(
+    "years, months, latitudes, longitudes",
+    [
+        ([2024], [13], [0.0], [0.0]),
+        ([1900], [1], [0.0], [0.0]),
+        ([2024.0], [1], [0.0], [0.0]),
+        ([2024], [1], [91.0], [0.0]),
+        ([2024], [1], [0.0], [181.0]),
+        ([2024, 2024], [1], [0.0], [0.0]),
+    ],
+)
+def test_query_many_invalid(years, months, latitudes, longitudes):
+    temp_monthly = TemperatureMonthly()
+    with pytest.raises(ValueError):
+        temp_monthly.query_many(years, months, latitudes, longitudes)
+
+
+@pytest.mark.parametrize("cache_policy", ["lru", "lfu", "size"])
+def test_cache_limits(synthetic_source, cache_policy):
+    temp_monthly = TemperatureMonthly(
+        source_folder=synthetic_source, max_cache_size=2, cache_policy=cache_policy
+    )
+    for month in [1, 2, 3, 1]:
+        temp_monthly.query(2024, month, -37.89994, 145.06802)
+
+    stats = temp_monthly.cache_stats()
+    assert stats["entries"] == 2
+    assert stats["bytes"] > 0
+    assert stats["misses"] + stats["hits"] == 4
+    assert stats["evictions"] == stats["misses"] - 2
+
+
+def test_cache_max_bytes(synthetic_source):
+    temp_monthly = TemperatureMonthly(source_folder=synthetic_source)
+    temp_monthly.query(2024, 1, -37.89994, 145.06802)
+    nbytes = temp_monthly.cache_stats()["bytes"]
+
+    temp_monthly = TemperatureMonthly(
+        source_folder=synthetic_source, max_cache_bytes=nbytes
+    )
+    temp_monthly.query(2024, 1, -37.89994, 145.06802)
+    temp_monthly.query(2024, 2, -37.89994, 145.06802)
+    assert list(temp_monthly.units.keys()) == [(2024, 2, "r")]
+
+
+def test_query_range(synthetic_source):
+    temp_monthly = TemperatureMonthly(source_folder=synthetic_source)
+    series = temp_monthly.query_range(40.7128, -74.0060, "2024-01", "2024-03")
+
+    assert list(series.index) == list(pd.date_range("2024-01-01", periods=3, freq="MS"))
+    for timestamp, temperature in series.items():
+        expected = temp_monthly.query(
+            timestamp.year, timestamp.month, 40.7128, -74.0060
+        )
+        assert temperature == expected["temperature"]
+
+
+def test_query_range_missing_month(gapped_source):
+    temp_monthly = TemperatureMonthly(source_folder=gapped_source)
+    series = temp_monthly.query_range(40.7128, -74.0060, "2020-01", "2020-04")
+
+    # the month without a partition is -inf, the others are queried
+    assert list(series.index) == list(pd.date_range("2020-01-01", periods=4, freq="MS"))
+    assert series.iloc[2] == -np.inf
+    for month in [1, 2, 4]:
+        expected = temp_monthly.query(2020, month, 40.7128, -74.0060)
+        assert series.iloc[month - 1] == expected["temperature"]
+
+
+def test_query_range_invalid(synthetic_source):
+    temp_monthly = TemperatureMonthly(source_folder=synthetic_source)
+    with pytest.raises(ValueError):
+        temp_monthly.query_range(40.7128, -74.0060, "2024-03", "2024-01")
+    with pytest.raises(FileNotFoundError):
+        temp_monthly.query_range(40.7128, -74.0060, "2025-01", "2025-03")
+    with pytest.raises(NoNearbyPointError):
+        temp_monthly.query_range(-38.1235, 144.9779, "2024-01", "2024-03")
+
+
+@pytest.mark.parametrize(
+    "loader, partial_load", [("pandas", False), ("arrow", False), ("arrow", True)]
+)
+def test_loaders(synthetic_source, loader, partial_load):
+    baseline = TemperatureMonthly(source_folder=synthetic_source)
+    temp_monthly = TemperatureMonthly(
+        source_folder=synthetic_source, loader=loader, partial_load=partial_load
+    )
+
+    assert temp_monthly.query(2024, 1, 40.7128, -74.0060) == baseline.query(
+        2024, 1, 40.7128, -74.0060
+    )
+
+    args = (
+        np.array([2024, 2024, 2023]),
+        np.array([1, 1, 2]),
+        np.array([-37.89994, -37.5, 40.7128]),
+        np.array([145.06802, 144.5, -74.0060]),
+    )
+    result = temp_monthly.query_many(*args)
+    expected = baseline.query_many(*args)
+    for key in expected:
+        assert list(result[key]) == list(expected[key]), key
+
+    assert temp_monthly.query_range(40.7128, -74.0060, "2024-01", "2024-03").equals(
+        baseline.query_range(40.7128, -74.0060, "2024-01", "2024-03")
+    )
+
+    # partially loaded partitions are not cached
+    assert (len(temp_monthly.units) == 0) == partial_load
+
+
+def test_unit_arrow_bounds(synthetic_source):
+    full = TemperatureMonthlyUnit(synthetic_source, 2024, 1, "d", loader="arrow")
+    partial = TemperatureMonthlyUnit(
+        synthetic_source,
+        2024,
+        1,
+        "d",
+        loader="arrow",
+        bounds=(40.6, 40.8, -74.1, -73.9),
+    )
+    assert set(full.data) == {"latitude", "longitude", "temperature_celsius_mean"}
+    assert 0 < len(partial.data["latitude"]) < len(full.data["latitude"])
+    assert partial.nbytes < full.nbytes
+    assert partial.query(40.7, -74.0) == full.query(40.7, -74.0)
+
+
+def test_loader_invalid():
+    with pytest.raises(ValueError):
+        TemperatureMonthly(loader="polars")
+    with pytest.raises(ValueError):
+        TemperatureMonthly(partial_load=True)
+
+
+@pytest.fixture
+def invalid_source(tmp_path):
+    """a partition with a latitude out of range and a two character geohash"""
+    folder = tmp_path / "monthly" / "year=2024" / "month=1" / "geohash=d"
+    folder.mkdir(parents=True)
+    pd.DataFrame(
+        {
+            "date": pd.Timestamp(2024, 1, 1),
+            "longitude": [-74.0, -74.1],
+            "latitude": [40.7, 95.0],
+            "temperature_celsius_mean": np.array([1.0, 2.0], dtype=np.float32),
+            "geohash_l1": ["d", "dr"],
+        }
+    ).to_parquet(folder / "data.parquet", index=False)
+    return tmp_path
+
+
+@pytest.mark.parametrize("loader", ["pandas", "arrow"])
+@pytest.mark.parametrize("validation", ["full", "fast"])
+def test_validation_invalid(invalid_source, loader, validation):
+    unit = TemperatureMonthlyUnit(
+        invalid_source, 2024, 1, "d", loader=loader, validation=validation
+    )
+    with pytest.raises((ValueError, pandera.errors.SchemaError)):
+        unit.data
+
+
+@pytest.mark.parametrize("loader", ["pandas", "arrow"])
+def test_validation_trusted(invalid_source, loader):
+    unit = TemperatureMonthlyUnit(
+        invalid_source, 2024, 1, "d", loader=loader, validation="trusted"
+    )
+    assert unit.query(40.7, -74.0) == np.float32(1.0)
+
+
+@pytest.mark.parametrize("validation", ["full", "fast", "trusted"])
+def test_validation_modes(synthetic_source, validation):
+    temp_monthly = TemperatureMonthly(
+        source_folder=synthetic_source, validation=validation
+    )
+    result = temp_monthly.query(2024, 1, 40.7128, -74.0060)
+    assert np.isclose(
+        result["temperature"], synthetic_temperature(2024, 1, 40.7, -74.0)
+    )
+
+
+def test_validation_invalid_mode():
+    with pytest.raises(ValueError):
+        TemperatureMonthly(validation="strict")
+
+
+def test_aquery(synthetic_source):
+    temp_monthly = TemperatureMonthly(source_folder=synthetic_source)
+    expected = TemperatureMonthly(source_folder=synthetic_source).query(
+        2024, 2, -37.89994, 145.06802
+    )
+
+    result = asyncio.run(temp_monthly.aquery(2024, 2, -37.89994, 145.06802))
+    assert result == expected
+
+    # the second query is served from the cache
+    asyncio.run(temp_monthly.aquery(2024, 2, -37.89994, 145.06802))
+    assert temp_monthly.cache_stats()["hits"] == 1
+
+    with pytest.raises(NoNearbyPointError):
+        asyncio.run(temp_monthly.aquery(2024, 2, -38.1235, 144.9779))
+
+
+def test_aquery_single_flight(synthetic_source):
+    temp_monthly = TemperatureMonthly(source_folder=synthetic_source)
+    loads = []
+    load_unit = temp_monthly.load_unit
+
+    def counting_load_unit(*key):
+        loads.append(key)
+        return load_unit(*key)
+
+    temp_monthly.load_unit = counting_load_unit
+
+    async def run():
+        return await asyncio.gather(
+            *(temp_monthly.aquery(2024, 1, 40.7128, -74.0060) for _ in range(20))
+        )
+
+    results = asyncio.run(run())
+    assert loads == [(2024, 1, "d")]
+    assert all(result == results[0] for result in results)
+
+
+@pytest.mark.parametrize("cache_stripes", [1, 4])
+def test_query_threads(synthetic_source, cache_stripes):
+    temp_monthly = TemperatureMonthly(
+        source_folder=synthetic_source, cache_stripes=cache_stripes, metrics=True
+    )
+    expected = TemperatureMonthly(source_folder=synthetic_source).query(
+        2024, 1, 40.7128, -74.0060
+    )
+    loads = []
+    load_unit = temp_monthly.load_unit
+
+    def slow_load_unit(*key):
+        loads.append(key)
+        # keep the load in flight while the other threads miss the cache
+        time.sleep(0.2)
+        return load_unit(*key)
+
+    temp_monthly.load_unit = slow_load_unit
+
+    with ThreadPoolExecutor(8) as pool:
+        futures = [
+            pool.submit(temp_monthly.query, 2024, 1, 40.7128, -74.0060)
+            for _ in range(8)
+        ]
+        results = [future.result() for future in futures]
+
+    assert loads == [(2024, 1, "d")]
+    assert all(result == expected for result in results)
+    counters = temp_monthly.metrics_snapshot()["counters"]
+    assert counters["load_waits"] + counters["partitions_loaded"] == 8
+    # each query counts a single cache hit or miss
+    stats = temp_monthly.cache_stats()
+    assert stats["hits"] + stats["misses"] == 8
+    assert counters.get("cache_hits", 0) + counters["cache_misses"] == 8
+
+
+def test_query_threads_error(synthetic_source):
+    temp_monthly = TemperatureMonthly(source_folder=synthetic_source)
+    loads = []
+
+    def failing_load_unit(*key):
+        loads.append(key)
+        time.sleep(0.2)
+        raise OSError("disk error")
+
+    temp_monthly.load_unit = failing_load_unit
+
+    errors = []
+
+    def query():
+        try:
+            temp_monthly.query(2024, 1, 40.7128, -74.0060)
+        except OSError as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=query) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # the waiting threads get the error of the load, the next query loads again
+    assert len(loads) == 1
+    assert len(errors) == 4
+    assert temp_monthly._loads == {}
+
+
+def test_cache_stripes_invalid():
+    with pytest.raises(ValueError):
+        TemperatureMonthly(cache_stripes=0)
+
+
+def test_aquery_max_concurrent_loads(synthetic_source):
+    temp_monthly = TemperatureMonthly(
+        source_folder=synthetic_source, max_concurrent_loads=2
+    )
+    lock = threading.Lock()
+    active = [0, 0]
+    load_unit = temp_monthly.load_unit
+
+    def tracking_load_unit(*key):
+        with lock:
+            active[0] += 1
+            active[1] = max(active)
+        time.sleep(0.05)
+        try:
+            return load_unit(*key)
+        finally:
+            with lock:
+                active[0] -= 1
+
+    temp_monthly.load_unit = tracking_load_unit
+
+    async def run():
+        return await asyncio.gather(
+            *(
+                temp_monthly.aquery(year, month, latitude, longitude)
+                for year in [2023, 2024]
+                for month in [1, 2, 3]
+                for latitude, longitude in [(40.7128, -74.0060), (-37.9, 145.1)]
+            )
+        )
+
+    asyncio.run(run())
+    assert active[1] == 2
+    assert temp_monthly.cache_stats()["entries"] == 12
+
+    with pytest.raises(ValueError):
+        TemperatureMonthly(max_concurrent_loads=0)
+
+
+@pytest.mark.parametrize("partial_load", [False, True])
+def test_aquery_many(synthetic_source, partial_load):
+    temp_monthly = TemperatureMonthly(
+        source_folder=synthetic_source, loader="arrow", partial_load=partial_load
+    )
+    years = np.array([2024, 2024, 2023, 2024, 2024])
+    months = np.array([1, 1, 3, 2, 2])
+    latitudes = np.array([-37.89994, 40.7128, 40.7128, -38.1235, -37.5])
+    longitudes = np.array([145.06802, -74.0060, -74.0060, 144.9779, 144.5])
+
+    expected = temp_monthly.query_many(years, months, latitudes, longitudes)
+    result = asyncio.run(temp_monthly.aquery_many(years, months, latitudes, longitudes))
+    for key in expected:
+        np.testing.assert_array_equal(result[key], expected[key])
+
+
+def region_cells(lat_min, lat_max, lon_min, lon_max):
+    grid = pd.read_parquet("src/global_temperature/grids/01x01/data.parquet")
+    return grid[
+        grid["latitude"].between(lat_min - 1e-6, lat_max + 1e-6)
+        & grid["longitude"].between(lon_min - 1e-6, lon_max + 1e-6)
+    ]
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_query_region_bbox(synthetic_source, weighted):
+    temp_monthly = TemperatureMonthly(source_folder=synthetic_source)
+    bbox = (40.0, 41.0, -74.5, -73.5)
+
+    result = temp_monthly.query_region(
+        "2024-01", "2024-03", bbox=bbox, weighted=weighted
+    )
+
+    cells = region_cells(*bbox)
+    latitudes = np.round(cells["latitude"].to_numpy(), 1)
+    weights = np.cos(np.radians(latitudes)) if weighted else np.ones(len(cells))
+    assert list(result.index) == list(pd.date_range("2024-01-01", periods=3, freq="MS"))
+    for month, row in zip([1, 2, 3], result.itertuples()):
+        expected = synthetic_temperature(2024, month, latitudes, 0.0)
+        assert row.cells == len(cells)
+        assert row.missing_cells == 0
+        assert row.mean == pytest.approx(
+            np.average(expected, weights=weights), rel=1e-5
+        )
+        assert row.min == expected.min()
+        assert row.max == expected.max()
+    # only the partitions of the region were loaded
+    assert set(temp_monthly.units.keys()) == {(2024, month, "d") for month in [1, 2, 3]}
+
+
+def test_query_region_polygon(synthetic_source):
+    temp_monthly = TemperatureMonthly(source_folder=synthetic_source, loader="arrow")
+    # the lower left half of a box
+    polygon = [(40.0, -74.5), (41.0, -74.5), (40.0, -73.5)]
+
+    result = temp_monthly.query_region("2023-02", polygon=polygon)
+    box = temp_monthly.query_region("2023-02", bbox=(40.0, 41.0, -74.5, -73.5))
+
+    assert len(result) == 1
+    assert 0 < result["cells"].iloc[0] < box["cells"].iloc[0]
+    assert result["max"].iloc[0] == box["max"].iloc[0]
+
+
+def test_query_region_cube(synthetic_source, tmp_path):
+    cube_file = compact(synthetic_source, tmp_path / "monthly.cube")
+    bbox = (-38.5, -37.5, 144.5, 145.5)
+
+    expected = TemperatureMonthly(source_folder=synthetic_source).query_region(
+        "2023-01", "2023-03", bbox=bbox
+    )
+    result = TemperatureMonthly(cube_file=cube_file).query_region(
+        "2023-01", "2023-03", bbox=bbox
+    )
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_query_region_missing_month(gapped_source):
+    temp_monthly = TemperatureMonthly(source_folder=gapped_source)
+    bbox = (40.2, 40.6, -74.5, -74.0)
+    result = temp_monthly.query_region("2020-01", "2020-04", bbox=bbox)
+
+    # the cells of the month without a partition have no data
+    cells = len(region_cells(*bbox))
+    assert result["cells"].tolist() == [cells, cells, 0, cells]
+    assert result["missing_cells"].tolist() == [0, 0, cells, 0]
+    assert result.iloc[2][["mean", "min", "max"]].isna().all()
+    assert result.drop(index=result.index[2])["mean"].notna().all()
+
+
+def test_query_region_invalid(synthetic_source):
+    temp_monthly = TemperatureMonthly(source_folder=synthetic_source)
+    bbox = (40.0, 41.0, -74.5, -73.5)
+    with pytest.raises(ValueError):
+        temp_monthly.query_region("2024-01")
+    with pytest.raises(ValueError):
+        temp_monthly.query_region(
+            "2024-01", bbox=bbox, polygon=[(0, 0), (1, 0), (0, 1)]
+        )
+    with pytest.raises(ValueError):
+        temp_monthly.query_region("2024-03", "2024-01", bbox=bbox)
+    with pytest.raises(FileNotFoundError):
+        temp_monthly.query_region("2022-12", bbox=bbox)
+
+    # a region without grid cells, e.g. over the ocean
+    result = temp_monthly.query_region("2024-01", bbox=(0.0, 0.05, -30.0, -29.95))
+    assert result[["cells", "missing_cells"]].iloc[0].tolist() == [0, 0]
+    assert result["mean"].isna().all()
+
+
+@pytest.mark.parametrize("method", ["bilinear", "idw"])
+def test_query_interpolated_many(synthetic_source, method):
+    temp_monthly = TemperatureMonthly(source_folder=synthetic_source)
+    years = np.array([2024, 2023, 2024, 2024])
+    months = np.array([1, 3, 2, 1])
+    latitudes = np.array([-37.83, 40.87, -37.9, -38.1235])
+    longitudes = np.array([145.36, -74.44, 145.1, 144.9779])
+
+    result = temp_monthly.query_interpolated_many(
+        years, months, latitudes, longitudes, method=method
+    )
+    nearest = temp_monthly.query_many(years, months, latitudes, longitudes)
+
+    assert list(result["status"]) == [STATUS_OK] * 3 + [STATUS_NO_NEARBY_POINT]
+    for key in ["geohash", "distance", "snapped_latitude", "snapped_longitude"]:
+        assert list(result[key][:3]) == list(nearest[key][:3]), key
+    # a point on the grid takes the value of its grid point
+    assert result["temperature"][2] == pytest.approx(nearest["temperature"][2])
+    assert np.isnan(result["temperature"][3])
+
+    expected = synthetic_temperature(years, months, latitudes, longitudes)[:2]
+    if method == "bilinear":
+        # the synthetic temperature is linear between the grid points
+        assert result["temperature"][:2] == pytest.approx(expected, abs=1e-4)
+    else:
+        assert result["temperature"][:2] == pytest.approx(expected, abs=0.05)
+
+
+def test_query_interpolated_coast(synthetic_source):
+    temp_monthly = TemperatureMonthly(source_folder=synthetic_source, search_radius=0.3)
+    # in the bay, the corners of the cell are not on the grid but a grid point
+    # on the shore is within the search radius
+    latitudes = np.array([-38.1235, -37.83])
+    longitudes = np.array([144.9779, 145.36])
+
+    result = temp_monthly.query_interpolated_many(
+        [2024, 2024], [1, 1], latitudes, longitudes
+    )
+    nearest = temp_monthly.query_many([2024, 2024], [1, 1], latitudes, longitudes)
+
+    assert list(result["status"]) == [STATUS_OK, STATUS_OK]
+    for key in result:
+        assert result[key][0] == nearest[key][0], key
+    # the other rows are interpolated
+    assert result["temperature"][1] != nearest["temperature"][1]
+
+
+def test_query_interpolated_geohash_boundary(tmp_path):
+    # the cell around the point has corners on both sides of longitude -45
+    source = generate(tmp_path, [2024], [1], areas=[(-11.0, -9.0, -46.0, -44.0)])
+    temp_monthly = TemperatureMonthly(source_folder=source, metrics=True)
+
+    result = temp_monthly.query_interpolated_many([2024], [1], [-10.03], [-45.04])
+    assert result["status"][0] == STATUS_OK
+    assert result["temperature"][0] == pytest.approx(
+        synthetic_temperature(2024, 1, -10.03, -45.04), abs=1e-4
+    )
+    assert temp_monthly.metrics_snapshot()["counters"]["partitions_loaded"] == 2
+
+
+def test_query_interpolated(synthetic_source, tmp_path):
+    temp_monthly = TemperatureMonthly(source_folder=synthetic_source)
+    result = temp_monthly.query_interpolated(2024, 1, -37.83, 145.36)
+    expected = temp_monthly.query_interpolated_many([2024], [1], [-37.83], [145.36])
+    for key in result:
+        assert result[key] == expected[key][0], key
+
+    cube = TemperatureMonthly(
+        source_folder=synthetic_source,
+        cube_file=compact(synthetic_source, tmp_path / "monthly.cube"),
+    )
+    assert cube.query_interpolated(2024, 1, -37.83, 145.36) == result
+
+    with pytest.raises(NoNearbyPointError):
+        temp_monthly.query_interpolated(2024, 1, -38.1235, 144.9779)
+    with pytest.raises(ValueError):
+        temp_monthly.query_interpolated(2024, 1, -37.83, 145.36, method="cubic")
+    with pytest.raises(ValueError):
+        temp_monthly.query_interpolated(2024, 1, -37.83, 145.36, method="idw", k=0)
@@ -1,5 +1,6 @@
 import global_temperature.tools.validate as vd
 from global_temperature.errors import NoNearbyPointError
+import numpy as np
 import pytest
 
 
@@ -32,3 +33,26 @@ def test_check_year():
 
     with pytest.raises(ValueError):
         vd.check_year("2023")
+
+
+def test_check_many():
+    """
+    Test the vectorized check functions.
+    """
+    assert vd.check_coordinates_many(np.array([0.0, 90.0]), np.array([0.0, -180.0]))
+    assert vd.check_year_many(np.array([1970, 2023]))
+    assert vd.check_month_many(np.array([1, 12]))
+    assert list(vd.check_within_radius_many(0.3, np.array([0.2, 0.3, 0.4]))) == [
+        True,
+        True,
+        False,
+    ]
+
+    with pytest.raises(ValueError):
+        vd.check_coordinates_many(np.array([0.0, 90.5]), np.array([0.0, 0.0]))
+    with pytest.raises(ValueError):
+        vd.check_year_many(np.array([1969]))
+    with pytest.raises(ValueError):
+        vd.check_month_many(np.array([0]))
+    with pytest.raises(ValueError):
+        vd.check_within_radius_many(-0.1, np.array([0.2]))